@@ -709,7 +709,7 @@ def get_generation_status(run_id: str):
 				mappings_generated = sum(ms.mappings_count for ms in status.mapping_sets_generated)
 				
 				# Compute mappings_validated from validation_outcomes
-				mappings_validated = len(status.validation_outcomes)
+				mappings_validated = sum(1 for vo in status.validation_outcomes if not vo.skipped)
 				
 				# Map status to display status (for frontend compatibility)
 				status_display = status.status
@@ -747,6 +747,7 @@ def get_generation_status(run_id: str):
 							"test_answer": vo.test_answer,
 							"target_matched": vo.target_matched,
 							"validated_at": vo.validated_at,
+							"skipped": vo.skipped,
 						}
 						for vo in status.validation_outcomes
 					],
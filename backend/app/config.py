@@ -49,6 +49,8 @@ class BaseConfig:
     AUTO_APPLY_DB_MIGRATIONS = (
         os.getenv("FAIRTESTAI_AUTO_APPLY_MIGRATIONS", "true").lower() == "true"
     )
+    # GPT mapping generation is network-bound, so the worker pool can exceed the CPU count.
+    MAPPING_GENERATION_MAX_WORKERS = int(os.getenv("FAIRTESTAI_MAPPING_GENERATION_WORKERS", "16"))
     PIPELINE_DEFAULT_MODELS = os.getenv(
         "FAIRTESTAI_DEFAULT_MODELS", "gpt-4o-mini,claude-3-5-sonnet,gemini-1.5-pro"
     ).split(",")
@@ -3,7 +3,7 @@ from __future__ import annotations
 import queue
 import threading
 from collections import defaultdict, deque
-from typing import Deque, Dict, Generator, Optional
+from typing import Deque, Dict, Generator, Iterable, Optional
 
 from flask import current_app
 
@@ -32,38 +32,70 @@ class LiveLoggingService:
         component: Optional[str] = None,
         context: Optional[dict] = None,
     ) -> None:
-        log_record = PipelineLog(
-            pipeline_run_id=run_id,
-            stage=stage,
-            level=level.upper(),
-            message=message,
-            component=component,
-            context=context or {},
+        self.emit_many(
+            [
+                {
+                    "run_id": run_id,
+                    "stage": stage,
+                    "level": level,
+                    "message": message,
+                    "component": component,
+                    "context": context,
+                }
+            ]
         )
+
+    def emit_many(self, events: Iterable[dict]) -> None:
+        """Persist several ``emit`` keyword sets with one commit, then broadcast them in order."""
+        records = [
+            (
+                event,
+                PipelineLog(
+                    pipeline_run_id=event["run_id"],
+                    stage=event["stage"],
+                    level=event["level"].upper(),
+                    message=event["message"],
+                    component=event.get("component"),
+                    context=event.get("context") or {},
+                ),
+            )
+            for event in events
+        ]
+        if not records:
+            return
         try:
-            db.session.add(log_record)
+            db.session.add_all([log_record for _, log_record in records])
             db.session.commit()
         except Exception as exc:  # noqa: BLE001
             db.session.rollback()
+            first = records[0][0]
             self.logger.warning(
                 "live log commit failed",
-                extra={"run_id": run_id, "stage": stage, "component": component, "error": str(exc)},
+                extra={
+                    "run_id": first["run_id"],
+                    "stage": first["stage"],
+                    "component": first.get("component"),
+                    "events": len(records),
+                    "error": str(exc),
+                },
                 exc_info=True,
             )
 
-        payload = {
-            "id": log_record.id,
-            "timestamp": log_record.timestamp.isoformat() if log_record.timestamp else None,
-            "stage": stage,
-            "level": log_record.level,
-            "component": component,
-            "message": message,
-            "metadata": context or {},
-        }
-
-        with _lock:
-            _buffered_logs[run_id].appendleft(payload)
-        _log_streams[run_id].put(payload)
+        for event, log_record in records:
+            run_id = event["run_id"]
+            payload = {
+                "id": log_record.id,
+                "timestamp": log_record.timestamp.isoformat() if log_record.timestamp else None,
+                "stage": event["stage"],
+                "level": log_record.level,
+                "component": event.get("component"),
+                "message": event["message"],
+                "metadata": event.get("context") or {},
+            }
+
+            with _lock:
+                _buffered_logs[run_id].appendleft(payload)
+            _log_streams[run_id].put(payload)
 
     def stream_logs(self, run_id: str) -> Generator[dict, None, None]:
         # Yield buffered history first
@@ -1,6 +1,8 @@
 """Rate limiting and retry logic for LLM API calls with exponential backoff."""
 import asyncio
 import random
+import threading
+import time
 from functools import wraps
 from typing import Callable, TypeVar
 
@@ -11,6 +13,70 @@ logger = get_logger(__name__)
 T = TypeVar('T')
 
 
+class AsyncTokenBucket:
+    """
+    Token bucket holding ``rate`` tokens that refill evenly over ``period`` seconds.
+
+    ``acquire`` reserves its tokens immediately, letting the balance go negative, and
+    then sleeps until the refill has covered the debt, so waiters are served in arrival
+    order. The balance is updated under a thread lock (never held while sleeping), so
+    coroutines on event loops in different threads can share one bucket.
+
+    Example:
+        requests_per_minute = AsyncTokenBucket(500, 60)
+        async with requests_per_minute:
+            response = await client.responses.create(...)
+    """
+
+    def __init__(self, rate: float, period: float = 60.0) -> None:
+        if rate <= 0 or period <= 0:
+            raise ValueError("rate and period must be positive")
+        self.capacity = float(rate)
+        self._refill_per_second = rate / period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        # Caller holds ``self._lock``.
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._refill_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Take ``amount`` tokens, waiting until the bucket can cover them.
+
+        ``acquire(0)`` only waits for earlier debts (see ``consume``) to be paid off.
+        """
+        # A single request larger than the bucket must still get through eventually.
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refresh()
+            self._tokens -= amount
+            debt = -self._tokens
+        if debt <= 0:
+            return
+        try:
+            await asyncio.sleep(debt / self._refill_per_second)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._tokens += amount
+            raise
+
+    def consume(self, amount: float) -> None:
+        """Charge ``amount`` tokens after the fact without waiting."""
+        with self._lock:
+            self._refresh()
+            self._tokens -= amount
+
+    async def __aenter__(self) -> "AsyncTokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
 def with_exponential_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
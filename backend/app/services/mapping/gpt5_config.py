@@ -28,8 +28,22 @@ VALIDATION_TIMEOUT = int(os.getenv("VALIDATION_TIMEOUT", "30"))  # seconds
 # Generation-specific Configuration
 GPT5_GENERATION_REASONING_EFFORT = os.getenv("GPT5_GENERATION_REASONING_EFFORT", "low")
 MAPPING_MAX_CONCURRENT = int(os.getenv("MAPPING_MAX_CONCURRENT", "10"))
+# Upper bound on mapping sets (target configs) generated per question
+MAPPING_MAX_CONCURRENT_SETS = max(1, int(os.getenv("MAPPING_MAX_CONCURRENT_SETS", "3")))
 VALIDATION_MAX_CONCURRENT = int(os.getenv("VALIDATION_MAX_CONCURRENT", "5"))
+# Validate all candidate mappings of a question in one multi-candidate prompt first
+VALIDATION_BATCH_PROMPT = os.getenv("VALIDATION_BATCH_PROMPT", "true").lower() in {"1", "true", "yes"}
 API_TIMEOUT = int(os.getenv("MAPPING_API_TIMEOUT", "120"))  # seconds
+# Account-level OpenAI budgets shared by generation and validation calls (0 disables)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "500000"))
+# Stream real-time generation and start validating each mapping set as soon as it is complete
+STREAM_GENERATION = os.getenv("MAPPING_STREAM_GENERATION", "true").lower() in {"1", "true", "yes"}
+# Submit first-attempt generation for a whole run as one OpenAI Batch job
+USE_BATCH_API = os.getenv("MAPPING_USE_BATCH_API", "false").lower() in {"1", "true", "yes"}
+BATCH_POLL_INTERVAL = float(os.getenv("MAPPING_BATCH_POLL_INTERVAL", "30"))  # seconds
+# Longest the run waits on a batch job before cancelling it and generating in real time
+BATCH_MAX_WAIT = float(os.getenv("MAPPING_BATCH_MAX_WAIT", "1800"))  # seconds
 
 # Retry Configuration
 MAX_RETRIES = int(os.getenv("MAPPING_GENERATION_MAX_RETRIES", "3"))
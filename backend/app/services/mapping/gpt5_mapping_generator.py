@@ -4,13 +4,17 @@ from __future__ import annotations
 
 import asyncio
 import json
+import mmap
 import re
+import threading
 import time
 import unicodedata
 import uuid
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 from flask import current_app
 
 from ...extensions import db
@@ -20,7 +24,7 @@ from ...services.integration.external_api_client import ExternalAIClient
 from ...utils.logging import get_logger
 from ...utils.openai_responses import coerce_response_text
 from ...utils.time import isoformat, utc_now
-from sqlalchemy import text
+from sqlalchemy.orm.attributes import flag_modified
 
 from .gpt5_config import (
     GPT5_MODEL,
@@ -52,19 +56,90 @@ MAPPING_RESPONSE_SCHEMA = {
     },
 }
 
+# Named groups classify each token (b=begin, e=end, i=item) via ``match.lastgroup``;
+# ``num`` is nested inside ``i`` so it captures an explicit item number in the same pass.
+_TOKEN_PATTERN = (
+    r"(?P<b>\\begin\{(?:dlEnumerateAlpha|dlEnumerateArabic|enumerate)\})(?:\[[^\]]*\])?"
+    r"|(?P<e>\\end\{(?:dlEnumerateAlpha|dlEnumerateArabic|enumerate)\})"
+    r"|(?P<i>\\item\b(?:\s+(?P<num>\d+))?)"
+)
+_TOKEN_RE = re.compile(_TOKEN_PATTERN)
+# Byte-level twin used when scanning a memory-mapped LaTeX file.
+_TOKEN_BYTES_RE = re.compile(_TOKEN_PATTERN.encode("ascii"))
+_LATEX_TEXT_CMD_RE = re.compile(r"\\(?:textbf|textit|emph|text)\{([^}]*)\}")
+_ENUM_BLOCK_RE = re.compile(r"\\begin\{enumerate\}.*?\\end\{enumerate\}", re.DOTALL)
+_WS_RE = re.compile(r"\s+")
+_NON_DIGIT_RE = re.compile(r"[^0-9]")
+_QUOTED_PHRASE_RE = re.compile(r"'([^']+)'")
+_MISSING_SUBSTRING_RE = re.compile(r"Original substring '(.+?)' not found")
+
+
+@lru_cache(maxsize=1024)
+def _item_patterns(question_number: str, binary: bool = False) -> Tuple[re.Pattern, re.Pattern]:
+    """Return the ``\\item N.`` / ``\\item N`` search patterns for a question number."""
+    escaped = re.escape(question_number)
+    patterns = (rf"\\item\s+{escaped}\.\s", rf"\\item\s+{escaped}\s")
+    if binary:
+        return tuple(re.compile(pattern.encode("utf-8"), re.IGNORECASE) for pattern in patterns)  # type: ignore[return-value]
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)  # type: ignore[return-value]
+
+
+def _decode_latex(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def _ensure_id(mapping: Dict[str, Any]) -> str:
+    """Return the mapping's id, drawing a fresh one only when it has none."""
+    mapping_id = mapping.get("id")
+    return mapping_id if mapping_id else uuid.uuid4().hex
+
+
+def _to_json_safe(obj: Any) -> Any:
+    """Return a JSON-serializable copy of ``obj`` (non-str keys coerced as ``json.dumps`` does)."""
+    return orjson.loads(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+
+
+# Byte-offset item spans (plus an item-number index) per LaTeX path, tagged with the
+# file mtime they were computed from.
+Span = Tuple[int, int]
+LatexCache = Dict[str, Tuple[float, List[Span], Dict[int, Span]]]
+_LATEX_CACHE_LOCK = threading.Lock()
+
 
 class GPT5MappingGeneratorService:
     """Service for generating mappings using GPT-5."""
     
-    def __init__(self):
+    def __init__(self, latex_cache: Optional[LatexCache] = None):
         self.logger = get_logger(__name__)
+        # Item spans of LaTeX documents keyed by path; entries carry the file mtime so edits invalidate them.
+        self._latex_cache: LatexCache = latex_cache if latex_cache is not None else {}
+        self._structured_index: Optional[Tuple[List[Dict[str, Any]], Tuple[Dict[Any, Dict[str, Any]], ...]]] = None
         self.structured_manager = StructuredDataManager()
         self.ai_client = ExternalAIClient()
         self.validator = MappingValidator()
         self.strategy_registry = get_strategy_registry()
         self.mapping_logger = get_mapping_logger()
         self.staging_service = MappingStagingService()
+        # Created on first sync; SmartSubstitutionService builds several API clients.
+        self._substitution_service = None
+        # OpenAI client (and its connection pool) shared by every call and retry
+        self._openai_client = None
+        self._openai_api_key: Optional[str] = None
+        self._openai_client_lock = threading.Lock()
     
+    def _get_openai_client(self, api_key: str):
+        """Sync OpenAI client reused across questions and retries; rebuilt if the key changes."""
+        with self._openai_client_lock:
+            if self._openai_client is None or self._openai_api_key != api_key:
+                from openai import OpenAI
+
+                self._openai_client = OpenAI(api_key=api_key)
+                self._openai_api_key = api_key
+            return self._openai_client
+
     def generate_mappings_for_question(
         self,
         run_id: str,
@@ -73,10 +148,17 @@ class GPT5MappingGeneratorService:
         strategy_name: str = "replacement",
         log_context: Optional[Dict[str, Any]] = None,
         retry_hint: Optional[Dict[str, Any]] = None,
+        batch: bool = False,
+        structured: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Generate k mappings for a single question.
         
+        When ``batch`` is true the validated mapping is not committed; the column
+        values are returned under ``pending_update`` for the caller to write.
+        ``structured`` lets bulk callers share one structured.json snapshot across
+        questions instead of re-reading it for each one.
+
         Returns:
             Dictionary with generation results and validated mapping
         """
@@ -98,7 +180,8 @@ class GPT5MappingGeneratorService:
             raise ValueError(f"Question {question_id} not found for run {run_id}")
         
         # Load structured data
-        structured = self.structured_manager.load(run_id)
+        if structured is None:
+            structured = self.structured_manager.load(run_id)
         
         # Get question data
         question_data = self._get_question_data(run_id, question, structured)
@@ -106,15 +189,7 @@ class GPT5MappingGeneratorService:
         # Normalize question_data to ensure all dictionary keys are strings
         question_data = self._normalize_dict_keys(question_data)
         
-        # Get LaTeX stem text
-        latex_stem_text = self._extract_latex_stem_text(run_id, question, structured)
-        if not latex_stem_text:
-            raise ValueError(f"Could not extract LaTeX stem text for question {question_id}")
-        
-        question_data["latex_stem_text"] = latex_stem_text
-        self._prepare_prompt_context(question_data, retry_hint=retry_hint)
-        
-        # Get strategy
+        # Get strategy (before any LaTeX I/O, so unsupported types fail fast)
         strategy = self.strategy_registry.get_strategy(
             question_data.get("question_type", "mcq_single"),
             strategy_name
@@ -125,6 +200,14 @@ class GPT5MappingGeneratorService:
                 f"with strategy {strategy_name}"
             )
         
+        # Get LaTeX stem text
+        latex_stem_text = self._extract_latex_stem_text(run_id, question, structured)
+        if not latex_stem_text:
+            raise ValueError(f"Could not extract LaTeX stem text for question {question_id}")
+        
+        question_data["latex_stem_text"] = latex_stem_text
+        self._prepare_prompt_context(question_data, retry_hint=retry_hint)
+        
         # Generate mappings
         try:
             mappings = self._call_gpt5_for_mapping(
@@ -182,7 +265,7 @@ class GPT5MappingGeneratorService:
             if first_valid_mapping:
                 substring_mapping = self._build_substring_mapping(question, first_valid_mapping)
                 validation_summary = self._extract_validation_summary_from_logs(validation_logs)
-                enriched_mapping = json.loads(json.dumps(substring_mapping))
+                enriched_mapping = _to_json_safe(substring_mapping)
                 enriched_mapping.setdefault("validated", True)
                 if validation_summary:
                     if "confidence" in validation_summary and validation_summary.get("confidence") is not None:
@@ -194,13 +277,15 @@ class GPT5MappingGeneratorService:
                     enriched_mapping.setdefault("validation", validation_summary)
 
                 persistence_errors: List[str] = []
+                pending_update: Optional[Dict[str, Any]] = None
                 try:
-                    self._persist_valid_mapping(
+                    pending_update = self._persist_valid_mapping(
                         run_id=run_id,
                         question=question,
                         mapping=enriched_mapping,
                         validation_logs=validation_logs,
                         strategy=context_metadata.get("strategy"),
+                        batch=batch,
                     )
                 except Exception as exc:  # noqa: BLE001
                     self.logger.exception(
@@ -221,7 +306,7 @@ class GPT5MappingGeneratorService:
                     validation_logs=validation_logs,
                     metadata=context_metadata,
                 )
-                return {
+                response: Dict[str, Any] = {
                     "status": "success",
                     "mappings_generated": len(mappings),
                     "mappings_validated": len(validation_logs),
@@ -233,6 +318,9 @@ class GPT5MappingGeneratorService:
                     "staged": True,
                     "persistence_errors": persistence_errors or None,
                 }
+                if batch and pending_update:
+                    response["pending_update"] = pending_update
+                return response
             else:
                 retry_hint_payload = self._build_retry_hint(
                     question_data,
@@ -396,13 +484,12 @@ class GPT5MappingGeneratorService:
         for attempt in range(MAX_RETRIES):
             try:
                 import os
-                from openai import OpenAI
 
                 api_key = os.getenv("OPENAI_API_KEY") or current_app.config.get("OPENAI_API_KEY")
                 if not api_key:
                     raise ValueError("OPENAI_API_KEY not configured")
 
-                client = OpenAI(api_key=api_key)
+                client = self._get_openai_client(api_key)
 
                 response_obj = client.responses.create(
                     model=GPT5_MODEL,
@@ -478,7 +565,7 @@ class GPT5MappingGeneratorService:
                 content = content.split("```")[1].split("```")[0]
             
             # Parse JSON
-            data = json.loads(content.strip())
+            data = orjson.loads(content.strip())
             
             # Handle different response formats
             if isinstance(data, list):
@@ -633,7 +720,7 @@ class GPT5MappingGeneratorService:
         """Extract the last quoted phrase from the text, if present."""
         if not text:
             return None
-        matches = re.findall(r"'([^']+)'", text)
+        matches = _QUOTED_PHRASE_RE.findall(text)
         return matches[-1] if matches else None
 
     def _build_retry_hint(
@@ -666,7 +753,7 @@ class GPT5MappingGeneratorService:
                 return hint
 
             missing_substring = None
-            match = re.search(r"Original substring '(.+?)' not found", error_message)
+            match = _MISSING_SUBSTRING_RE.search(error_message)
             if match:
                 missing_substring = match.group(1)
 
@@ -733,25 +820,12 @@ class GPT5MappingGeneratorService:
                 ai_question = aq
                 break
         
-        structured_entry = next((entry for entry in structured_questions if entry.get("manipulation_id") == question.id), None)
+        by_manipulation_id, by_sequence, by_number = self._index_structured_questions(structured_questions)
+        structured_entry = by_manipulation_id.get(question.id)
         if structured_entry is None and question.sequence_index is not None:
-            structured_entry = next(
-                (
-                    entry
-                    for entry in structured_questions
-                    if entry.get("sequence_index") == question.sequence_index
-                ),
-                None,
-            )
+            structured_entry = by_sequence.get(question.sequence_index)
         if structured_entry is None:
-            structured_entry = next(
-                (
-                    entry
-                    for entry in structured_questions
-                    if str(entry.get("q_number") or entry.get("question_number") or "") == str(question.question_number)
-                ),
-                None,
-            )
+            structured_entry = by_number.get(str(question.question_number))
         
         # Get options and normalize keys
         options = (
@@ -786,6 +860,36 @@ class GPT5MappingGeneratorService:
         
         return question_data
     
+    def _index_structured_questions(
+        self,
+        structured_questions: List[Dict[str, Any]],
+    ) -> Tuple[Dict[Any, Dict[str, Any]], Dict[Any, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Index structured questions by manipulation id, sequence index and question number.
+
+        The first entry wins for duplicate keys, matching the previous linear scans. The
+        index is memoized for the most recent list so bulk runs sharing one structured
+        payload build it once.
+        """
+        cached = self._structured_index
+        if cached is not None and cached[0] is structured_questions:
+            return cached[1]
+
+        by_manipulation_id: Dict[Any, Dict[str, Any]] = {}
+        by_sequence: Dict[Any, Dict[str, Any]] = {}
+        by_number: Dict[str, Dict[str, Any]] = {}
+        for entry in structured_questions:
+            manipulation_id = entry.get("manipulation_id")
+            if manipulation_id is not None:
+                by_manipulation_id.setdefault(manipulation_id, entry)
+            sequence_index = entry.get("sequence_index")
+            if sequence_index is not None:
+                by_sequence.setdefault(sequence_index, entry)
+            by_number.setdefault(str(entry.get("q_number") or entry.get("question_number") or ""), entry)
+
+        indexes = (by_manipulation_id, by_sequence, by_number)
+        self._structured_index = (structured_questions, indexes)
+        return indexes
+
     def _extract_latex_stem_text(
         self,
         run_id: str,
@@ -805,15 +909,39 @@ class GPT5MappingGeneratorService:
             self.logger.warning(f"LaTeX file not found: {latex_path}")
             return None
 
-        try:
-            latex_content = latex_file.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            latex_content = latex_file.read_text(encoding="latin-1")
+        if latex_file.stat().st_size == 0:
+            self.logger.warning(f"LaTeX file is empty: {latex_path}")
+            return None
+
+        # Scan the memory-mapped bytes and decode only the question's own slice.
+        with latex_file.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as document:
+            segments, number_to_span = self._load_latex_segments(latex_file, document)
+            segment_bounds = self._resolve_question_segment(question, document, segments, number_to_span)
 
-        segments = self._compute_top_level_item_spans(latex_content)
-        segment_bounds: Optional[Tuple[int, int]] = None
+            if segment_bounds is None:
+                self.logger.warning(
+                    "Could not find question segment in LaTeX",
+                    extra={
+                        "run_id": run_id,
+                        "question_number": question.question_number,
+                        "segments_found": len(segments),
+                    },
+                )
+                return None
+
+            return _decode_latex(document[segment_bounds[0]:segment_bounds[1]]).strip()
 
-        sequence_index = getattr(question, "sequence_index", None)
+    def _resolve_question_segment(
+        self,
+        question: QuestionManipulation,
+        document: Any,
+        segments: List[Span],
+        number_to_span: Optional[Dict[int, Span]] = None,
+    ) -> Optional[Span]:
+        """Pick the span for ``question`` by sequence index, number, or marker search."""
+        segment_bounds: Optional[Span] = None
+
+        sequence_index = question.sequence_index
         if isinstance(sequence_index, int) and 0 <= sequence_index < len(segments):
             segment_bounds = segments[sequence_index]
         else:
@@ -822,57 +950,63 @@ class GPT5MappingGeneratorService:
                 segment_bounds = segments[index]
             else:
                 segment_bounds = self._find_question_segment_in_latex(
-                    latex_content,
+                    document,
                     question.question_number,
                     precomputed_segments=segments,
+                    number_to_span=number_to_span,
                 )
 
         if segment_bounds is None:
             # Best-effort fallback: attempt to locate by numeric portion of question number
             try:
-                numeric_index = int(re.sub(r"[^0-9]", "", str(question.question_number) or "")) - 1
+                numeric_index = int(_NON_DIGIT_RE.sub("", str(question.question_number) or "")) - 1
                 if 0 <= numeric_index < len(segments):
                     segment_bounds = segments[numeric_index]
             except ValueError:
                 segment_bounds = None
 
-        if segment_bounds is None:
-            self.logger.warning(
-                "Could not find question segment in LaTeX",
-                extra={
-                    "run_id": run_id,
-                    "question_number": question.question_number,
-                    "segments_found": len(segments),
-                },
-            )
-            return None
+        return segment_bounds
+
+    def _load_latex_segments(self, latex_file: Path, document: Any) -> Tuple[List[Span], Dict[int, Span]]:
+        """Return byte-offset item spans and their number index, reusing cached results."""
+        cache_key = str(latex_file)
+        mtime = latex_file.stat().st_mtime
+        with _LATEX_CACHE_LOCK:
+            cached = self._latex_cache.get(cache_key)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        segments, number_to_span = self._scan_item_spans(document)
+        with _LATEX_CACHE_LOCK:
+            self._latex_cache[cache_key] = (mtime, segments, number_to_span)
+        return segments, number_to_span
 
-        segment_text = latex_content[segment_bounds[0]:segment_bounds[1]]
-        return segment_text.strip()
-    
     def _find_question_segment_in_latex(
         self,
-        latex_content: str,
+        latex_content: Any,
         question_number: str,
         *,
-        precomputed_segments: Optional[List[Tuple[int, int]]] = None,
-    ) -> Optional[Tuple[int, int]]:
+        precomputed_segments: Optional[List[Span]] = None,
+        number_to_span: Optional[Dict[int, Span]] = None,
+    ) -> Optional[Span]:
         """Find a question segment in LaTeX content using pattern fallbacks."""
-        segments = precomputed_segments or self._compute_top_level_item_spans(latex_content)
+        if precomputed_segments and number_to_span is not None:
+            segments = precomputed_segments
+        else:
+            scanned_segments, number_to_span = self._scan_item_spans(latex_content)
+            segments = precomputed_segments or scanned_segments
         if not segments:
             return None
 
-        search_patterns = [
-            re.compile(rf"\\item\s+{re.escape(str(question_number))}\.\s", re.IGNORECASE),
-            re.compile(rf"\\item\s+{re.escape(str(question_number))}\s", re.IGNORECASE),
-        ]
-
-        for pattern in search_patterns:
-            match = pattern.search(latex_content)
-            if not match:
-                continue
+        try:
+            indexed = number_to_span.get(int(str(question_number).strip()))
+        except (TypeError, ValueError):
+            indexed = None
+        if indexed is not None:
+            return indexed
 
-            position = match.start()
+        position = self._locate_item_marker(latex_content, str(question_number))
+        if position is not None:
             for start, end in segments:
                 if start <= position < end:
                     return (start, end)
@@ -889,43 +1023,75 @@ class GPT5MappingGeneratorService:
 
         return None
 
-    def _compute_top_level_item_spans(self, content: str) -> List[Tuple[int, int]]:
+    def _locate_item_marker(self, latex_content: Any, question_number: str) -> Optional[int]:
+        """Return the offset of the ``\\item N.`` / ``\\item N`` marker for a question."""
+        binary = not isinstance(latex_content, str)
+        # Plain substring search covers the canonical single-space markers; the regexes
+        # only run for irregular spacing or casing.
+        for needle in (f"\\item {question_number}.", f"\\item {question_number} "):
+            key = needle.encode("utf-8") if binary else needle
+            position = latex_content.find(key)
+            if position == -1:
+                continue
+            after = latex_content[position + len(key):position + len(key) + 1]
+            if key[-1:] in (" ", b" ") or not after or after.isspace():
+                return position
+
+        for pattern in _item_patterns(question_number, binary):
+            match = pattern.search(latex_content)
+            if match:
+                return match.start()
+
+        return None
+
+    def _compute_top_level_item_spans(self, content: Any) -> List[Span]:
         """Compute spans for top-level enumerate items (questions)."""
+        return self._scan_item_spans(content)[0]
+
+    def _scan_item_spans(self, content: Any) -> Tuple[List[Span], Dict[int, Span]]:
+        """Compute top-level item spans and index them by explicit ``\\item N`` numbers.
+
+        ``content`` may be a ``str`` or a bytes-like object such as an ``mmap``; offsets
+        are returned in the same units as the input.
+        """
         if not content:
-            return []
+            return [], {}
 
-        token_pattern = re.compile(
-            r"\\begin\{(?:dlEnumerateAlpha|dlEnumerateArabic|enumerate)\}(?:\[[^\]]*\])?"
-            r"|\\end\{(?:dlEnumerateAlpha|dlEnumerateArabic|enumerate)\}"
-            r"|\\item\b"
-        )
+        token_re = _TOKEN_RE if isinstance(content, str) else _TOKEN_BYTES_RE
 
         level = 0
-        segments: List[Tuple[int, int]] = []
+        segments: List[Span] = []
+        number_to_span: Dict[int, Span] = {}
         current_start: Optional[int] = None
+        current_number: Optional[int] = None
 
-        for match in token_pattern.finditer(content):
-            token = match.group()
-            if token.startswith("\\begin"):
-                level += 1
-                continue
+        def close(end: int) -> None:
+            span = (current_start, end)
+            segments.append(span)
+            if current_number is not None:
+                number_to_span.setdefault(current_number, span)
 
-            if token.startswith("\\end"):
+        for match in token_re.finditer(content):
+            kind = match.lastgroup
+            if kind == "b":
+                level += 1
+            elif kind == "e":
                 if level == 1 and current_start is not None:
-                    segments.append((current_start, match.start()))
+                    close(match.start())
                     current_start = None
                 level = max(0, level - 1)
-                continue
-
-            if level == 1:
+            elif level == 1:
+                start = match.start()
                 if current_start is not None:
-                    segments.append((current_start, match.start()))
-                current_start = match.start()
+                    close(start)
+                current_start = start
+                number = match.group("num")
+                current_number = int(number) if number is not None else None
 
         if current_start is not None:
-            segments.append((current_start, len(content)))
+            close(len(content))
 
-        return segments
+        return segments, number_to_span
 
     def _safe_question_index(self, question_number: Any, total_segments: int) -> Optional[int]:
         try:
@@ -939,18 +1105,17 @@ class GPT5MappingGeneratorService:
         # Remove LaTeX commands but keep text content
         # This is a simplified extraction - in production, you might want more sophisticated parsing
         stem = segment_text
+        if "\\" not in stem:
+            return _WS_RE.sub(" ", stem).strip()
         
-        # Remove common LaTeX commands
-        stem = re.sub(r"\\textbf\{([^}]*)\}", r"\1", stem)
-        stem = re.sub(r"\\textit\{([^}]*)\}", r"\1", stem)
-        stem = re.sub(r"\\emph\{([^}]*)\}", r"\1", stem)
-        stem = re.sub(r"\\text\{([^}]*)\}", r"\1", stem)
+        # Remove common LaTeX commands in a single pass
+        stem = _LATEX_TEXT_CMD_RE.sub(r"\1", stem)
         
         # Remove enumerate environments (options)
-        stem = re.sub(r"\\begin\{enumerate\}.*?\\end\{enumerate\}", "", stem, flags=re.DOTALL)
+        stem = _ENUM_BLOCK_RE.sub("", stem)
         
         # Clean up whitespace
-        stem = re.sub(r"\s+", " ", stem)
+        stem = _WS_RE.sub(" ", stem)
         stem = stem.strip()
         
         return stem
@@ -962,7 +1127,7 @@ class GPT5MappingGeneratorService:
     ) -> Dict[str, Any]:
         """Construct a substring mapping payload from GPT output."""
         substring_mapping = {
-            "id": mapping.get("id") or str(uuid.uuid4()),
+            "id": _ensure_id(mapping),
             "original": mapping.get("original_substring", mapping.get("original", "")),
             "replacement": mapping.get("replacement_substring", mapping.get("replacement", "")),
             "start_pos": mapping.get("start_pos", 0),
@@ -999,7 +1164,13 @@ class GPT5MappingGeneratorService:
         mapping: Dict[str, Any],
         validation_logs: List[Dict[str, Any]],
         strategy: Optional[str] = None,
-    ) -> None:
+        batch: bool = False,
+    ) -> Dict[str, Any]:
+        """Save a validated mapping and sync it into structured data.
+
+        In batch mode the commit and the structured sync are left to the caller, which
+        writes the returned column values together with other questions.
+        """
         validation_summary = self._extract_validation_summary_from_logs(validation_logs)
         validation_record: Optional[Dict[str, Any]] = None
         if validation_summary:
@@ -1016,14 +1187,17 @@ class GPT5MappingGeneratorService:
                 "timestamp": isoformat(utc_now()),
             }
 
-        self._save_mapping_to_question(
+        column_values = self._save_mapping_to_question(
             question,
             mapping,
             method=strategy or "gpt5_generated",
             effectiveness=validation_summary.get("confidence") if validation_summary else None,
             validation_record=validation_record,
+            batch=batch,
         )
-        self._sync_mapping_to_structured(run_id, question, mapping)
+        if not batch:
+            self._sync_mapping_to_structured(run_id, question, mapping)
+        return column_values
 
     def _save_mapping_to_question(
         self,
@@ -1033,17 +1207,23 @@ class GPT5MappingGeneratorService:
         method: Optional[str] = None,
         effectiveness: Optional[float] = None,
         validation_record: Optional[Dict[str, Any]] = None,
-    ) -> None:
-        """Save mapping to question in database."""
+        batch: bool = False,
+    ) -> Dict[str, Any]:
+        """Save mapping to question in database.
+
+        Returns the updated column values keyed for a bulk ``UPDATE`` by primary key.
+        With ``batch`` set the session is not committed, and the changed
+        ``ai_model_results`` keys are also returned as ``ai_model_results_patch``.
+        """
         if "original_substring" in mapping or "replacement_substring" in mapping:
             substring_mapping = self._build_substring_mapping(question, mapping)
         else:
             substring_mapping = dict(mapping)
-            substring_mapping.setdefault("id", str(uuid.uuid4()))
+            substring_mapping["id"] = _ensure_id(substring_mapping)
 
         substring_mapping.setdefault("validated", True)
 
-        json_safe_mappings = json.loads(json.dumps([substring_mapping]))
+        json_safe_mappings = [_to_json_safe(substring_mapping)]
         question.substring_mappings = json_safe_mappings
         if method:
             question.manipulation_method = method
@@ -1060,31 +1240,33 @@ class GPT5MappingGeneratorService:
             auto_generated = question.ai_model_results.setdefault("auto_generated", {})
             auto_generated["strategy"] = method or auto_generated.get("strategy")
             auto_generated["last_mapping_id"] = substring_mapping.get("id")
+            # ai_model_results is mutated in place, so the JSON column must be flagged for the flush.
+            flag_modified(question, "ai_model_results")
+
+        column_values = {
+            "id": question.id,
+            "substring_mappings": question.substring_mappings,
+            "manipulation_method": question.manipulation_method,
+            "effectiveness_score": question.effectiveness_score,
+            "ai_model_results": question.ai_model_results,
+        }
+        if batch:
+            if validation_record:
+                # Only these keys changed; batch writers on JSONB can merge them server-side.
+                column_values["ai_model_results_patch"] = {
+                    "last_validation": question.ai_model_results["last_validation"],
+                    "auto_generated": question.ai_model_results["auto_generated"],
+                }
+            return column_values
 
         db.session.add(question)
-        db.session.execute(
-            text(
-                "UPDATE question_manipulations "
-                "SET substring_mappings = :mappings, "
-                "manipulation_method = :method, "
-                "effectiveness_score = :effectiveness, "
-                "ai_model_results = :ai_results "
-                "WHERE id = :id"
-            ),
-            {
-                "mappings": json.dumps(json_safe_mappings),
-                "method": question.manipulation_method,
-                "effectiveness": question.effectiveness_score,
-                "ai_results": json.dumps(question.ai_model_results or {}),
-                "id": question.id,
-            },
-        )
         db.session.commit()
         
         self.logger.info(
             f"Saved mapping to question {question.question_number}",
             run_id=question.pipeline_run_id
         )
+        return column_values
     
     def _sync_mapping_to_structured(
         self,
@@ -1094,9 +1276,11 @@ class GPT5MappingGeneratorService:
     ):
         """Sync mapping to structured.json."""
         try:
-            from ...services.pipeline.smart_substitution_service import SmartSubstitutionService
-            service = SmartSubstitutionService()
-            service.sync_structured_mappings(run_id)
+            if self._substitution_service is None:
+                from ...services.pipeline.smart_substitution_service import SmartSubstitutionService
+
+                self._substitution_service = SmartSubstitutionService()
+            self._substitution_service.sync_structured_mappings(run_id)
             self.logger.info(
                 f"Synced mapping to structured.json for question {question.question_number}",
                 run_id=run_id
@@ -0,0 +1,42 @@
+"""Per-run on-disk cache of LLM responses used by mapping generation."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+from ...utils.storage_paths import atomic_write_bytes, run_directory
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON form of a request's inputs."""
+    return hashlib.sha256(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+    ).hexdigest()
+
+
+class LLMCache:
+    """Exact-match response cache stored as one JSON file per key under ``<run>/llm_cache/``.
+
+    Reruns of a run (and retries that rebuild an identical request) read the stored
+    response instead of paying for another model round-trip.
+    """
+
+    def __init__(self, run_id: str) -> None:
+        self.directory = run_directory(run_id) / "llm_cache"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = orjson.loads(self._path(key).read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+        return value if isinstance(value, dict) else None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        atomic_write_bytes(self._path(key), orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
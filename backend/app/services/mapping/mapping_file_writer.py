@@ -0,0 +1,100 @@
+"""Background writer for mapping generation artefacts."""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ...utils.logging import get_logger
+from ...utils.storage_paths import atomic_write_bytes
+
+
+FileSignature = Tuple[int, int]
+
+
+def file_signature(path: Path) -> Optional[FileSignature]:
+    """``(st_mtime_ns, st_size)`` of ``path``, or ``None`` when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class MappingFileWriter:
+    """Apply queued whole-file writes on a single daemon thread.
+
+    Only the newest payload per path is kept, so bursts of writes to the same file
+    collapse into one disk write. ``pending_payload`` lets readers see a queued
+    payload before it reaches disk.
+    """
+
+    def __init__(self) -> None:
+        self.logger = get_logger(__name__)
+        self._queue: "queue.Queue[Path]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._latest: Dict[Path, bytes] = {}
+        self._written: Dict[Path, Optional[FileSignature]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, path: Path, payload: bytes) -> None:
+        """Schedule ``payload`` to replace ``path``; returns without waiting for disk."""
+        with self._lock:
+            self._latest[path] = payload
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mapping-file-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(path)
+
+    def pending_payload(self, path: Path) -> Optional[bytes]:
+        """Return the queued payload for ``path`` that has not been written yet."""
+        with self._lock:
+            return self._latest.get(path)
+
+    def written_signature(self, path: Path) -> Optional[FileSignature]:
+        """Return the signature ``path`` had right after this writer last replaced it."""
+        with self._lock:
+            return self._written.get(path)
+
+    def flush_pending(self) -> None:
+        """Block until every queued write has reached disk."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            try:
+                with self._lock:
+                    payload = self._latest.get(path)
+                if payload is None:
+                    continue
+                atomic_write_bytes(path, payload)
+                signature = file_signature(path)
+                with self._lock:
+                    self._written[path] = signature
+                    # A newer payload queued during the write stays pending for its own turn.
+                    if self._latest.get(path) is payload:
+                        del self._latest[path]
+            except Exception as exc:  # pragma: no cover - defensive
+                self.logger.warning(f"Failed to write mapping file {path}: {exc}")
+            finally:
+                self._queue.task_done()
+
+
+_file_writer: Optional[MappingFileWriter] = None
+_file_writer_lock = threading.Lock()
+
+
+def get_mapping_file_writer() -> MappingFileWriter:
+    """Get the process-wide mapping file writer."""
+    global _file_writer
+    if _file_writer is None:
+        with _file_writer_lock:
+            if _file_writer is None:
+                _file_writer = MappingFileWriter()
+                atexit.register(_file_writer.flush_pending)
+    return _file_writer
@@ -5,9 +5,11 @@ from __future__ import annotations
 import threading
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from flask import current_app
+from sqlalchemy import bindparam, func, literal_column, update
+from sqlalchemy.dialects.postgresql import JSONB
 
 from ...extensions import db
 from ...models import QuestionManipulation
@@ -16,66 +18,91 @@ from ...utils.time import isoformat, utc_now
 from .gpt5_mapping_generator import GPT5MappingGeneratorService
 from .mapping_generation_logger import get_mapping_logger
 
+# Bulk jobs write validated mappings in batches of this many questions.
+BULK_COMMIT_BATCH_SIZE = 16
+# On PostgreSQL, batched writes merge just the changed ai_model_results keys into the
+# stored JSONB document instead of rewriting the whole blob.
+_questions_table = QuestionManipulation.__table__
+MERGE_AI_MODEL_RESULTS = (
+    update(_questions_table)
+    .where(_questions_table.c.id == bindparam("question_id"))
+    .values(
+        ai_model_results=func.coalesce(
+            _questions_table.c.ai_model_results, literal_column("'{}'::jsonb")
+        ).op("||")(bindparam("patch", type_=JSONB))
+    )
+)
+# Workers mostly wait on GPT round-trips, so the pool is sized for I/O rather than CPU.
+DEFAULT_MAX_WORKERS = 16
+
 
 class MappingGenerationCoordinator:
     """Coordinate parallel mapping generation jobs."""
 
-    def __init__(self, max_workers: int = 4) -> None:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
         self.logger = get_logger(__name__)
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Bounds queued bulk tasks so very large runs do not flood the executor queue.
+        self._submit_slots = threading.BoundedSemaphore(max_workers * 4)
+        # Guards job registration only; per-job counters use the job's own lock so
+        # workers on different jobs never contend.
         self._lock = threading.RLock()
         self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._job_locks: Dict[str, threading.Lock] = {}
         self._run_latest_job: Dict[str, str] = {}
+        self._pending_updates: Dict[str, List[Dict[str, Any]]] = {}
+        # Batch writes popped from ``_pending_updates`` but not yet committed, per job.
+        self._writes_in_flight: Dict[str, int] = {}
+        # Jobs whose final write, structured sync and completion have been claimed.
+        self._finalizing_jobs: Set[str] = set()
+        # Runs whose structured.json needs a sync once their bulk job finishes.
+        self._pending_sync_runs: Set[str] = set()
+        self._substitution_service = None
+        # One generator shared by all workers, so its LaTeX and structured-data caches are reused.
+        self._service = GPT5MappingGeneratorService()
 
     def submit_bulk_generation(self, run_id: str, *, k: int, strategy_name: str) -> str:
         """Submit a bulk generation job for every question in the run."""
         app = current_app._get_current_object()
-        questions = (
-            QuestionManipulation.query.filter_by(pipeline_run_id=run_id)
-            .order_by(QuestionManipulation.sequence_index.asc(), QuestionManipulation.id.asc())
-            .all()
-        )
-
-        question_snapshot = [
-            {
-                "id": question.id,
-                "number": str(question.question_number),
-                "sequence_index": question.sequence_index,
-                "source_identifier": question.source_identifier,
-            }
-            for question in questions
-        ]
-
-        job_id = self._register_job(
-            run_id=run_id,
-            job_type="bulk",
-            total=len(question_snapshot),
-        )
+        job_id = self._register_job(run_id=run_id, job_type="bulk", total=0, running=True)
 
+        # One streaming pass logs each question as queued and keeps only (id, number)
+        # for the feeder; submission happens off the request thread so the query cursor
+        # is closed before workers start writing.
         logger_service = get_mapping_logger()
-        for question in question_snapshot:
+        tasks: List[Tuple[int, str]] = []
+        rows = (
+            QuestionManipulation.query.with_entities(QuestionManipulation.id, QuestionManipulation.question_number)
+            .filter_by(pipeline_run_id=run_id)
+            .order_by(QuestionManipulation.sequence_index.asc(), QuestionManipulation.id.asc())
+            .yield_per(256)
+        )
+        for question_id, question_number in rows:
+            question_number = str(question_number)
             logger_service.log_generation(
                 run_id=run_id,
-                question_id=question["id"],
-                question_number=question["number"],
+                question_id=question_id,
+                question_number=question_number,
                 status="queued",
                 details={"job_id": job_id},
                 mappings_generated=0,
             )
-
-        for question in question_snapshot:
-            self._executor.submit(
-                self._run_question_job,
-                app,
-                job_id,
-                run_id,
-                question["id"],
-                question["number"],
-                k,
-                strategy_name,
-            )
-
-        if not question_snapshot:
+            tasks.append((question_id, question_number))
+
+        job, job_lock = self._get_job(job_id)
+        with job_lock:
+            job["total"] = len(tasks)
+
+        if tasks:
+            # Question context is read-only during generation, so every task shares one load.
+            structured = self._service.structured_manager.load(run_id)
+            threading.Thread(
+                target=self._feed_bulk_tasks,
+                args=(app, job_id, run_id, tasks, k, strategy_name, structured),
+                name=f"mapping-feed-{job_id[:8]}",
+                daemon=True,
+            ).start()
+        else:
             self._complete_job(job_id)
 
         return job_id
@@ -123,39 +150,78 @@ class MappingGenerationCoordinator:
         return job_id
 
     def get_job_snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            job = self._jobs.get(job_id)
-            return dict(job) if job else None
+        job, job_lock = self._get_job(job_id)
+        if job is None:
+            return None
+        with job_lock:
+            return dict(job)
 
     def get_latest_job_snapshot_for_run(self, run_id: str) -> Optional[Dict[str, Any]]:
         with self._lock:
             job_id = self._run_latest_job.get(run_id)
-            if not job_id:
-                return None
-            job = self._jobs.get(job_id)
-            return dict(job) if job else None
+        if not job_id:
+            return None
+        return self.get_job_snapshot(job_id)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _register_job(self, *, run_id: str, job_type: str, total: int) -> str:
+    def _register_job(self, *, run_id: str, job_type: str, total: int, running: bool = False) -> str:
+        """Register a job; ``running`` keeps a job whose total is not known yet open."""
         job_id = str(uuid.uuid4())
         with self._lock:
             job_info = {
                 "job_id": job_id,
                 "run_id": run_id,
                 "type": job_type,
-                "status": "running" if total else "completed",
+                "status": "running" if total or running else "completed",
                 "submitted_at": isoformat(utc_now()),
                 "completed": 0,
                 "errors": 0,
                 "total": total,
             }
+            # The lock is published first so readers never see a job without one.
+            self._job_locks[job_id] = threading.Lock()
             self._jobs[job_id] = job_info
             self._run_latest_job[run_id] = job_id
         return job_id
 
+    def _get_job(self, job_id: str):
+        """Return ``(job, job_lock)``; both are ``None`` for unknown jobs.
+
+        Jobs are never removed and single dict lookups are atomic, so this read
+        does not take the registry lock.
+        """
+        return self._jobs.get(job_id), self._job_locks.get(job_id)
+
+    def _feed_bulk_tasks(
+        self,
+        app,
+        job_id: str,
+        run_id: str,
+        tasks: List[Tuple[int, str]],
+        k: int,
+        strategy_name: str,
+        structured: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Submit bulk tasks as executor slots free up."""
+        for question_id, question_number in tasks:
+            self._submit_slots.acquire()
+            future = self._executor.submit(
+                self._run_question_job,
+                app,
+                job_id,
+                run_id,
+                question_id,
+                question_number,
+                k,
+                strategy_name,
+                True,
+                structured,
+            )
+            future.add_done_callback(lambda _future: self._submit_slots.release())
+
     def _run_question_job(
         self,
         app,
@@ -165,6 +231,8 @@ class MappingGenerationCoordinator:
         question_number: str,
         k: int,
         strategy_name: str,
+        batch: bool = False,
+        structured: Optional[Dict[str, Any]] = None,
     ) -> None:
         logger_service = get_mapping_logger()
         log_context = {"job_id": job_id}
@@ -180,7 +248,7 @@ class MappingGenerationCoordinator:
                     mappings_generated=0,
                 )
 
-                service = GPT5MappingGeneratorService()
+                service = self._service
                 final_result: Optional[Dict[str, Any]] = None
                 try:
                     result = service.generate_mappings_for_question(
@@ -189,6 +257,8 @@ class MappingGenerationCoordinator:
                         k=k,
                         strategy_name=strategy_name,
                         log_context=log_context,
+                        batch=batch,
+                        structured=structured,
                     )
                     final_result = result
                     if result and result.get("status") == "no_valid_mapping" and result.get("retry_hint"):
@@ -201,6 +271,8 @@ class MappingGenerationCoordinator:
                                 strategy_name=strategy_name,
                                 log_context=retry_context,
                                 retry_hint=result.get("retry_hint"),
+                                batch=batch,
+                                structured=structured,
                             )
                             if retry_result:
                                 final_result = retry_result
@@ -252,6 +324,8 @@ class MappingGenerationCoordinator:
                             },
                             mappings_generated=final_result.get("mappings_generated", 0),
                         )
+                    elif batch:
+                        self._queue_pending_update(job_id, run_id, (final_result or {}).get("pending_update"), app=app)
                 finally:
                     db.session.remove()
         except Exception as exc:  # pragma: no cover - defensive
@@ -270,29 +344,132 @@ class MappingGenerationCoordinator:
                 )
             self._record_job_error(job_id)
         finally:
-            self._increment_job_progress(job_id)
+            self._increment_job_progress(job_id, app=app)
+
+    def _queue_pending_update(
+        self, job_id: str, run_id: str, pending_update: Optional[Dict[str, Any]], *, app=None
+    ) -> None:
+        """Buffer a bulk job's mapping write, committing once a full batch is ready."""
+        if not pending_update:
+            return
+        job, job_lock = self._get_job(job_id)
+        if job_lock is None:
+            return
+        with job_lock:
+            pending = self._pending_updates.setdefault(job_id, [])
+            pending.append(pending_update)
+            if len(pending) < BULK_COMMIT_BATCH_SIZE:
+                return
+            rows = self._pending_updates.pop(job_id)
+            self._writes_in_flight[job_id] = self._writes_in_flight.get(job_id, 0) + 1
+        try:
+            self._write_pending_updates(run_id, rows)
+        finally:
+            with job_lock:
+                self._writes_in_flight[job_id] -= 1
+                final_rows = self._claim_job_finalization_locked(job_id, job)
+        if final_rows is not None:
+            self._finalize_job(job, job_lock, final_rows, app=app)
+
+    def _write_pending_updates(self, run_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Apply buffered mapping writes in one transaction and schedule a structured sync."""
+        try:
+            # The worker's own session may still hold the unflushed instance; the rows carry its values.
+            db.session.rollback()
+            merge_json = db.session.get_bind().dialect.name == "postgresql"
+            column_rows: List[Dict[str, Any]] = []
+            patches: List[Dict[str, Any]] = []
+            for row in rows:
+                row = dict(row)
+                patch = row.pop("ai_model_results_patch", None)
+                if merge_json and patch is not None:
+                    row.pop("ai_model_results", None)
+                    patches.append({"question_id": row["id"], "patch": patch})
+                column_rows.append(row)
+            db.session.execute(update(QuestionManipulation), column_rows)
+            if patches:
+                db.session.execute(MERGE_AI_MODEL_RESULTS, patches)
+            db.session.commit()
+        except Exception:  # pragma: no cover - defensive
+            db.session.rollback()
+            self.logger.exception(
+                "Failed to write batched mapping updates",
+                extra={"run_id": run_id, "question_ids": [row.get("id") for row in rows]},
+            )
+            return
+
+        self.request_sync(run_id)
 
-    def _increment_job_progress(self, job_id: str) -> None:
+    def request_sync(self, run_id: str) -> None:
+        """Mark ``run_id`` for one structured.json sync when its bulk job completes."""
         with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
+            self._pending_sync_runs.add(run_id)
+
+    def _flush_structured_sync(self, run_id: str) -> None:
+        with self._lock:
+            if run_id not in self._pending_sync_runs:
                 return
+            self._pending_sync_runs.discard(run_id)
+
+        try:
+            if self._substitution_service is None:
+                from ...services.pipeline.smart_substitution_service import SmartSubstitutionService
+
+                self._substitution_service = SmartSubstitutionService()
+            self._substitution_service.sync_structured_mappings(run_id)
+        except Exception as exc:  # pragma: no cover - defensive
+            self.logger.warning(
+                "Failed to sync batched mappings to structured.json",
+                extra={"run_id": run_id, "error": str(exc)},
+            )
+
+    def _increment_job_progress(self, job_id: str, *, app=None) -> None:
+        job, job_lock = self._get_job(job_id)
+        if job is None:
+            return
+        with job_lock:
             job["completed"] += 1
-            if job["completed"] >= job["total"]:
-                self._complete_job_locked(job)
+            rows = self._claim_job_finalization_locked(job_id, job)
+        if rows is not None:
+            self._finalize_job(job, job_lock, rows, app=app)
+
+    def _claim_job_finalization_locked(self, job_id: str, job: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Claim the job's final flush once every question finished and no batch write is in flight.
+
+        Returns the remaining buffered rows (possibly empty) to the single caller that
+        wins the claim and ``None`` to everyone else; callers hold the job lock.
+        """
+        if job["completed"] < job["total"] or self._writes_in_flight.get(job_id) or job_id in self._finalizing_jobs:
+            return None
+        self._finalizing_jobs.add(job_id)
+        return self._pending_updates.pop(job_id, None) or []
+
+    def _finalize_job(self, job: Dict[str, Any], job_lock: threading.Lock, rows: List[Dict[str, Any]], *, app=None) -> None:
+        """Commit the last buffered rows, sync structured.json once, then mark the job completed."""
+        if app is not None:
+            with app.app_context():
+                try:
+                    if rows:
+                        self._write_pending_updates(job["run_id"], rows)
+                    self._flush_structured_sync(job["run_id"])
+                finally:
+                    db.session.remove()
+
+        with job_lock:
+            self._complete_job_locked(job)
 
     def _record_job_error(self, job_id: str) -> None:
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return
+        job, job_lock = self._get_job(job_id)
+        if job is None:
+            return
+        with job_lock:
             job["errors"] += 1
 
     def _complete_job(self, job_id: str) -> None:
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if not job:
-                return
+        job, job_lock = self._get_job(job_id)
+        if job is None:
+            return
+        with job_lock:
             self._complete_job_locked(job)
 
     def _complete_job_locked(self, job: Dict[str, Any]) -> None:
@@ -308,6 +485,7 @@ _coordinator: Optional[MappingGenerationCoordinator] = None
 def get_mapping_generation_coordinator() -> MappingGenerationCoordinator:
     global _coordinator
     if _coordinator is None:
-        _coordinator = MappingGenerationCoordinator()
+        max_workers = current_app.config.get("MAPPING_GENERATION_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+        _coordinator = MappingGenerationCoordinator(max_workers=max_workers)
     return _coordinator
 
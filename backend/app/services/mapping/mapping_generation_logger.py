@@ -2,18 +2,47 @@
 
 from __future__ import annotations
 
-import json
-from dataclasses import asdict, dataclass, field
+import mmap
+import os
 import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import orjson
 
 from ...utils.logging import get_logger
-from ...utils.storage_paths import run_directory
+from ...utils.storage_paths import atomic_write_bytes, run_directory
 from ...utils.time import isoformat, utc_now
+from .mapping_payload_refs import PayloadInterner, resolve_ref
+
+LOG_FILENAME = "mapping_generation_logs.jsonl"
+# Pre-JSONL snapshot file; migrated to the event log on first load.
+LEGACY_LOG_FILENAME = "mapping_generation_logs.json"
+# Compact once the event log holds more than this many events per entry.
+COMPACTION_RATIO = 4
+MAX_OPEN_HANDLES = 32
+
+
+@contextmanager
+def _mapped(path: Path) -> Iterator[memoryview]:
+    """Map ``path`` read-only so orjson parses straight from the page cache."""
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            # mmap rejects empty files.
+            yield memoryview(b"")
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationLog:
     """Log entry for mapping generation."""
     run_id: str
@@ -28,14 +57,43 @@ class GenerationLog:
     first_valid_mapping_index: Optional[int] = None
     validation_logs: List[Dict[str, Any]] = field(default_factory=list)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view; unlike ``asdict`` it does not deep-copy ``details``."""
+        return {
+            "run_id": self.run_id,
+            "question_id": self.question_id,
+            "question_number": self.question_number,
+            "timestamp": self.timestamp,
+            "stage": self.stage,
+            "status": self.status,
+            "details": self.details,
+            "mappings_generated": self.mappings_generated,
+            "mappings_validated": self.mappings_validated,
+            "first_valid_mapping_index": self.first_valid_mapping_index,
+            "validation_logs": list(self.validation_logs),
+        }
+
 
 class MappingGenerationLogger:
-    """Logger for mapping generation operations."""
+    """Logger for mapping generation operations.
+
+    Events are appended to a per-run JSONL file and folded into ``GenerationLog``
+    entries on load; the file is compacted to one snapshot line per entry once it
+    grows past ``COMPACTION_RATIO`` events per entry. Compacted snapshots reference
+    repeated ``details`` payloads from a leading ``payloads`` line.
+    """
     
     def __init__(self):
         self.logger = get_logger(__name__)
-        self._lock = threading.RLock()
+        # One lock per run so concurrent runs log in parallel; ``_locks_guard`` only
+        # protects creating those locks and the shared handle LRU.
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
         self._logs: Dict[str, List[GenerationLog]] = {}
+        # Generation entry per question for each loaded run, so events skip a scan of ``_logs``.
+        self._gen_by_qid: Dict[str, Dict[int, GenerationLog]] = {}
+        self._event_counts: Dict[str, int] = {}
+        self._handles: "OrderedDict[str, BinaryIO]" = OrderedDict()
     
     def log_generation(
         self,
@@ -47,34 +105,19 @@ class MappingGenerationLogger:
         mappings_generated: int = 0
     ):
         """Log a generation event."""
-        with self._lock:
+        with self._run_lock(run_id):
             logs = self._ensure_loaded_locked(run_id)
-            existing = next(
-                (log for log in logs if log.question_id == question_id and log.stage == "generation"),
-                None,
-            )
-
-            timestamp = isoformat(utc_now())
-
-            if existing:
-                existing.timestamp = timestamp
-                existing.status = status
-                existing.details = details
-                existing.mappings_generated = mappings_generated
-            else:
-                log = GenerationLog(
-                    run_id=run_id,
-                    question_id=question_id,
-                    question_number=question_number,
-                    timestamp=timestamp,
-                    stage="generation",
-                    status=status,
-                    details=details,
-                    mappings_generated=mappings_generated,
-                )
-                logs.append(log)
-
-            self._save_logs_locked(run_id)
+            event = {
+                "event": "generation",
+                "question_id": question_id,
+                "question_number": question_number,
+                "timestamp": isoformat(utc_now()),
+                "status": status,
+                "details": details,
+                "mappings_generated": mappings_generated,
+            }
+            self._apply_event(run_id, logs, self._gen_by_qid[run_id], event)
+            self._append_event_locked(run_id, event)
     
     def log_validation(
         self,
@@ -86,111 +129,300 @@ class MappingGenerationLogger:
         details: Dict[str, Any]
     ):
         """Log a validation event."""
-        with self._lock:
+        with self._run_lock(run_id):
             logs = self._ensure_loaded_locked(run_id)
-            generation_log = next(
-                (log for log in logs if log.question_id == question_id and log.stage == "generation"),
-                None,
-            )
+            event = {
+                "event": "validation",
+                "question_id": question_id,
+                "question_number": question_number,
+                "mapping_index": mapping_index,
+                "timestamp": isoformat(utc_now()),
+                "status": status,
+                "details": details,
+            }
+            self._apply_event(run_id, logs, self._gen_by_qid[run_id], event)
+            self._append_event_locked(run_id, event)
 
+    def log_validation_batch(
+        self,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        entries: List[Dict[str, Any]],
+    ) -> None:
+        """Log several validation events (``mapping_index``, ``status``, ``details``) with one write."""
+        if not entries:
+            return
+        with self._run_lock(run_id):
+            logs = self._ensure_loaded_locked(run_id)
             timestamp = isoformat(utc_now())
+            events = [
+                {
+                    "event": "validation",
+                    "question_id": question_id,
+                    "question_number": question_number,
+                    "mapping_index": entry["mapping_index"],
+                    "timestamp": timestamp,
+                    "status": entry["status"],
+                    "details": entry["details"],
+                }
+                for entry in entries
+            ]
+            for event in events:
+                self._apply_event(run_id, logs, self._gen_by_qid[run_id], event)
+            self._append_events_locked(run_id, events)
+
+    def flush(self, run_id: Optional[str] = None) -> None:
+        """Force appended events for one run (or all runs) to stable storage."""
+        if run_id is None:
+            with self._locks_guard:
+                run_ids = list(self._handles)
+        else:
+            run_ids = [run_id]
+        for flush_run_id in run_ids:
+            with self._run_lock(flush_run_id):
+                handle = self._handles.get(flush_run_id)
+                if handle is not None:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+
+    def _run_lock(self, run_id: str) -> threading.RLock:
+        lock = self._locks.get(run_id)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(run_id, threading.RLock())
+        return lock
+
+    @staticmethod
+    def _apply_event(
+        run_id: str,
+        logs: List[GenerationLog],
+        generation_index: Dict[int, GenerationLog],
+        event: Dict[str, Any],
+    ) -> None:
+        """Fold one logged event into the in-memory entries for a run."""
+        kind = event.get("event")
+        if kind == "snapshot":
+            log = GenerationLog(**event["log"])
+            logs.append(log)
+            if log.stage == "generation":
+                generation_index.setdefault(log.question_id, log)
+            return
 
+        question_id = event["question_id"]
+        generation_log = generation_index.get(question_id)
+
+        if kind == "generation":
+            if generation_log:
+                generation_log.timestamp = event["timestamp"]
+                generation_log.status = event["status"]
+                generation_log.details = event["details"]
+                generation_log.mappings_generated = event["mappings_generated"]
+            else:
+                generation_log = GenerationLog(
+                    run_id=run_id,
+                    question_id=question_id,
+                    question_number=event["question_number"],
+                    timestamp=event["timestamp"],
+                    stage="generation",
+                    status=event["status"],
+                    details=event["details"],
+                    mappings_generated=event["mappings_generated"],
+                )
+                logs.append(generation_log)
+                generation_index[question_id] = generation_log
+            return
+
+        if kind == "validation":
+            status = event["status"]
+            mapping_index = event["mapping_index"]
             entry = {
                 "mapping_index": mapping_index,
-                "timestamp": timestamp,
+                "timestamp": event["timestamp"],
                 "status": status,
-                "details": details,
+                "details": event["details"],
             }
-
             if generation_log:
                 generation_log.mappings_validated += 1
                 generation_log.validation_logs.append(entry)
                 if status == "success" and generation_log.first_valid_mapping_index is None:
                     generation_log.first_valid_mapping_index = mapping_index
             else:
-                log = GenerationLog(
-                    run_id=run_id,
-                    question_id=question_id,
-                    question_number=question_number,
-                    timestamp=timestamp,
-                    stage="validation",
-                    status=status,
-                    details=details,
-                    mappings_validated=1,
-                    first_valid_mapping_index=mapping_index if status == "success" else None,
-                    validation_logs=[entry],
+                logs.append(
+                    GenerationLog(
+                        run_id=run_id,
+                        question_id=question_id,
+                        question_number=event["question_number"],
+                        timestamp=event["timestamp"],
+                        stage="validation",
+                        status=status,
+                        details=event["details"],
+                        mappings_validated=1,
+                        first_valid_mapping_index=mapping_index if status == "success" else None,
+                        validation_logs=[entry],
+                    )
                 )
-                logs.append(log)
-
-            self._save_logs_locked(run_id)
 
     def _ensure_loaded_locked(self, run_id: str) -> List[GenerationLog]:
         if run_id in self._logs:
             return self._logs[run_id]
 
+        logs: List[GenerationLog] = []
+        generation_index: Dict[int, GenerationLog] = {}
+        payloads: Dict[str, Any] = {}
+        events = 0
+        migrate_legacy = False
         try:
             run_dir = run_directory(run_id)
-            log_file = run_dir / "mapping_generation_logs.json"
-
-            if not log_file.exists():
-                self._logs[run_id] = []
-                return self._logs[run_id]
+            log_file = run_dir / LOG_FILENAME
+            legacy_file = run_dir / LEGACY_LOG_FILENAME
 
-            log_data = json.loads(log_file.read_text(encoding="utf-8"))
-            logs = [GenerationLog(**log_dict) for log_dict in log_data.get("logs", [])]
-            self._logs[run_id] = logs
-            return logs
+            if log_file.exists():
+                with _mapped(log_file) as view:
+                    content = view.obj
+                    start, size = 0, len(view)
+                    while start < size:
+                        stop = content.find(b"\n", start)
+                        if stop == -1:
+                            stop = size
+                        line_start, start = start, stop + 1
+                        if stop == line_start:
+                            continue
+                        try:
+                            # Slices of the mapping parse without copying each line.
+                            event = orjson.loads(view[line_start:stop])
+                        except orjson.JSONDecodeError:
+                            # A torn trailing line from an interrupted append; skip it.
+                            continue
+                        if event.get("event") == "payloads":
+                            payloads.update(event["payloads"])
+                            continue
+                        if event.get("event") == "snapshot" and payloads:
+                            self._resolve_snapshot(event["log"], payloads)
+                        self._apply_event(run_id, logs, generation_index, event)
+                        events += 1
+            elif legacy_file.exists():
+                with _mapped(legacy_file) as view:
+                    log_data = orjson.loads(view)
+                for log_dict in log_data.get("logs", []):
+                    self._apply_event(run_id, logs, generation_index, {"event": "snapshot", "log": log_dict})
+                migrate_legacy = bool(logs)
         except Exception as e:
             self.logger.warning(f"Failed to load mapping generation logs: {e}")
-            self._logs[run_id] = []
-            return self._logs[run_id]
+            logs = []
+            generation_index = {}
+            events = 0
 
-    def _save_logs_locked(self, run_id: str) -> None:
-        try:
-            run_dir = run_directory(run_id)
-            log_file = run_dir / "mapping_generation_logs.json"
+        self._logs[run_id] = logs
+        self._gen_by_qid[run_id] = generation_index
+        self._event_counts[run_id] = events
+        if migrate_legacy:
+            self._compact_locked(run_id)
+        return logs
 
-            logs = self._logs.get(run_id, [])
-            log_data = {
-                "run_id": run_id,
-                "generated_at": isoformat(utc_now()),
-                "logs": [asdict(log) for log in logs],
-            }
+    @staticmethod
+    def _resolve_snapshot(log_dict: Dict[str, Any], payloads: Dict[str, Any]) -> None:
+        log_dict["details"] = resolve_ref(log_dict.get("details"), payloads)
+        for entry in log_dict.get("validation_logs") or []:
+            entry["details"] = resolve_ref(entry.get("details"), payloads)
 
-            log_file.parent.mkdir(parents=True, exist_ok=True)
-            log_file.write_text(json.dumps(log_data, indent=2), encoding="utf-8")
+    def _append_event_locked(self, run_id: str, event: Dict[str, Any]) -> None:
+        self._append_events_locked(run_id, [event])
+
+    def _append_events_locked(self, run_id: str, events: List[Dict[str, Any]]) -> None:
+        try:
+            handle = self._handle_locked(run_id)
+            handle.write(b"".join(orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS) + b"\n" for event in events))
+            # Hand the lines to the OS so reloads see them; fsync is left to ``flush``.
+            handle.flush()
+            self._event_counts[run_id] = self._event_counts.get(run_id, 0) + len(events)
+            if self._event_counts[run_id] > COMPACTION_RATIO * max(len(self._logs.get(run_id, [])), 1):
+                self._compact_locked(run_id)
         except Exception as e:
             self.logger.warning(f"Failed to save mapping generation logs: {e}")
+
+    def _handle_locked(self, run_id: str) -> BinaryIO:
+        with self._locks_guard:
+            handle = self._handles.get(run_id)
+            if handle is not None:
+                self._handles.move_to_end(run_id)
+                return handle
+
+        handle = (run_directory(run_id) / LOG_FILENAME).open("ab")
+        with self._locks_guard:
+            self._handles[run_id] = handle
+            excess = len(self._handles) - MAX_OPEN_HANDLES
+            for stale_run_id in list(self._handles):
+                if excess <= 0:
+                    break
+                stale_lock = self._locks.get(stale_run_id)
+                # Only close handles of runs no other thread is writing; busy ones stay open.
+                if stale_run_id == run_id or stale_lock is None or not stale_lock.acquire(blocking=False):
+                    continue
+                try:
+                    self._handles.pop(stale_run_id).close()
+                    excess -= 1
+                finally:
+                    stale_lock.release()
+        return handle
+
+    def _close_handle_locked(self, run_id: str) -> None:
+        with self._locks_guard:
+            handle = self._handles.pop(run_id, None)
+        if handle is not None:
+            handle.close()
+
+    def _compact_locked(self, run_id: str) -> None:
+        """Rewrite the event log as one snapshot line per entry."""
+        try:
+            logs = self._logs.get(run_id, [])
+            interner = PayloadInterner()
+            snapshots = []
+            for log in logs:
+                log_dict = log.to_dict()
+                log_dict["details"] = interner.ref(log.details)
+                log_dict["validation_logs"] = [
+                    {**entry, "details": interner.ref(entry.get("details"))} for entry in log.validation_logs
+                ]
+                snapshots.append(
+                    orjson.dumps({"event": "snapshot", "log": log_dict}, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+                )
+            header = orjson.dumps(
+                {"event": "payloads", "payloads": interner.payloads}, option=orjson.OPT_NON_STR_KEYS
+            ) + b"\n"
+            self._close_handle_locked(run_id)
+            atomic_write_bytes(run_directory(run_id) / LOG_FILENAME, header + b"".join(snapshots))
+            self._event_counts[run_id] = len(logs)
+        except Exception as e:
+            self.logger.warning(f"Failed to compact mapping generation logs: {e}")
     
     def get_logs(self, run_id: str) -> List[Dict[str, Any]]:
         """Get logs for a run as dictionaries."""
-        with self._lock:
+        with self._run_lock(run_id):
             logs = self._ensure_loaded_locked(run_id)
-            return [asdict(log) for log in logs]
+            return [log.to_dict() for log in logs]
     
     def get_question_logs(self, run_id: str, question_id: int) -> List[Dict[str, Any]]:
         """Get logs for a specific question."""
-        with self._lock:
+        with self._run_lock(run_id):
             logs = self._ensure_loaded_locked(run_id)
             question_logs = [log for log in logs if log.question_id == question_id]
-            return [asdict(log) for log in question_logs]
+            return [log.to_dict() for log in question_logs]
 
     def load_logs(self, run_id: str, *, force: bool = False) -> List[GenerationLog]:
         """Public loader that optionally forces a refresh from disk."""
-        with self._lock:
+        with self._run_lock(run_id):
             if force and run_id in self._logs:
                 del self._logs[run_id]
+                self._gen_by_qid.pop(run_id, None)
+                self._close_handle_locked(run_id)
             return list(self._ensure_loaded_locked(run_id))
 
 
-# Global logger instance
-_mapping_logger = None
+# Global logger instance, built at import so threads never race to create it
+_mapping_logger = MappingGenerationLogger()
 
 
 def get_mapping_logger() -> MappingGenerationLogger:
     """Get global mapping generation logger."""
-    global _mapping_logger
-    if _mapping_logger is None:
-        _mapping_logger = MappingGenerationLogger()
     return _mapping_logger
-
@@ -0,0 +1,37 @@
+"""Content-addressed side tables for payloads repeated across mapping artefacts."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict
+
+import orjson
+
+REF_KEY = "$ref"
+
+
+class PayloadInterner:
+    """Collect dict payloads by content hash and hand out ``{"$ref": key}`` stand-ins.
+
+    Identical validation details (the same rubric reasoning repeated across failed
+    candidates, or a validation result echoed as a summary) are then serialised once.
+    """
+
+    def __init__(self) -> None:
+        self.payloads: Dict[str, Any] = {}
+
+    def ref(self, payload: Any) -> Any:
+        # Small or non-dict payloads are cheaper inline than as a reference.
+        if not isinstance(payload, dict) or not payload:
+            return payload
+        canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        key = hashlib.blake2b(canonical, digest_size=12).hexdigest()
+        self.payloads.setdefault(key, payload)
+        return {REF_KEY: key}
+
+
+def resolve_ref(value: Any, payloads: Dict[str, Any]) -> Any:
+    """Return the payload behind a ``$ref`` stand-in, or ``value`` unchanged."""
+    if isinstance(value, dict) and len(value) == 1 and REF_KEY in value:
+        return payloads.get(value[REF_KEY], value)
+    return value
@@ -2,21 +2,117 @@
 
 from __future__ import annotations
 
-import json
 import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
 
 from ...models import QuestionManipulation
 from ...utils.logging import get_logger
 from ...utils.storage_paths import run_directory
 from ...utils.time import isoformat, utc_now
+from .mapping_file_writer import FileSignature, file_signature, get_mapping_file_writer
+from .mapping_payload_refs import PayloadInterner, resolve_ref
+
+# Number of runs whose parsed staging state stays in memory.
+STAGING_CACHE_SIZE = 32
+
+# Scalar fields shared by staged entries; on disk each becomes one parallel list
+# under "columns" instead of a key repeated in every question object.
+STAGED_COLUMNS = (
+    "question_id",
+    "question_number",
+    "sequence_index",
+    "source_identifier",
+    "status",
+    "job_id",
+    "generated_count",
+    "validated_count",
+    "updated_at",
+)
+
+
+def _same_content(existing: Dict[str, Any], entry: Dict[str, Any]) -> bool:
+    """Compare two staged entries ignoring their ``updated_at`` stamps."""
+    if existing.keys() != entry.keys():
+        return False
+    return all(existing[key] == value for key, value in entry.items() if key != "updated_at")
+
+
+def _encode_payload(payload: Dict[str, Any], interner: PayloadInterner) -> Dict[str, Any]:
+    # The validation summary repeats the successful log's result, so both become refs.
+    if "validation_summary" in payload:
+        payload["validation_summary"] = interner.ref(payload["validation_summary"])
+    logs = payload.get("validation_logs")
+    if logs:
+        payload["validation_logs"] = [
+            {**log, "validation_result": interner.ref(log["validation_result"])}
+            if isinstance(log, dict) and "validation_result" in log
+            else log
+            for log in logs
+        ]
+    return payload
+
+
+def _decode_payload(payload: Dict[str, Any], shared: Dict[str, Any]) -> Dict[str, Any]:
+    if "validation_summary" in payload:
+        payload["validation_summary"] = resolve_ref(payload["validation_summary"], shared)
+    for log in payload.get("validation_logs") or []:
+        if isinstance(log, dict) and "validation_result" in log:
+            log["validation_result"] = resolve_ref(log["validation_result"], shared)
+    return payload
+
+
+def _encode_questions(questions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Split keyed entries into parallel columns plus per-entry payloads of the remaining keys."""
+    keys = list(questions)
+    entries = list(questions.values())
+    fields = [name for name in STAGED_COLUMNS if all(name in entry for entry in entries)]
+    columns = {name: [entry[name] for entry in entries] for name in fields}
+    column_set = set(fields)
+    interner = PayloadInterner()
+    payloads = [
+        _encode_payload({k: v for k, v in entry.items() if k not in column_set}, interner) for entry in entries
+    ]
+    return {
+        "question_keys": keys,
+        "columns": columns,
+        "payloads": payloads,
+        "shared_payloads": interner.payloads,
+    }
+
+
+def _decode_questions(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Rebuild the question-keyed entries written by ``_encode_questions``."""
+    if "columns" not in data:
+        # Files written before the columnar layout store entries directly.
+        return data.get("questions") or {}
+    keys: List[str] = data.get("question_keys") or []
+    columns: Dict[str, List[Any]] = data["columns"]
+    payloads: List[Dict[str, Any]] = data.get("payloads") or [{} for _ in keys]
+    shared: Dict[str, Any] = data.get("shared_payloads") or {}
+    questions: Dict[str, Dict[str, Any]] = {}
+    for index, key in enumerate(keys):
+        entry = {name: values[index] for name, values in columns.items()}
+        entry.update(_decode_payload(payloads[index], shared) if shared else payloads[index])
+        questions[key] = entry
+    return questions
 
 
 class MappingStagingService:
     """Persist and manage staged mappings prior to final promotion."""
 
-    _lock = threading.RLock()
+    # Updates for one run are serialised by that run's lock; ``_guard`` only protects
+    # creating run locks and the cache's LRU bookkeeping.
+    _locks: Dict[str, threading.RLock] = {}
+    _guard = threading.Lock()
+    # Parsed staging files keyed by path and shared by every instance, so each
+    # update touches the file only for the (background) write. Entries carry the
+    # file signature they were read at, so writes from other worker processes
+    # invalidate them.
+    _cache: "OrderedDict[str, Tuple[Optional[FileSignature], Dict[str, Any]]]" = OrderedDict()
 
     def __init__(self) -> None:
         self.logger = get_logger(__name__)
@@ -25,27 +121,10 @@ class MappingStagingService:
     # Public API
     # ------------------------------------------------------------------
     def load(self, run_id: str) -> Dict[str, Any]:
-        with self._lock:
-            path = self._stage_path(run_id)
-            if not path.exists():
-                return {
-                    "run_id": run_id,
-                    "questions": {},
-                    "updated_at": None,
-                }
-
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError as exc:  # pragma: no cover - defensive
-                self.logger.warning("Failed to parse staging file", extra={"run_id": run_id, "error": str(exc)})
-                return {
-                    "run_id": run_id,
-                    "questions": {},
-                    "updated_at": None,
-                }
-
-            data.setdefault("questions", {})
-            return data
+        """Return a snapshot of the staged state; the question map is safe to iterate."""
+        with self._run_lock(run_id):
+            data = self._load_cached(run_id)
+            return {**data, "questions": dict(data["questions"])}
 
     def stage_valid_mapping(
         self,
@@ -57,11 +136,18 @@ class MappingStagingService:
         validation_logs: Iterable[Dict[str, Any]],
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
+        """Stage a validated mapping.
+
+        ``substring_mapping`` must already be JSON-safe (the generator passes the
+        ``_to_json_safe`` output); it is copied shallowly, so callers must not mutate
+        its nested values afterwards.
+        """
         metadata = metadata or {}
         logs_list = list(validation_logs or [])
         summary = self._extract_validation_summary(logs_list)
 
-        mapping_payload = json.loads(json.dumps(substring_mapping))
+        # Only top-level keys are added below, so a shallow copy isolates the caller's dict.
+        mapping_payload = dict(substring_mapping)
         if summary:
             mapping_payload.setdefault("validated", True)
             if "confidence" in summary:
@@ -141,34 +227,113 @@ class MappingStagingService:
         self._persist_entry(run_id, question.id, entry)
 
     def mark_promoted(self, run_id: str, question_ids: Iterable[int]) -> None:
-        with self._lock:
-            data = self.load(run_id)
+        with self._run_lock(run_id):
+            data = self._load_cached(run_id)
+            questions = data["questions"]
+            now = isoformat(utc_now())
             updated = False
             for qid in question_ids:
-                entry = data.get("questions", {}).get(str(qid))
+                entry = questions.get(str(qid))
                 if not entry:
                     continue
-                entry["status"] = "finalized"
-                entry["finalized_at"] = isoformat(utc_now())
+                # Replace rather than mutate: earlier load() snapshots share entry dicts.
+                questions[str(qid)] = {**entry, "status": "finalized", "finalized_at": now}
                 updated = True
             if updated:
-                self._write(run_id, data)
+                self._write(run_id, data, now)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
     def _persist_entry(self, run_id: str, question_id: int, entry: Dict[str, Any]) -> None:
-        with self._lock:
-            data = self.load(run_id)
-            data.setdefault("questions", {})[str(question_id)] = entry
-            self._write(run_id, data)
+        with self._run_lock(run_id):
+            data = self._load_cached(run_id)
+            existing = data["questions"].get(str(question_id))
+            if existing is not None and _same_content(existing, entry):
+                # Re-staging identical content would only bump timestamps.
+                return
+            data["questions"][str(question_id)] = entry
+            self._write(run_id, data, entry["updated_at"])
+
+    def _run_lock(self, run_id: str) -> threading.RLock:
+        lock = self._locks.get(run_id)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(run_id, threading.RLock())
+        return lock
 
-    def _write(self, run_id: str, data: Dict[str, Any]) -> None:
+    def _load_cached(self, run_id: str) -> Dict[str, Any]:
+        """Return the shared parsed staging state for ``run_id``; callers hold its run lock."""
         path = self._stage_path(run_id)
-        path.parent.mkdir(parents=True, exist_ok=True)
+        key = str(path)
+        with self._guard:
+            cached = self._cache.get(key)
+        if cached is not None and self._is_current(path, cached[0]):
+            with self._guard:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+            return cached[1]
+
+        # Evicting a run another thread still holds is safe: its write is queued
+        # before the run lock is released, and re-reads see the queued payload.
+        # The signature is taken before reading, so a write racing the read only
+        # causes one more re-read later.
+        signature = file_signature(path)
+        data = self._read(run_id, path)
+        with self._guard:
+            self._cache[key] = (signature, data)
+            while len(self._cache) > STAGING_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return data
+
+    def _is_current(self, path: Path, signature: Optional[FileSignature]) -> bool:
+        """Whether cached state read at ``signature`` still matches what is on disk.
+
+        A write still queued here is newer than the file, and a file last replaced by
+        this process's writer holds the cached state; anything else means another
+        worker process rewrote it.
+        """
+        writer = get_mapping_file_writer()
+        if writer.pending_payload(path) is not None:
+            return True
+        current = file_signature(path)
+        return current == signature or (current is not None and current == writer.written_signature(path))
+
+    def _read(self, run_id: str, path: Path) -> Dict[str, Any]:
+        # A write still queued on the background writer is newer than the file on disk.
+        payload = get_mapping_file_writer().pending_payload(path)
+        if payload is None and not path.exists():
+            return {
+                "run_id": run_id,
+                "questions": {},
+                "updated_at": None,
+            }
+
+        try:
+            data = orjson.loads(payload if payload is not None else path.read_bytes())
+        except orjson.JSONDecodeError as exc:  # pragma: no cover - defensive
+            self.logger.warning("Failed to parse staging file", extra={"run_id": run_id, "error": str(exc)})
+            return {
+                "run_id": run_id,
+                "questions": {},
+                "updated_at": None,
+            }
+
+        return {
+            "run_id": data.get("run_id", run_id),
+            "questions": _decode_questions(data),
+            "updated_at": data.get("updated_at"),
+        }
+
+    def _write(self, run_id: str, data: Dict[str, Any], now: str) -> None:
+        """Queue ``data`` for disk, stamped with the caller's ``now`` so one update shares one timestamp."""
         data["run_id"] = run_id
-        data["updated_at"] = isoformat(utc_now())
-        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        data["updated_at"] = now
+        payload = {"run_id": run_id, "updated_at": data["updated_at"], **_encode_questions(data["questions"])}
+        get_mapping_file_writer().enqueue(
+            self._stage_path(run_id),
+            orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+        )
 
     def _stage_path(self, run_id: str) -> Path:
         return run_directory(run_id) / "mapping_generation_staged.json"
@@ -2,17 +2,51 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-
-from .prompt_templates import (
-    MCQ_REPLACEMENT_PROMPT,
-    TRUE_FALSE_REPLACEMENT_PROMPT,
-    LONG_FORM_REPLACEMENT_PROMPT,
+import functools
+import string
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Prompt templates are imported, and the default strategies compiled, on first use
+# (see ``_default_strategies``) rather than when the mapping package is imported.
+DEFAULT_STRATEGY_NAMES = (
+    "MCQ_REPLACEMENT_STRATEGY",
+    "TRUE_FALSE_REPLACEMENT_STRATEGY",
+    "LONG_FORM_REPLACEMENT_STRATEGY",
 )
 
 
-@dataclass
+def _compile_template(template: str) -> Callable[[Dict[str, Any]], str]:
+    """Parse a ``str.format`` template once into a renderer over a context dict.
+
+    Adjacent literal chunks (``Formatter.parse`` splits at every escaped brace) are
+    merged, so rendering alternates one literal with one field lookup.
+    """
+    literals: List[str] = [""]
+    fields: List[str] = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+            # Anything beyond plain ``{name}`` fields keeps the stock formatter.
+            return lambda context: template.format(**context)
+        literals[-1] += literal
+        if field_name is not None:
+            fields.append(field_name)
+            literals.append("")
+    head, tails = literals[0], tuple(zip(fields, literals[1:]))
+
+    def render(context: Dict[str, Any]) -> str:
+        return head + "".join([str(context[name]) + tail for name, tail in tails])
+
+    return render
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_option_items(items: Tuple[Tuple[str, str], ...]) -> str:
+    # Format as "Key: Value" pairs; items arrive already stringified
+    return ", ".join(f"{key}: {value}" for key, value in items)
+
+
+@dataclass(slots=True)
 class MappingStrategy:
     """Strategy definition for mapping generation."""
     name: str
@@ -20,73 +54,98 @@ class MappingStrategy:
     reasoning_steps: List[str]
     prompt_template: str
     validation_criteria: Dict[str, Any]
-
-
-# Default Strategy: "replacement"
-MCQ_REPLACEMENT_STRATEGY = MappingStrategy(
-    name="replacement",
-    question_types=["mcq_single", "mcq_multi"],
-    reasoning_steps=[
-        "Identify key terms in question stem that affect answer",
-        "Find replacement that changes answer to target wrong option",
-        "Ensure replacement is semantically meaningful",
-        "Verify replacement causes answer deviation"
-    ],
-    prompt_template=MCQ_REPLACEMENT_PROMPT,
-    validation_criteria={
-        "target_wrong_answer_required": True,
-        "answer_deviation_required": True
+    _render: Callable[[Dict[str, Any]], str] = field(init=False, repr=False, compare=False)
+    _reasoning_text: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._render = _compile_template(self.prompt_template)
+        self._reasoning_text = "\n".join(f"- {step}" for step in self.reasoning_steps)
+
+
+@functools.cache
+def _default_strategies() -> Dict[str, MappingStrategy]:
+    from .prompt_templates import (
+        LONG_FORM_REPLACEMENT_PROMPT,
+        MCQ_REPLACEMENT_PROMPT,
+        TRUE_FALSE_REPLACEMENT_PROMPT,
+    )
+
+    # Default Strategy: "replacement"
+    MCQ_REPLACEMENT_STRATEGY = MappingStrategy(
+        name="replacement",
+        question_types=["mcq_single", "mcq_multi"],
+        reasoning_steps=[
+            "Identify key terms in question stem that affect answer",
+            "Find replacement that changes answer to target wrong option",
+            "Ensure replacement is semantically meaningful",
+            "Verify replacement causes answer deviation"
+        ],
+        prompt_template=MCQ_REPLACEMENT_PROMPT,
+        validation_criteria={
+            "target_wrong_answer_required": True,
+            "answer_deviation_required": True
+        }
+    )
+
+    TRUE_FALSE_REPLACEMENT_STRATEGY = MappingStrategy(
+        name="replacement",
+        question_types=["true_false"],
+        reasoning_steps=[
+            "Identify terms that determine True/False",
+            "Replace to flip the answer",
+            "Ensure replacement is natural"
+        ],
+        prompt_template=TRUE_FALSE_REPLACEMENT_PROMPT,
+        validation_criteria={
+            "answer_flip_required": True
+        }
+    )
+
+    LONG_FORM_REPLACEMENT_STRATEGY = MappingStrategy(
+        name="replacement",
+        question_types=["long_answer", "essay", "short_answer"],
+        reasoning_steps=[
+            "Identify key concepts in question",
+            "Replace to change question focus",
+            "Ensure deviation is verifiable",
+            "Verify replacement affects answer meaningfully"
+        ],
+        prompt_template=LONG_FORM_REPLACEMENT_PROMPT,
+        validation_criteria={
+            "verifiable_deviation_required": True
+        }
+    )
+
+    return {
+        "MCQ_REPLACEMENT_STRATEGY": MCQ_REPLACEMENT_STRATEGY,
+        "TRUE_FALSE_REPLACEMENT_STRATEGY": TRUE_FALSE_REPLACEMENT_STRATEGY,
+        "LONG_FORM_REPLACEMENT_STRATEGY": LONG_FORM_REPLACEMENT_STRATEGY,
     }
-)
 
-TRUE_FALSE_REPLACEMENT_STRATEGY = MappingStrategy(
-    name="replacement",
-    question_types=["true_false"],
-    reasoning_steps=[
-        "Identify terms that determine True/False",
-        "Replace to flip the answer",
-        "Ensure replacement is natural"
-    ],
-    prompt_template=TRUE_FALSE_REPLACEMENT_PROMPT,
-    validation_criteria={
-        "answer_flip_required": True
-    }
-)
 
-LONG_FORM_REPLACEMENT_STRATEGY = MappingStrategy(
-    name="replacement",
-    question_types=["long_answer", "essay", "short_answer"],
-    reasoning_steps=[
-        "Identify key concepts in question",
-        "Replace to change question focus",
-        "Ensure deviation is verifiable",
-        "Verify replacement affects answer meaningfully"
-    ],
-    prompt_template=LONG_FORM_REPLACEMENT_PROMPT,
-    validation_criteria={
-        "verifiable_deviation_required": True
-    }
-)
+def __getattr__(name: str) -> Any:
+    # PEP 562: the strategy constants stay importable by name but are built lazily.
+    if name in DEFAULT_STRATEGY_NAMES:
+        return _default_strategies()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class StrategyRegistry:
     """Registry for mapping strategies."""
     
     def __init__(self):
-        self.strategies: Dict[str, MappingStrategy] = {}
+        self.strategies: Dict[Tuple[str, str], MappingStrategy] = {}
         self._register_default_strategies()
     
     def _register_default_strategies(self):
         """Register default strategies."""
-        self.register_strategy(MCQ_REPLACEMENT_STRATEGY)
-        self.register_strategy(TRUE_FALSE_REPLACEMENT_STRATEGY)
-        self.register_strategy(LONG_FORM_REPLACEMENT_STRATEGY)
+        for strategy in _default_strategies().values():
+            self.register_strategy(strategy)
     
     def register_strategy(self, strategy: MappingStrategy):
         """Register a strategy."""
         for question_type in strategy.question_types:
-            key = f"{strategy.name}:{question_type}"
-            self.strategies[key] = strategy
+            self.strategies[(strategy.name, question_type)] = strategy
     
     def get_strategy(
         self, 
@@ -94,8 +153,7 @@ class StrategyRegistry:
         strategy_name: str = "replacement"
     ) -> Optional[MappingStrategy]:
         """Get strategy for question type and strategy name."""
-        key = f"{strategy_name}:{question_type}"
-        return self.strategies.get(key)
+        return self.strategies.get((strategy_name, question_type))
     
     def _format_options(self, options: Dict[str, Any] | None) -> str:
         """Convert options dictionary to formatted string for prompt template."""
@@ -105,15 +163,12 @@ class StrategyRegistry:
         if not isinstance(options, dict):
             return str(options)
         
-        # Format as "Key: Value" pairs, ensuring all keys are strings
-        formatted_pairs = []
-        for key, value in options.items():
-            # Convert key to string to handle any non-string keys
-            key_str = str(key)
-            value_str = str(value) if value is not None else ""
-            formatted_pairs.append(f"{key_str}: {value_str}")
-        
-        return ", ".join(formatted_pairs)
+        # Retries rebuild prompts from the same options, so memoize on the ordered
+        # items as text: equal-but-different values such as 1 and True would otherwise
+        # share an entry, and unhashable values need no special case.
+        return _format_option_items(
+            tuple((str(key), "" if value is None else str(value)) for key, value in options.items())
+        )
     
     def build_prompt(
         self, 
@@ -127,28 +182,25 @@ class StrategyRegistry:
         answer_guidance = question_data.get("answer_guidance") or ""
         retry_instructions = question_data.get("retry_instructions") or ""
 
-        return strategy.prompt_template.format(
-            question_index=question_data.get("question_number", ""),
-            latex_stem_text=question_data.get("latex_stem_text", ""),
-            gold_answer=question_data.get("gold_answer", ""),
-            question_type=question_data.get("question_type", ""),
-            options=self._format_options(question_data.get("options")),
-            k=k,
-            reasoning_steps="\n".join(f"- {step}" for step in strategy.reasoning_steps),
-            copyable_text=copyable_text,
-            prefix_note=prefix_note,
-            answer_guidance=answer_guidance,
-            retry_instructions=retry_instructions,
-        )
-
-
-# Global registry instance
-_strategy_registry = None
-
-
+        context = {
+            "question_index": question_data.get("question_number", ""),
+            "latex_stem_text": question_data.get("latex_stem_text", ""),
+            "gold_answer": question_data.get("gold_answer", ""),
+            "question_type": question_data.get("question_type", ""),
+            "options": self._format_options(question_data.get("options")),
+            "k": k,
+            "reasoning_steps": strategy._reasoning_text,
+            "copyable_text": copyable_text,
+            "prefix_note": prefix_note,
+            "answer_guidance": answer_guidance,
+            "retry_instructions": retry_instructions,
+        }
+        # Rendering is a join over precompiled template chunks, cheaper than any key
+        # built from the same stem and options would be, so prompts are not cached.
+        return strategy._render(context)
+
+
+@functools.cache
 def get_strategy_registry() -> StrategyRegistry:
-    """Get global strategy registry."""
-    global _strategy_registry
-    if _strategy_registry is None:
-        _strategy_registry = StrategyRegistry()
-    return _strategy_registry
+    """Get global strategy registry, built on first use."""
+    return StrategyRegistry()
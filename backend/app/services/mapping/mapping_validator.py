@@ -2,16 +2,168 @@
 
 from __future__ import annotations
 
+import array
 import asyncio
+import dataclasses
+import functools
+import hashlib
 import re
+import threading
 import time
 import unicodedata
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+import orjson
 
 from ...services.manipulation.substring_manipulator import SubstringManipulator
-from ...services.validation.gpt5_validation_service import GPT5ValidationService, ValidationResult
+from ...services.validation.gpt5_validation_service import (
+    VALIDATION_ERROR_NOTES,
+    GPT5ValidationService,
+    ValidationResult,
+)
 from ...utils.logging import get_logger
-from .gpt5_config import VALIDATION_TIMEOUT, API_TIMEOUT
+from .gpt5_config import VALIDATION_TIMEOUT, VALIDATION_MAX_CONCURRENT, VALIDATION_BATCH_PROMPT, API_TIMEOUT
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional, not available on Windows
+    uvloop = None  # type: ignore
+
+# Validation results remembered per validator for repeated (question, mapping) pairs.
+VALIDATION_CACHE_SIZE = 256
+# Static fields of a timed-out validation. Results are mutable downstream, so each
+# timeout gets its own copy via dataclasses.replace rather than this instance.
+_TIMEOUT_RESULT_TEMPLATE = ValidationResult(
+    is_valid=False,
+    confidence=0.0,
+    deviation_score=0.0,
+    reasoning="",
+    semantic_similarity=0.0,
+    factual_accuracy=False,
+    question_type_specific_notes="Timeout error",
+    gold_answer="",
+    test_answer="",
+    model_used="timeout",
+)
+
+_RE_LATEX_STRIP = re.compile(r"\\(?:textbf|textit|emph|text)\{([^}]*)\}")
+_RE_WS = re.compile(r"\s+")
+_RE_LAST_QUOTED = re.compile(r"'([^']+)'")
+_RE_ASCII_RUN = re.compile(r"[\x00-\x7f]+")
+
+
+def _is_nfkc(text: str) -> bool:
+    """Quick check that ``text`` is unchanged by NFKC (always true for ASCII)."""
+    return text.isascii() or unicodedata.is_normalized("NFKC", text)
+
+
+def _normalize_with_index(text: str) -> Tuple[str, Sequence[int]]:
+    """Return normalized text (NFKC) and index map to original positions.
+
+    Text that is already NFKC (including all ASCII) maps one-to-one through a
+    ``range``. Otherwise ASCII runs are copied in bulk and each remaining character is
+    normalized together with its trailing combining marks, so decomposed accents
+    compose as they would under whole-string NFKC; every output character maps to
+    the start of its cluster. The map is a compact ``array('i')``, not a list of ints.
+    """
+    if _is_nfkc(text):
+        return text, range(len(text))
+
+    pieces: List[str] = []
+    index_map = array.array("i")
+    pos, size = 0, len(text)
+    while pos < size:
+        if text[pos] < "\x80":
+            end = _RE_ASCII_RUN.match(text, pos).end()
+            if end < size and unicodedata.combining(text[end]):
+                # The last ASCII character is the base of a combining sequence.
+                end -= 1
+            if end > pos:
+                pieces.append(text[pos:end])
+                index_map.extend(range(pos, end))
+                pos = end
+                continue
+        end = pos + 1
+        while end < size and unicodedata.combining(text[end]):
+            end += 1
+        piece = unicodedata.normalize("NFKC", text[pos:end])
+        pieces.append(piece)
+        index_map.extend([pos] * len(piece))
+        pos = end
+    return "".join(pieces), index_map
+
+
+@functools.lru_cache(maxsize=32)
+def _search_index(text: str) -> Tuple[str, Sequence[int]]:
+    """Case-folded normalized ``text`` plus its index map.
+
+    Every mapping for a question is searched against the same question text, so the
+    text is normalized and folded once per text rather than once per mapping. Callers
+    must not mutate the returned map.
+    """
+    normalized, index_map = _normalize_with_index(text)
+    folded = normalized.casefold()
+    if len(folded) == len(normalized):
+        return folded, index_map
+    # Folding expanded some characters (e.g. "ß" -> "ss"); casefold is context-free,
+    # so folding per character rebuilds the same string with a matching map.
+    expanded = array.array("i")
+    for char, origin in zip(normalized, index_map):
+        expanded.extend([origin] * len(char.casefold()))
+    return folded, expanded
+
+
+@functools.lru_cache(maxsize=64)
+def _normalize_latex_text(text: str) -> str:
+    """Strip common LaTeX formatting commands and collapse whitespace.
+
+    Cached because every mapping for a question normalizes the same stem.
+    """
+    nested = False
+
+    def _unwrap(match: re.Match) -> str:
+        nonlocal nested
+        inner = match.group(1)
+        if "\\" in inner:
+            nested = True
+        return inner
+
+    # Remove common LaTeX commands in one pass; another pass only runs when an
+    # unwrapped body still holds a command (e.g. \emph{\textbf{x}}).
+    normalized = _RE_LATEX_STRIP.sub(_unwrap, text)
+    while nested:
+        nested = False
+        normalized = _RE_LATEX_STRIP.sub(_unwrap, normalized)
+    # Normalize whitespace
+    normalized = _RE_WS.sub(" ", normalized)
+    return normalized.strip()
+
+
+class _OptionsIndex(NamedTuple):
+    """Option keys and texts prepared once for repeated answer-token lookups."""
+    keys: FrozenSet[str]
+    # Lower-cased spellings (option texts, keys, "b.", "b)", "b:") -> option key.
+    lookup: Dict[str, str]
+
+
+# One long-lived event loop shared by every validator in the process, so validations
+# reuse a warm client instead of building a loop (and connection pool) per call, and
+# short-lived validators do not each leave a loop thread behind.
+_validation_loop: Optional[asyncio.AbstractEventLoop] = None
+_validation_loop_lock = threading.Lock()
+
+
+def _get_validation_loop() -> asyncio.AbstractEventLoop:
+    """Get the process-wide validation loop, starting its daemon thread on first use."""
+    global _validation_loop
+    with _validation_loop_lock:
+        if _validation_loop is None or _validation_loop.is_closed():
+            # Only the validators' own loop uses uvloop; the global policy is untouched.
+            loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="mapping-validator-loop", daemon=True).start()
+            _validation_loop = loop
+        return _validation_loop
 
 
 class MappingSuggestionError(ValueError):
@@ -29,7 +181,9 @@ class MappingValidator:
         self.logger = get_logger(__name__)
         self.manipulator = SubstringManipulator()
         self.validator = GPT5ValidationService()
-    
+        self._result_cache: "OrderedDict[bytes, ValidationResult]" = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+
     def validate_mapping_sequence(
         self,
         question_text: str,
@@ -42,28 +196,98 @@ class MappingValidator:
     ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
         """
         Validate mappings in order until first success.
+
+        Validations run concurrently (up to ``VALIDATION_MAX_CONCURRENT``) on the
+        shared background event loop, but results are consumed in mapping order: the lowest-index valid mapping
+        wins, later validations are cancelled, and the logs cover the same mappings a
+        sequential pass would have.
         
         Returns:
             Tuple of (first_valid_mapping, validation_logs)
         """
+        return asyncio.run_coroutine_threadsafe(
+            self._validate_mapping_sequence_async(
+                question_text=question_text,
+                question_type=question_type,
+                gold_answer=gold_answer,
+                options_data=options_data,
+                mappings=mappings,
+                run_id=run_id,
+                latex_text=latex_text,
+            ),
+            _get_validation_loop(),
+        ).result()
+
+    async def _validate_mapping_sequence_async(
+        self,
+        question_text: str,
+        question_type: str,
+        gold_answer: str,
+        options_data: Optional[Dict[str, str]],
+        mappings: List[Dict[str, Any]],
+        run_id: Optional[str] = None,
+        latex_text: Optional[str] = None,
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        semaphore = asyncio.Semaphore(VALIDATION_MAX_CONCURRENT)
+        # Read the wall clock once; log timestamps are offsets on the monotonic clock,
+        # so entries stay ordered even if the system clock is adjusted mid-batch.
+        batch_start = time.time()
+        mono_base = time.monotonic()
+        if VALIDATION_BATCH_PROMPT and len(mappings) > 1:
+            await self._prefetch_batch_results(
+                question_text=question_text,
+                question_type=question_type,
+                gold_answer=gold_answer,
+                options_data=options_data,
+                mappings=mappings,
+                run_id=run_id,
+                latex_text=latex_text,
+            )
+
+        async def _bounded(idx: int, mapping: Dict[str, Any]) -> Tuple[Any, Any, float]:
+            async with semaphore:
+                try:
+                    outcome = await self._validate_single_mapping(
+                        question_text=question_text,
+                        question_type=question_type,
+                        gold_answer=gold_answer,
+                        options_data=options_data,
+                        mapping=mapping,
+                        mapping_index=idx,
+                        run_id=run_id,
+                        latex_text=latex_text,
+                    )
+                    return outcome, None, time.monotonic()
+                except Exception as e:
+                    return None, e, time.monotonic()
+
+        tasks = [asyncio.create_task(_bounded(idx, mapping)) for idx, mapping in enumerate(mappings)]
         validation_logs = []
-        
-        for idx, mapping in enumerate(mappings):
-            try:
-                result, hint = self._validate_single_mapping(
-                    question_text=question_text,
-                    question_type=question_type,
-                    gold_answer=gold_answer,
-                    options_data=options_data,
-                    mapping=mapping,
-                    mapping_index=idx,
-                    run_id=run_id,
-                    latex_text=latex_text,
-                )
+        try:
+            for idx, task in enumerate(tasks):
+                outcome, error, finished_mono = await task
+                finished_at = batch_start + (finished_mono - mono_base)
+                if error is not None:
+                    self.logger.warning(
+                        f"Validation error for mapping {idx}: {error}",
+                        run_id=run_id
+                    )
+                    error_entry = {
+                        "mapping_index": idx,
+                        "timestamp": finished_at,
+                        "status": "error",
+                        "error": str(error)
+                    }
+                    suggestion = getattr(error, "suggestion", None)
+                    if suggestion:
+                        error_entry["suggestion"] = suggestion
+                    validation_logs.append(error_entry)
+                    continue
 
+                result, hint = outcome
                 validation_log = {
                     "mapping_index": idx,
-                    "timestamp": time.time(),
+                    "timestamp": finished_at,
                     "status": "success" if result.is_valid else "failed",
                     "validation_result": {
                         "is_valid": result.is_valid,
@@ -76,7 +300,7 @@ class MappingValidator:
                 if hint:
                     validation_log["suggestion"] = hint
                 validation_logs.append(validation_log)
-                
+
                 if result.is_valid:
                     self.logger.info(
                         f"Mapping {idx} validated successfully",
@@ -84,7 +308,7 @@ class MappingValidator:
                         question_type=question_type,
                         confidence=result.confidence
                     )
-                    return mapping, validation_logs
+                    return mappings[idx], validation_logs
                 else:
                     self.logger.info(
                         f"Mapping {idx} validation failed",
@@ -92,26 +316,16 @@ class MappingValidator:
                         question_type=question_type,
                         reason=result.reasoning
                     )
-            except Exception as e:
-                self.logger.warning(
-                    f"Validation error for mapping {idx}: {e}",
-                    run_id=run_id
-                )
-                error_entry = {
-                    "mapping_index": idx,
-                    "timestamp": time.time(),
-                    "status": "error",
-                    "error": str(e)
-                }
-                suggestion = getattr(e, "suggestion", None)
-                if suggestion:
-                    error_entry["suggestion"] = suggestion
-                validation_logs.append(error_entry)
-        
+        finally:
+            # A lower-index success makes the remaining validations moot.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
         # No valid mapping found
         return None, validation_logs
     
-    def _validate_single_mapping(
+    async def _validate_single_mapping(
         self,
         question_text: str,
         question_type: str,
@@ -138,44 +352,34 @@ class MappingValidator:
         # Use optimized GPT-5.1 validation that answers and validates in one call
         # This eliminates the need for the separate gpt-4o call
         # Add timeout to prevent freezing - use API_TIMEOUT (120s) but cap at 60s for single validation
+        # The HTTP client enforces it on the request, so no wait_for timer is needed here
         validation_timeout = min(API_TIMEOUT, 60)  # Cap at 60 seconds per validation
-        try:
-            validation_result = asyncio.run(
-                asyncio.wait_for(
-                    self.validator.validate_answer_deviation(
-                        question_text=question_text,  # Original question text
-                        question_type=question_type,
-                        gold_answer=gold_answer,
-                        test_answer=None,  # Let GPT-5.1 generate it from manipulated question
-                        manipulated_question_text=modified_text,  # Pass manipulated question
-                        options_data=options_data,
-                        target_option=target_option,
-                        target_option_text=target_option_text,
-                        run_id=run_id
-                    ),
-                    timeout=validation_timeout
-                )
-            )
-        except asyncio.TimeoutError:
-            self.logger.error(
-                f"Validation timeout after {validation_timeout}s",
-                run_id=run_id,
-                mapping_index=mapping_index
-            )
-            # Return failed validation result
-            validation_result = ValidationResult(
-                is_valid=False,
-                confidence=0.0,
-                deviation_score=0.0,
-                reasoning=f"Validation timed out after {validation_timeout} seconds",
-                semantic_similarity=0.0,
-                factual_accuracy=False,
-                question_type_specific_notes="Timeout error",
+        # Retries often resubmit an identical manipulated question; reuse its verdict.
+        cache_key = self._validation_cache_key(
+            question_text, question_type, gold_answer, modified_text, options_data, target_option, target_option_text
+        )
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            validation_result = cached
+        else:
+            validation_result = await self._request_validation(
+                question_text=question_text,
+                question_type=question_type,
                 gold_answer=gold_answer,
-                test_answer="",
-                model_used="timeout"
+                modified_text=modified_text,
+                options_data=options_data,
+                target_option=target_option,
+                target_option_text=target_option_text,
+                mapping_index=mapping_index,
+                run_id=run_id,
+                validation_timeout=validation_timeout,
             )
+            self._remember_result(cache_key, validation_result)
         
+        if validation_result.is_valid:
+            # Suggestions only guide retries; a valid mapping ends the sequence.
+            return validation_result, None
+
         suggestion = self._build_validation_suggestion(
             validation_result=validation_result,
             mapping=mapping,
@@ -185,6 +389,145 @@ class MappingValidator:
         )
 
         return validation_result, suggestion
+
+    def _validation_cache_key(
+        self,
+        question_text: str,
+        question_type: str,
+        gold_answer: str,
+        modified_text: str,
+        options_data: Optional[Dict[str, str]],
+        target_option: Optional[str],
+        target_option_text: Optional[str],
+    ) -> bytes:
+        return hashlib.blake2b(
+            orjson.dumps(
+                [question_text, question_type, gold_answer, modified_text, options_data, target_option, target_option_text],
+                option=orjson.OPT_NON_STR_KEYS,
+                default=str,
+            ),
+            digest_size=16,
+        ).digest()
+
+    def _cached_result(self, cache_key: bytes) -> Optional[ValidationResult]:
+        with self._result_cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+            return cached
+
+    def _remember_result(self, cache_key: bytes, result: ValidationResult) -> None:
+        if result.question_type_specific_notes in VALIDATION_ERROR_NOTES:
+            return
+        with self._result_cache_lock:
+            self._result_cache[cache_key] = result
+            while len(self._result_cache) > VALIDATION_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
+    async def _prefetch_batch_results(
+        self,
+        *,
+        question_text: str,
+        question_type: str,
+        gold_answer: str,
+        options_data: Optional[Dict[str, str]],
+        mappings: List[Dict[str, Any]],
+        run_id: Optional[str],
+        latex_text: Optional[str],
+    ) -> None:
+        """Validate all uncached mappings in one multi-candidate request.
+
+        Verdicts land in the result cache, so the per-mapping pass picks them up and
+        only calls the model for mappings the batch response did not cover. Mappings
+        that cannot be applied are skipped here and reported by that pass.
+        """
+        validate_batch = getattr(self.validator, "validate_answer_deviation_batch", None)
+        if validate_batch is None:
+            return
+
+        pending: Dict[bytes, Dict[str, Any]] = {}
+        for mapping in mappings:
+            try:
+                modified_text = self._apply_mapping_to_question(
+                    question_text=question_text,
+                    mapping=mapping,
+                    latex_text=latex_text,
+                )
+            except Exception:
+                continue
+            target_option = mapping.get("target_wrong_answer")
+            target_option_text = options_data.get(target_option) if target_option and options_data else None
+            cache_key = self._validation_cache_key(
+                question_text, question_type, gold_answer, modified_text, options_data, target_option, target_option_text
+            )
+            if cache_key in pending or self._cached_result(cache_key) is not None:
+                continue
+            pending[cache_key] = {
+                "manipulated_question_text": modified_text,
+                "target_option": target_option,
+                "target_option_text": target_option_text,
+            }
+        if len(pending) < 2:
+            return
+
+        try:
+            results = await validate_batch(
+                question_text=question_text,
+                question_type=question_type,
+                gold_answer=gold_answer,
+                candidates=list(pending.values()),
+                options_data=options_data,
+                run_id=run_id,
+                timeout=API_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Batch validation timeout after {API_TIMEOUT}s", run_id=run_id)
+            return
+        if not results:
+            return
+        for cache_key, result in zip(pending, results):
+            self._remember_result(cache_key, result)
+
+    async def _request_validation(
+        self,
+        *,
+        question_text: str,
+        question_type: str,
+        gold_answer: str,
+        modified_text: str,
+        options_data: Optional[Dict[str, str]],
+        target_option: Optional[str],
+        target_option_text: Optional[str],
+        mapping_index: int,
+        run_id: Optional[str],
+        validation_timeout: float,
+    ) -> ValidationResult:
+        """Ask the validation model for a verdict, mapping timeouts to a failed result."""
+        try:
+            return await self.validator.validate_answer_deviation(
+                question_text=question_text,  # Original question text
+                question_type=question_type,
+                gold_answer=gold_answer,
+                test_answer=None,  # Let GPT-5.1 generate it from manipulated question
+                manipulated_question_text=modified_text,  # Pass manipulated question
+                options_data=options_data,
+                target_option=target_option,
+                target_option_text=target_option_text,
+                run_id=run_id,
+                timeout=validation_timeout,
+            )
+        except asyncio.TimeoutError:
+            self.logger.error(
+                f"Validation timeout after {validation_timeout}s",
+                run_id=run_id,
+                mapping_index=mapping_index
+            )
+            # Return failed validation result
+            return dataclasses.replace(
+                _TIMEOUT_RESULT_TEMPLATE,
+                reasoning=f"Validation timed out after {validation_timeout} seconds",
+                gold_answer=gold_answer,
+            )
     
     def _apply_mapping_to_question(
         self,
@@ -201,13 +544,16 @@ class MappingValidator:
                 suggestion=self._build_suggestion_payload(question_text, original),
             )
 
-        # Attempt exact match first
-        if original in question_text:
-            return question_text.replace(original, replacement, 1)
+        # Attempt exact match first; one find locates the splice point.
+        idx = question_text.find(original)
+        if idx != -1:
+            return question_text[:idx] + replacement + question_text[idx + len(original):]
 
         stripped = original.strip()
-        if stripped and stripped in question_text:
-            return question_text.replace(stripped, replacement, 1)
+        if stripped:
+            idx = question_text.find(stripped)
+            if idx != -1:
+                return question_text[:idx] + replacement + question_text[idx + len(stripped):]
 
         index_info = self._find_substring_with_normalization(question_text, original)
         if index_info:
@@ -233,16 +579,22 @@ class MappingValidator:
         if validation_result.is_valid:
             return None
 
-        suggestion: Dict[str, Any] = {}
-
         test_answer = (validation_result.test_answer or "").strip()
-        gold_label = self._normalize_answer_token(gold_answer, options_data)
-        test_label = self._normalize_answer_token(test_answer, options_data)
-        target_option = (mapping.get("target_wrong_answer") or "").strip()
-        target_label = self._normalize_answer_token(target_option, options_data)
-        target_text = (options_data or {}).get(target_option) if options_data and target_option else None
+        if not test_answer or not gold_answer:
+            # Without both answers there is no "answer did not change" to report.
+            return None
+
+        options_index = self._build_options_index(options_data)
+        gold_label = self._normalize_answer_token(gold_answer, options_data, options_index)
+        if not gold_label:
+            return None
+        test_label = self._normalize_answer_token(test_answer, options_data, options_index)
 
-        if gold_label and test_label and gold_label == test_label:
+        if test_label and gold_label == test_label:
+            suggestion: Dict[str, Any] = {}
+            target_option = (mapping.get("target_wrong_answer") or "").strip()
+            target_label = self._normalize_answer_token(target_option, options_data, options_index)
+            target_text = options_data.get(target_option) if options_data and target_option else None
             instructions = self._build_flip_instruction(
                 question_type=question_type,
                 gold_label=gold_label,
@@ -281,33 +633,16 @@ class MappingValidator:
         """Extract the final quoted phrase from the question text."""
         if not text:
             return None
-        matches = re.findall(r"'([^']+)'", text)
+        matches = _RE_LAST_QUOTED.findall(text)
         return matches[-1] if matches else None
 
     def _normalize_text(self, text: str) -> str:
         """Normalize text by removing LaTeX commands."""
-        import re
-        normalized = text
-        # Remove common LaTeX commands
-        normalized = re.sub(r"\\textbf\{([^}]*)\}", r"\1", normalized)
-        normalized = re.sub(r"\\textit\{([^}]*)\}", r"\1", normalized)
-        normalized = re.sub(r"\\emph\{([^}]*)\}", r"\1", normalized)
-        normalized = re.sub(r"\\text\{([^}]*)\}", r"\1", normalized)
-        # Normalize whitespace
-        normalized = re.sub(r"\s+", " ", normalized)
-        return normalized.strip()
-
-    def _normalize_with_index(self, text: str) -> Tuple[str, List[int]]:
+        return _normalize_latex_text(text)
+
+    def _normalize_with_index(self, text: str) -> Tuple[str, Sequence[int]]:
         """Return normalized text (NFKC) and index map to original positions."""
-        norm_chars: List[str] = []
-        index_map: List[int] = []
-        for idx, char in enumerate(text):
-            norm_char = unicodedata.normalize("NFKC", char)
-            norm_chars.append(norm_char)
-            for _ in norm_char:
-                index_map.append(idx)
-        normalized = "".join(norm_chars)
-        return normalized, index_map
+        return _normalize_with_index(text)
 
     def _find_substring_with_normalization(
         self,
@@ -317,24 +652,45 @@ class MappingValidator:
         """Locate substring in text using NFKC normalization."""
         if not text or not substring:
             return None
-        norm_text, index_map = self._normalize_with_index(text)
-        norm_sub, _ = self._normalize_with_index(substring)
-        search_text = norm_text.lower()
-        search_sub = norm_sub.lower()
+        # The folded text is cached, so only the substring is folded per mapping.
+        search_text, index_map = _search_index(text)
+        # Only the substring's normalized length matters, not its index map.
+        search_sub = unicodedata.normalize("NFKC", substring).casefold()
         idx = search_text.find(search_sub)
         if idx == -1:
             return None
         start = index_map[idx]
-        end_index = idx + len(norm_sub) - 1
+        end_index = idx + len(search_sub) - 1
         if end_index >= len(index_map):
             return None
-        end = index_map[end_index] + 1
+        # End after the whole source cluster of the last matched character, so
+        # combining marks folded into it are replaced too.
+        end = index_map[end_index + 1] if end_index + 1 < len(index_map) else len(text)
+        end = max(end, index_map[end_index] + 1)
         return start, end
 
+    def _build_options_index(self, options_data: Optional[Dict[str, str]]) -> Optional[_OptionsIndex]:
+        """Precompute normalized option keys and a spelling -> key dispatch table."""
+        if not options_data:
+            return None
+        keys = [str(key).strip().upper() for key in options_data]
+        lookup: Dict[str, str] = {}
+        for key, value in zip(keys, options_data.values()):
+            # First option wins on duplicate texts, matching the old in-order scan.
+            lookup.setdefault((value or "").strip().lower(), key)
+        # Key spellings are added last so they take precedence over option texts.
+        for key in keys:
+            lowered = key.lower()
+            lookup[lowered] = key
+            for punctuation in ".):":
+                lookup[lowered + punctuation] = key
+        return _OptionsIndex(frozenset(keys), lookup)
+
     def _normalize_answer_token(
         self,
         answer: Optional[str],
         options_data: Optional[Dict[str, str]],
+        options_index: Optional[_OptionsIndex] = None,
     ) -> str:
         """Normalize an answer string to a comparable token."""
         if not answer:
@@ -344,23 +700,19 @@ class MappingValidator:
             return ""
 
         if options_data:
-            normalized_keys = {str(k).strip().upper(): str(k).strip().upper() for k in options_data.keys()}
-            upper_answer = answer_str.upper()
-            if upper_answer in normalized_keys:
-                return normalized_keys[upper_answer]
-
-            # Handle leading key with punctuation (e.g., "B.", "C)")
-            leading_match = re.match(r"^([A-Z])[\).:\- ]?", upper_answer)
-            if leading_match:
-                key = leading_match.group(1)
-                if key in normalized_keys:
-                    return key
-
-            # Match option text directly
-            lower_answer = answer_str.lower()
-            for key, value in options_data.items():
-                if lower_answer == (value or "").strip().lower():
-                    return str(key).strip().upper()
+            if options_index is None:
+                options_index = self._build_options_index(options_data)
+            # Keys, punctuated keys and option texts resolve in one lookup. An exact option
+            # text wins over the leading-letter fallback below ("Athens" is the option
+            # "Athens", not key "A").
+            mapped = options_index.lookup.get(answer_str.lower())
+            if mapped is not None:
+                return mapped
+
+            # Otherwise fall back to a leading key letter (e.g. "B - Mars").
+            key = answer_str[0].upper()
+            if "A" <= key <= "Z" and key in options_index.keys:
+                return key
 
         lowered = answer_str.lower()
         if lowered in {"true", "false"}:
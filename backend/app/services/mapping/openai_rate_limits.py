@@ -0,0 +1,28 @@
+"""Process-wide OpenAI request and token budgets for mapping generation and validation."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ..llm_clients.rate_limiter import AsyncTokenBucket
+from .gpt5_config import OPENAI_RPM, OPENAI_TPM
+
+_request_bucket = AsyncTokenBucket(OPENAI_RPM, 60) if OPENAI_RPM > 0 else None
+_token_bucket = AsyncTokenBucket(OPENAI_TPM, 60) if OPENAI_TPM > 0 else None
+
+
+async def acquire_openai_slot() -> None:
+    """Wait for a request slot and for the tokens spent by earlier responses to refill."""
+    if _request_bucket is not None:
+        await _request_bucket.acquire()
+    if _token_bucket is not None:
+        await _token_bucket.acquire(0)
+
+
+def record_openai_usage(response: Any) -> None:
+    """Charge a response's ``usage.total_tokens`` to the shared token budget."""
+    if _token_bucket is None:
+        return
+    total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+    if isinstance(total_tokens, int) and total_tokens > 0:
+        _token_bucket.consume(total_tokens)
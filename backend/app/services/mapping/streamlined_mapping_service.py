@@ -3,46 +3,136 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
+import functools
+import importlib.util
 import json
+import logging
 import os
 import re
+import sqlite3
 import time
-from collections import defaultdict
+import traceback
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from threading import Lock
 
-from flask import current_app
+import httpx
+from flask import current_app, has_app_context
+from sqlalchemy.orm import load_only
 
 from ...extensions import db
 from ...models import QuestionManipulation
 from ...services.data_management.structured_data_manager import StructuredDataManager
 from ...services.developer.live_logging_service import live_logging_service
-from ...services.validation.gpt5_validation_service import GPT5ValidationService, ValidationResult
+from ...services.validation.gpt5_validation_service import (
+    VALIDATION_ERROR_NOTES,
+    GPT5ValidationService,
+    ValidationResult,
+)
 from ...utils.logging import get_logger
-from ...utils.openai_responses import coerce_response_text
+from ...utils.openai_responses import coerce_response_body_text, coerce_response_text
 from ...utils.storage_paths import run_directory
 from ...utils.time import isoformat, utc_now
+import orjson
+
 from .gpt5_config import (
+    BATCH_MAX_WAIT,
+    BATCH_POLL_INTERVAL,
     GPT5_MODEL,
     GPT5_MAX_TOKENS,
     GPT5_REASONING_EFFORT,
     GPT5_GENERATION_REASONING_EFFORT,
     MAPPING_MAX_CONCURRENT,
+    MAPPING_MAX_CONCURRENT_SETS,
+    VALIDATION_BATCH_PROMPT,
     VALIDATION_MAX_CONCURRENT,
     API_TIMEOUT,
     MAX_RETRIES,
+    STREAM_GENERATION,
+    USE_BATCH_API,
 )
 from .gpt5_mapping_generator import GPT5MappingGeneratorService
+from .llm_response_cache import LLMCache, cache_key
 from .mapping_generation_logger import get_mapping_logger
+from .openai_rate_limits import acquire_openai_slot, record_openai_usage
 
 try:
-    from openai import OpenAI, AsyncOpenAI
+    from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
 except ImportError:
     OpenAI = None  # type: ignore
     AsyncOpenAI = None  # type: ignore
+    DefaultAsyncHttpxClient = None  # type: ignore
+
+# HTTP/2 lets concurrent requests share one TLS connection; it needs the optional h2 package
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+logger = get_logger(__name__)
+# Level checks go to the stdlib logger structlog writes through, so debug messages
+# are not even formatted unless DEBUG is enabled.
+_stdlib_logger = logging.getLogger(__name__)
+
+_LEADING_LABEL_RE = re.compile(r"^([A-Z])[\.\)\s]")
+# JSON recovery for generation replies wrapped in prose or markdown fences
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Option labels and gold answers repeat across questions and retries, so the
+# normalizers below are memoized on the raw string.
+@functools.lru_cache(maxsize=512)
+def _label_from_string(text: str) -> str:
+    # Try to extract single letter at start
+    match = _LEADING_LABEL_RE.match(text.strip())
+    if match:
+        return match.group(1)
+
+    # If it's just a single letter
+    if len(text.strip()) == 1 and text.strip().isalpha():
+        return text.strip().upper()
+
+    return text.strip()
+
+
+@functools.lru_cache(maxsize=512)
+def _true_false_label(value: str) -> str:
+    text = value.strip().lower()
+    if text in {"true", "t", "1"}:
+        return "True"
+    if text in {"false", "f", "0"}:
+        return "False"
+    if text.startswith("true"):
+        return "True"
+    if text.startswith("false"):
+        return "False"
+    return ""
+
+
+def _preview(text: str, limit: int = 50) -> str:
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _mapping_preview(mapping: Dict[str, Any]) -> Dict[str, str]:
+    """Truncated original/replacement pair used in logs."""
+    return {
+        "original": _preview(mapping.get("original", "")),
+        "replacement": _preview(mapping.get("replacement", "")),
+    }
 
 
+# Generation prompts kept for retries of recently generated questions
+PROMPT_CACHE_SIZE = 256
+
+# Upper bound on live log events waiting for the background emitter
+LIVE_LOG_QUEUE_SIZE = 10000
+
+# Per-run SQLite (WAL) database holding one status row per question
+STATUS_DB_NAME = "mapping_generation_status.db"
+# Status database connections kept open; the least recently used run's is closed beyond this
+STATUS_DB_CACHE_SIZE = 8
+
 # JSON Schema for mapping generation - supports multiple sets in one response
 MAPPING_GENERATION_SCHEMA = {
     "name": "mappingBatch",
@@ -85,6 +175,71 @@ MAPPING_GENERATION_SCHEMA = {
 }
 
 
+class _MappingSetSplitter:
+    """Cut complete items of the ``mapping_sets`` array out of JSON text as it streams in.
+
+    Only string/escape state and nesting depth are tracked; each finished item is
+    handed to ``orjson.loads``. Text before the ``"mapping_sets"`` key (code fences,
+    other keys) is ignored, and scanning stops at the array's closing bracket.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = -1  # scan position; -1 until the array has been located
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Append ``chunk`` and return the items it completed."""
+        items: List[Dict[str, Any]] = []
+        if self._done:
+            return items
+        self._buffer += chunk
+        buf = self._buffer
+        if self._pos < 0:
+            marker = buf.find('"mapping_sets"')
+            bracket = buf.find("[", marker) if marker >= 0 else -1
+            if bracket < 0:
+                return items
+            self._pos = bracket + 1
+
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    self._done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._item_start is not None:
+                    try:
+                        item = orjson.loads(buf[self._item_start:i + 1])
+                    except ValueError:
+                        item = None
+                    if isinstance(item, dict):
+                        items.append(item)
+                    self._item_start = None
+            i += 1
+        self._pos = i
+        return items
+
+
 @dataclass
 class MappingSetStatus:
     """Status of a generated mapping set."""
@@ -96,6 +251,19 @@ class MappingSetStatus:
     generated_at: str = field(default_factory=lambda: isoformat(utc_now()))
 
 
+@dataclass
+class PreparedQuestion:
+    """Prompt inputs for one question, built before generation fans out."""
+    question: QuestionManipulation
+    question_data: Optional[Dict[str, Any]] = None
+    target_configs: Optional[List[Dict[str, Any]]] = None
+    error: Optional[Exception] = None  # raised again inside the question's own generation task
+
+
+# (original, replacement, target_option, signal_strategy)
+_MappingKey = Tuple[str, str, Optional[str], Optional[str]]
+
+
 @dataclass
 class ValidationOutcome:
     """Outcome of a validation attempt."""
@@ -109,6 +277,7 @@ class ValidationOutcome:
     test_answer: str
     target_matched: Optional[bool] = None
     validated_at: str = field(default_factory=lambda: isoformat(utc_now()))
+    skipped: bool = False  # cancelled because another mapping validated first
 
 
 @dataclass
@@ -127,23 +296,57 @@ class QuestionGenerationStatus:
     error: Optional[str] = None
     started_at: str = field(default_factory=lambda: isoformat(utc_now()))
     completed_at: Optional[str] = None
+    # Membership index for ``failure_rationales``; not persisted
+    _rationales_seen: set = field(default_factory=set, init=False, repr=False, compare=False)
+
+    def add_failure_rationale(self, rationale: str) -> None:
+        """Append ``rationale`` unless it is already recorded."""
+        if len(self._rationales_seen) != len(self.failure_rationales):
+            # The list was assigned or edited directly; rebuild the index
+            self._rationales_seen = set(self.failure_rationales)
+        if rationale not in self._rationales_seen:
+            self._rationales_seen.add(rationale)
+            self.failure_rationales.append(rationale)
 
 
 class StreamlinedMappingService:
     """Streamlined service for generating mappings with 3-set generation and sequential validation."""
 
     def __init__(self):
-        self.logger = get_logger(__name__)
+        # Resolved once here rather than through the current_app proxy on every request
+        self._api_key = os.getenv("OPENAI_API_KEY") or (
+            current_app.config.get("OPENAI_API_KEY") if has_app_context() else None
+        )
         self.structured_manager = StructuredDataManager()
         self.validator = GPT5ValidationService()
         self.generator = GPT5MappingGeneratorService()
         self.mapping_logger = get_mapping_logger()
+        # One OpenAI client per event loop, shared by generation and validation
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
         # In-memory status storage (keyed by run_id -> question_id)
         self._status_store: Dict[str, Dict[int, QuestionGenerationStatus]] = defaultdict(dict)
-        # Semaphore to serialize database writes and prevent SQLite locks
-        self._db_write_semaphore = asyncio.Semaphore(1)
-        # Lock for file-based status persistence (thread-safe)
-        self._status_file_lock = Lock()
+        # Valid mappings are written by one background task so SQLite sees a single writer
+        self._db_queue: Optional[asyncio.Queue] = None
+        self._db_writer_task: Optional[asyncio.Task] = None
+        # Live log events are handed to one background emitter instead of committing inline
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        # DEBUG live events dropped because the queue was full
+        self._live_log_dropped = 0
+        # Per-run status databases, shared by the loop and worker threads under one lock
+        self._status_dbs: "OrderedDict[str, sqlite3.Connection]" = OrderedDict()
+        self._status_db_lock = Lock()
+        # Structured data and LaTeX stems are fixed for the lifetime of a run
+        self._structured_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._structured_cache_lock = asyncio.Lock()
+        self._latex_stem_cache: Dict[Tuple[str, int], str] = {}
+        # Fixed generation prompt text per (question, target configs), least recently used first
+        self._prompt_cache: "OrderedDict[bytes, Tuple[str, str]]" = OrderedDict()
+        # Statuses changed in memory since their last write, persisted at the next checkpoint
+        self._dirty_statuses: set = set()
+        # Last snapshot written per (run_id, question_id)
+        self._last_persisted: Dict[Tuple[str, int], Dict[str, Any]] = {}
         # Load persisted status on init
         self._load_persisted_statuses()
 
@@ -165,7 +368,19 @@ class StreamlinedMappingService:
         if max_concurrent is None:
             max_concurrent = MAPPING_MAX_CONCURRENT
             
-        questions = QuestionManipulation.query.filter_by(
+        # Only the columns prompt preparation reads on every question; the large text/JSON
+        # columns (original_text, options_data fallbacks, model results) load on first access.
+        questions = QuestionManipulation.query.options(
+            load_only(
+                QuestionManipulation.id,
+                QuestionManipulation.pipeline_run_id,
+                QuestionManipulation.question_number,
+                QuestionManipulation.question_type,
+                QuestionManipulation.gold_answer,
+                QuestionManipulation.sequence_index,
+                QuestionManipulation.source_identifier,
+            )
+        ).filter_by(
             pipeline_run_id=run_id
         ).order_by(
             QuestionManipulation.sequence_index.asc(),
@@ -180,7 +395,7 @@ class StreamlinedMappingService:
                 "failed_count": 0,
             }
 
-        live_logging_service.emit(
+        self._emit_live_log(
             run_id,
             "smart_substitution",
             "INFO",
@@ -189,63 +404,45 @@ class StreamlinedMappingService:
             context={"total_questions": len(questions)},
         )
 
-        semaphore = asyncio.Semaphore(max_concurrent)
-        # Create tasks properly to ensure parallel execution with question tracking
-        task_map = {}
-        tasks = []
-        for question in questions:
-            task = asyncio.create_task(
-                self._generate_for_question_with_semaphore(semaphore, run_id, question)
-            )
-            task_map[task] = question.id
-            tasks.append(task)
+        # Build every question's prompt inputs in one pass off the event loop, so the
+        # generation tasks below only wait on the network.
+        structured = await self._load_structured(run_id)
+        prepared = await asyncio.to_thread(self._prepare_all, run_id, questions, structured)
 
-        # Use as_completed for better progress tracking and UI updates
-        # But ensure we wait for ALL tasks to complete before returning
+        # First-attempt responses from one Batch API job; questions it does not cover
+        # (and all retries) go through the real-time path.
+        prefetched: Dict[int, str] = {}
+        if USE_BATCH_API and len(questions) > 1:
+            prefetched = await self._submit_batch(run_id, prepared)
+
+        semaphore = asyncio.Semaphore(max_concurrent)
+        # Each question reports its result here as soon as it finishes, for real-time UI updates
+        completed: asyncio.Queue = asyncio.Queue()
         results = []
-        completed_count = 0
-        total_tasks = len(tasks)
-        
-        for completed_task in asyncio.as_completed(tasks):
-            question_id = task_map.get(completed_task, None)
-            try:
-                result = await completed_task
-                # Ensure question_id is in result for tracking
-                if isinstance(result, dict) and "question_id" not in result and question_id:
-                    result["question_id"] = question_id
-                results.append(result)
-                # Persist status after each question completes for real-time UI updates
-                final_question_id = result.get("question_id") if isinstance(result, dict) else question_id
-                if final_question_id:
-                    status = self._status_store.get(run_id, {}).get(final_question_id)
-                    if status:
-                        self._persist_status(run_id, final_question_id, status)
-                completed_count += 1
-            except Exception as e:
-                self.logger.error(
-                    f"Error in parallel generation task for question {question_id}: {e}",
-                    run_id=run_id,
-                    question_id=question_id,
-                    exc_info=True
+        async with asyncio.TaskGroup() as tg:
+            for item in prepared:
+                tg.create_task(
+                    self._generate_for_question_with_semaphore(
+                        semaphore, completed, run_id, item, prefetched_content=prefetched.get(item.question.id)
+                    )
                 )
-                results.append({"status": "error", "error": str(e), "question_id": question_id})
-                completed_count += 1
-        
-        # Ensure all tasks are awaited (defensive check)
-        if completed_count < total_tasks:
-            self.logger.warning(
-                f"Not all tasks completed: {completed_count}/{total_tasks}",
-                run_id=run_id
-            )
-            # Wait for any remaining tasks
-            remaining_tasks = [t for t in tasks if not t.done()]
-            if remaining_tasks:
-                await asyncio.gather(*remaining_tasks, return_exceptions=True)
+            while len(results) < len(questions):
+                result = await completed.get()
+                results.append(result)
+                # Persist status after each question completes
+                status = self._status_store.get(run_id, {}).get(result.get("question_id"))
+                if status:
+                    await self._persist_status_async(run_id, status.question_id, status)
 
+        await self._close_db_writer()
+        await self._close_openai_client()
+
+        # Valid mappings are saved in the background; a failed save flips the question's status.
+        results = [self._settle_saved_result(run_id, result) for result in results]
         success_count = sum(1 for r in results if isinstance(r, dict) and r.get("status") == "success")
         failed_count = len(results) - success_count
 
-        live_logging_service.emit(
+        self._emit_live_log(
             run_id,
             "smart_substitution",
             "INFO",
@@ -258,6 +455,8 @@ class StreamlinedMappingService:
             },
         )
 
+        await self._close_live_log()
+
         return {
             "run_id": run_id,
             "total_questions": len(questions),
@@ -288,25 +487,62 @@ class StreamlinedMappingService:
         if not question:
             raise ValueError(f"Question {question_id} not found for run {run_id}")
 
-        return await self._generate_for_question(run_id, question)
+        # An explicit single-question request asks for fresh mappings, not a replay.
+        try:
+            result = await self._generate_for_question(run_id, question, use_cache=False)
+            await self._close_db_writer()
+            return self._settle_saved_result(run_id, result)
+        finally:
+            await self._close_db_writer()
+            await self._close_openai_client()
+            await self._close_live_log()
 
     async def _generate_for_question_with_semaphore(
         self,
         semaphore: asyncio.Semaphore,
+        completed: asyncio.Queue,
         run_id: str,
-        question: QuestionManipulation,
-    ) -> Dict[str, Any]:
-        """Generate mappings with semaphore for concurrency control."""
+        prepared: PreparedQuestion,
+        prefetched_content: Optional[str] = None,
+    ) -> None:
+        """Generate mappings with semaphore for concurrency control and report the result to ``completed``.
+
+        Errors are reported as results rather than raised, so one failing question
+        does not cancel its siblings in the task group.
+        """
+        question = prepared.question
         async with semaphore:
-            return await self._generate_for_question(run_id, question)
+            try:
+                result = await self._generate_for_question(
+                    run_id, question, prefetched_content=prefetched_content, prepared=prepared
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error in parallel generation task for question {question.id}: {e}",
+                    run_id=run_id,
+                    question_id=question.id,
+                    exc_info=True
+                )
+                result = {"status": "error", "error": str(e)}
+        result.setdefault("question_id", question.id)
+        completed.put_nowait(result)
 
     async def _generate_for_question(
         self,
         run_id: str,
         question: QuestionManipulation,
+        prefetched_content: Optional[str] = None,
+        use_cache: bool = True,
+        prepared: Optional[PreparedQuestion] = None,
     ) -> Dict[str, Any]:
         """
         Generate mappings for a single question with retry logic.
+
+        ``prefetched_content`` is a first-attempt model response obtained ahead of
+        time (e.g. from a Batch API job); retries always call the model. With
+        ``use_cache`` off, generation responses cached by earlier runs are ignored
+        (fresh responses are still stored). ``prepared`` carries inputs already built
+        by ``_prepare_all``; without it they are loaded here.
         
         Returns:
             Dictionary with status and result
@@ -321,10 +557,11 @@ class StreamlinedMappingService:
             status="generating",
         )
         self._status_store[run_id][question_id] = status
-        self._persist_status(run_id, question_id, status)
+        await self._persist_status_async(run_id, question_id, status)
 
         # Log generation start
-        self.mapping_logger.log_generation(
+        self._log_mapping_event(
+            self.mapping_logger.log_generation,
             run_id=run_id,
             question_id=question_id,
             question_number=question_number,
@@ -338,7 +575,7 @@ class StreamlinedMappingService:
         )
 
         # Emit start log
-        live_logging_service.emit(
+        self._emit_live_log(
             run_id,
             "smart_substitution",
             "INFO",
@@ -353,53 +590,17 @@ class StreamlinedMappingService:
 
         try:
             # Load structured data
-            self.logger.info(
-                f"Loading structured data for question {question_number}",
-                run_id=run_id,
-                question_id=question_id,
-            )
-            structured = self.structured_manager.load(run_id)
-            if not structured:
-                error_msg = f"Structured data not found for run {run_id}"
-                self.logger.error(error_msg, run_id=run_id, question_id=question_id)
-                raise ValueError(error_msg)
-
-            # Get question data
-            question_data = self.generator._get_question_data(run_id, question, structured)
-            question_data = self.generator._normalize_dict_keys(question_data)
-
-            # Get LaTeX stem text
-            self.logger.debug(
-                f"Extracting LaTeX stem text for question {question_number}",
-                run_id=run_id,
-                question_id=question_id,
-            )
-            latex_stem_text = self.generator._extract_latex_stem_text(run_id, question, structured)
-            if not latex_stem_text:
-                error_msg = f"Could not extract LaTeX stem text for question {question_id}"
-                self.logger.error(error_msg, run_id=run_id, question_id=question_id)
-                raise ValueError(error_msg)
-            question_data["latex_stem_text"] = latex_stem_text
-
-            question_type = question_data.get("question_type", "mcq_single")
-            gold_answer = question_data.get("gold_answer", "")
-            options = question_data.get("options", {})
-
-            self.logger.info(
-                f"Question data loaded: type={question_type}, gold_answer={gold_answer}, options_count={len(options)}",
-                run_id=run_id,
-                question_id=question_id,
-                question_type=question_type,
-            )
-
-            # Determine target options or signal strategies
-            target_configs = self._determine_target_configs(question_data, question_type)
-            self.logger.info(
-                f"Determined {len(target_configs)} target configs for question {question_number}",
-                run_id=run_id,
-                question_id=question_id,
-                target_configs=[{"target_option": c.get("target_option"), "signal_strategy": c.get("signal_strategy")} for c in target_configs],
-            )
+            if prepared is None:
+                logger.info(
+                    f"Loading structured data for question {question_number}",
+                    run_id=run_id,
+                    question_id=question_id,
+                )
+                structured = await self._load_structured(run_id)
+                prepared = self._prepare_question(run_id, question, structured)
+            if prepared.error is not None:
+                raise prepared.error
+            question_data, target_configs = prepared.question_data, prepared.target_configs
 
             # First attempt: Generate 3 sets
             attempt = 1
@@ -410,7 +611,7 @@ class StreamlinedMappingService:
                 if attempt > 1:
                     status.status = "retrying"
                     status.retry_count = attempt - 1
-                    live_logging_service.emit(
+                    self._emit_live_log(
                         run_id,
                         "smart_substitution",
                         "INFO",
@@ -426,14 +627,74 @@ class StreamlinedMappingService:
 
                 # Generate all 3 mapping sets in ONE call
                 status.status = "generating"
-                self._persist_status(run_id, question_id, status)
-                self.logger.info(
+                await self._persist_status_async(run_id, question_id, status)
+                logger.info(
                     f"Status transition: generating all sets (attempt {attempt})",
                     run_id=run_id,
                     question_id=question_id,
                     attempt=attempt,
                 )
                 
+                # Validation of a set starts as soon as it is available: while the response is
+                # still streaming, or right after generation otherwise.
+                validation_semaphore = asyncio.Semaphore(VALIDATION_MAX_CONCURRENT)
+                # Positions by (original, replacement, target) so a pair proposed more than once is validated once
+                positions: Dict[_MappingKey, List[Tuple[int, int, Dict[str, Any]]]] = {}
+                pool: Dict[asyncio.Task, _MappingKey] = {}
+                prefetches: List[asyncio.Task] = []
+                submitted_sets: set = set()
+                found_valid = asyncio.Event()
+
+                def _note_valid(task: asyncio.Task) -> None:
+                    if not task.cancelled() and task.exception() is None and getattr(task.result(), "is_valid", False):
+                        found_valid.set()
+
+                def _submit_set(set_data: Dict[str, Any]) -> None:
+                    set_idx, target_config = set_data["set_index"], set_data["target_config"]
+                    if set_idx in submitted_sets:
+                        return
+                    submitted_sets.add(set_idx)
+                    fresh = []
+                    for mapping_idx, mapping in enumerate(set_data["mappings"]):
+                        key = self._mapping_dedup_key(mapping, target_config)
+                        if key in positions:
+                            positions[key].append((set_idx, mapping_idx, mapping))
+                            continue
+                        positions[key] = [(set_idx, mapping_idx, mapping)]
+                        fresh.append((mapping_idx, mapping, key))
+                    prefetch = None
+                    if VALIDATION_BATCH_PROMPT and len(fresh) > 1:
+                        # One request answers the whole set; per-mapping calls only fill gaps
+                        prefetch = asyncio.create_task(
+                            self._prefetch_set_validations(
+                                validation_semaphore,
+                                run_id=run_id,
+                                question_id=question_id,
+                                question_data=question_data,
+                                mappings=[mapping for _, mapping, _ in fresh],
+                                target_config=target_config,
+                            )
+                        )
+                        prefetches.append(prefetch)
+                    for mapping_idx, mapping, key in fresh:
+                        task = asyncio.create_task(
+                            self._validate_mapping_set_with_semaphore(
+                                validation_semaphore,
+                                run_id=run_id,
+                                question_id=question_id,
+                                question_number=question_number,
+                                question_data=question_data,
+                                mapping=mapping,
+                                set_index=set_idx,
+                                mapping_index=mapping_idx,
+                                attempt=attempt,
+                                target_config=target_config,
+                                prefetch=prefetch,
+                            )
+                        )
+                        task.add_done_callback(_note_valid)
+                        pool[task] = key
+
                 try:
                     # Single call to generate all sets
                     all_sets = await self._generate_all_mapping_sets(
@@ -444,6 +705,10 @@ class StreamlinedMappingService:
                         target_configs=target_configs,
                         attempt=attempt,
                         failure_rationales=status.failure_rationales if attempt > 1 else None,
+                        prefetched_content=prefetched_content if attempt == 1 else None,
+                        use_cache=use_cache,
+                        on_set=_submit_set,
+                        stop_event=found_valid,
                     )
                     
                     mapping_sets = []
@@ -465,9 +730,11 @@ class StreamlinedMappingService:
                         status.mapping_sets_generated.append(set_status)
                         mapping_sets.append((set_idx, mappings, target_config))
                         total_mappings_generated += len(mappings)
+                        _submit_set(set_data)
 
                         # Update generation log with mappings count
-                        self.mapping_logger.log_generation(
+                        self._log_mapping_event(
+                            self.mapping_logger.log_generation,
                             run_id=run_id,
                             question_id=question_id,
                             question_number=question_number,
@@ -483,7 +750,7 @@ class StreamlinedMappingService:
                             mappings_generated=total_mappings_generated,
                         )
 
-                        live_logging_service.emit(
+                        self._emit_live_log(
                             run_id,
                             "smart_substitution",
                             "INFO",
@@ -501,18 +768,21 @@ class StreamlinedMappingService:
                         )
 
                 except Exception as e:
-                    import traceback
+                    # Validations started from a partial stream belong to a failed attempt
+                    for task in [*pool, *prefetches]:
+                        task.cancel()
                     exception_dict = {
                         "set_index": None,  # All sets failed in one call
                         "attempt": attempt,
                         "error": str(e),
                         "error_type": type(e).__name__,
-                        "traceback": traceback.format_exc(),
+                        # Innermost frames only; the status is persisted on every transition
+                        "traceback": "".join(traceback.format_list(traceback.extract_tb(e.__traceback__)[-3:])),
                     }
                     status.generation_exceptions.append(exception_dict)
-                    self._persist_status(run_id, question_id, status)
+                    await self._persist_status_async(run_id, question_id, status)
                     
-                    self.logger.error(
+                    logger.error(
                         f"Failed to generate all mapping sets for question {question_id}: {e}",
                         run_id=run_id,
                         question_id=question_id,
@@ -521,7 +791,8 @@ class StreamlinedMappingService:
                         exc_info=True,
                     )
                     # Update generation log with failure
-                    self.mapping_logger.log_generation(
+                    self._log_mapping_event(
+                        self.mapping_logger.log_generation,
                         run_id=run_id,
                         question_id=question_id,
                         question_number=question_number,
@@ -554,13 +825,12 @@ class StreamlinedMappingService:
                     # Add generation exceptions to failure_rationales
                     for exc in status.generation_exceptions:
                         rationale = f"Generation Set {exc['set_index']} (Attempt {exc['attempt']}): {exc['error_type']}: {exc['error']}"
-                        if rationale not in status.failure_rationales:
-                            status.failure_rationales.append(rationale)
+                        status.add_failure_rationale(rationale)
                     
                     status.completed_at = isoformat(utc_now())
-                    self._persist_status(run_id, question_id, status)
+                    await self._persist_status_async(run_id, question_id, status)
                     
-                    self.logger.error(
+                    logger.error(
                         f"All mapping generation attempts failed for question {question_number}",
                         run_id=run_id,
                         question_id=question_id,
@@ -571,7 +841,8 @@ class StreamlinedMappingService:
                     )
                     
                     # Update generation log with final failure
-                    self.mapping_logger.log_generation(
+                    self._log_mapping_event(
+                        self.mapping_logger.log_generation,
                         run_id=run_id,
                         question_id=question_id,
                         question_number=question_number,
@@ -586,7 +857,7 @@ class StreamlinedMappingService:
                         mappings_generated=total_mappings_generated,
                     )
                     
-                    live_logging_service.emit(
+                    self._emit_live_log(
                         run_id,
                         "smart_substitution",
                         "ERROR",
@@ -618,8 +889,8 @@ class StreamlinedMappingService:
 
                 # Validate in parallel (all mappings in a set concurrently) until first valid found
                 status.status = "validating"
-                self._persist_status(run_id, question_id, status)
-                self.logger.info(
+                await self._persist_status_async(run_id, question_id, status)
+                logger.info(
                     f"Status transition: validating (attempt {attempt}, {len(mapping_sets)} sets to validate)",
                     run_id=run_id,
                     question_id=question_id,
@@ -629,174 +900,111 @@ class StreamlinedMappingService:
                 valid_mapping = None
                 mappings_validated_count = 0
                 
-                # Semaphore to limit concurrent validation calls
-                validation_semaphore = asyncio.Semaphore(VALIDATION_MAX_CONCURRENT)
-
-                for set_idx, mappings, target_config in mapping_sets:
-                    # Validate all mappings in this set in parallel
-                    validation_tasks = []
-                    task_data = []
-                    for mapping_idx, mapping in enumerate(mappings):
-                        task = asyncio.create_task(
-                            self._validate_mapping_set_with_semaphore(
-                                validation_semaphore,
+                # Drain the pool of validations (started as sets arrived) and stop at the first valid one
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + API_TIMEOUT * 2  # Allow 2x timeout for parallel validations
+                pending = set(pool)
+                pending_logs: List[Dict[str, Any]] = []
+                while pending and not valid_mapping:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    done, pending = await asyncio.wait(
+                        pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    # Earlier sets win when several validations finish together
+                    for task in sorted(done, key=lambda t: positions[pool[t]][0][:2]):
+                        try:
+                            task_result = task.result()
+                        except Exception as e:
+                            task_result = e
+                        for set_idx, mapping_idx, mapping in positions[pool[task]]:
+                            mappings_validated_count += 1
+                            validation_result = self._record_validation_outcome(
                                 run_id=run_id,
                                 question_id=question_id,
                                 question_number=question_number,
                                 question_data=question_data,
-                                mapping=mapping,
-                                set_index=set_idx,
-                                mapping_index=mapping_idx,
+                                status=status,
                                 attempt=attempt,
-                                target_config=target_config,
+                                set_idx=set_idx,
+                                mapping_idx=mapping_idx,
+                                mapping=mapping,
+                                validation_result=task_result,
+                                pending_logs=pending_logs,
+                                # The question is decided; later verdicts skip the log and live feed
+                                quiet=valid_mapping is not None,
                             )
-                        )
-                        validation_tasks.append(task)
-                        task_data.append((mapping_idx, mapping))
-                    
-                    # Wait for all validations in this set to complete in parallel with timeout
-                    # Use 2x API_TIMEOUT to allow for parallel execution of multiple validations
-                    try:
-                        validation_results = await asyncio.wait_for(
-                            asyncio.gather(*validation_tasks, return_exceptions=True),
-                            timeout=API_TIMEOUT * 2,  # Allow 2x timeout for parallel validations
-                        )
-                    except asyncio.TimeoutError:
-                        self.logger.error(
+                            if validation_result.is_valid and not valid_mapping:
+                                valid_mapping = mapping
+                                # Enrich mapping with validation metadata
+                                valid_mapping["validated"] = True
+                                valid_mapping["confidence"] = validation_result.confidence
+                                valid_mapping["deviation_score"] = validation_result.deviation_score
+                                valid_mapping["validation_reasoning"] = validation_result.reasoning
+                                if validation_result.target_matched is not None:
+                                    valid_mapping["target_matched"] = validation_result.target_matched
+                    # One status write and one log append per group of finished validations
+                    self._flush_validation_logs(run_id, question_id, question_number, status, pending_logs)
+
+                for task in prefetches:
+                    task.cancel()
+                if pending:
+                    for task in pending:
+                        task.cancel()
+                    if not valid_mapping:
+                        logger.error(
                             f"Validation batch timed out after {API_TIMEOUT * 2}s",
                             run_id=run_id,
                             question_id=question_id,
-                            set_index=set_idx,
                             attempt=attempt,
-                            tasks_count=len(validation_tasks),
+                            tasks_count=len(pending),
                         )
-                        # Collect results from completed tasks and mark pending ones as timed out
-                        validation_results = []
-                        for task in validation_tasks:
-                            if task.done():
-                                try:
-                                    validation_results.append(task.result())
-                                except Exception as e:
-                                    validation_results.append(e)
-                            else:
-                                # Task is still pending - mark as timed out
-                                # Use a regular Exception that will be handled by the exception handler below
-                                validation_results.append(
-                                    TimeoutError(f"Validation task timed out after {API_TIMEOUT * 2}s")
+                    for task in sorted(pending, key=lambda t: positions[pool[t]][0][:2]):
+                        for set_idx, mapping_idx, mapping in positions[pool[task]]:
+                            if valid_mapping:
+                                # Cancelled because another mapping already passed; not a failure
+                                status.validation_outcomes.append(
+                                    ValidationOutcome(
+                                        attempt=attempt,
+                                        set_index=set_idx,
+                                        mapping_index=mapping_idx,
+                                        is_valid=False,
+                                        confidence=0.0,
+                                        deviation_score=0.0,
+                                        reasoning="Skipped: a valid mapping was already found",
+                                        test_answer="",
+                                        skipped=True,
+                                    )
                                 )
-                                # Cancel the task to free resources
-                                task.cancel()
-                    
-                    for (mapping_idx, mapping), validation_result in zip(task_data, validation_results):
-                        mappings_validated_count += 1
-                        
-                        # Handle exceptions from validation
-                        if isinstance(validation_result, Exception):
-                            error_type = type(validation_result).__name__
-                            error_msg = str(validation_result)
-                            self.logger.error(
-                                f"Validation exception for mapping {mapping_idx}: {error_type}: {error_msg}",
+                                continue
+                            mappings_validated_count += 1
+                            self._record_validation_outcome(
                                 run_id=run_id,
                                 question_id=question_id,
-                                set_index=set_idx,
-                                mapping_index=mapping_idx,
+                                question_number=question_number,
+                                question_data=question_data,
+                                status=status,
                                 attempt=attempt,
-                                error_type=error_type,
-                                exc_info=True,
-                            )
-                            # Create a failed validation result
-                            validation_result = ValidationResult(
-                                is_valid=False,
-                                confidence=0.0,
-                                deviation_score=0.0,
-                                reasoning=f"Validation error: {error_msg}",
-                                semantic_similarity=0.0,
-                                factual_accuracy=False,
-                                question_type_specific_notes=f"Validation exception: {error_type}",
-                                gold_answer=question_data.get("gold_answer", ""),
-                                test_answer="",
-                                model_used="none"
+                                set_idx=set_idx,
+                                mapping_idx=mapping_idx,
+                                mapping=mapping,
+                                validation_result=TimeoutError(
+                                    f"Validation task timed out after {API_TIMEOUT * 2}s"
+                                ),
+                                pending_logs=pending_logs,
                             )
-
-                        outcome = ValidationOutcome(
-                            attempt=attempt,
-                            set_index=set_idx,
-                            mapping_index=mapping_idx,
-                            is_valid=validation_result.is_valid,
-                            confidence=validation_result.confidence,
-                            deviation_score=validation_result.deviation_score,
-                            reasoning=validation_result.reasoning,
-                            test_answer=validation_result.test_answer,
-                            target_matched=validation_result.target_matched,
-                        )
-                        status.validation_outcomes.append(outcome)
-                        self._persist_status(run_id, question_id, status)
-
-                        # Log validation event
-                        self.mapping_logger.log_validation(
-                            run_id=run_id,
-                            question_id=question_id,
-                            question_number=question_number,
-                            mapping_index=mapping_idx,
-                            status="success" if validation_result.is_valid else "failed",
-                            details={
-                                "validation_result": {
-                                    "is_valid": validation_result.is_valid,
-                                    "confidence": validation_result.confidence,
-                                    "deviation_score": validation_result.deviation_score,
-                                    "reasoning": validation_result.reasoning,
-                                    "test_answer": validation_result.test_answer,
-                                    "target_matched": validation_result.target_matched,
-                                },
-                                "set_index": set_idx,
-                                "attempt": attempt,
-                                "mapping_preview": {
-                                    "original": mapping.get("original", "")[:50] + "..." if len(mapping.get("original", "")) > 50 else mapping.get("original", ""),
-                                    "replacement": mapping.get("replacement", "")[:50] + "..." if len(mapping.get("replacement", "")) > 50 else mapping.get("replacement", ""),
-                                },
-                            },
-                        )
-
-                        live_logging_service.emit(
-                            run_id,
-                            "smart_substitution",
-                            "INFO" if validation_result.is_valid else "WARNING",
-                            f"Validation result for question {question_number}, Set {set_idx}, Mapping {mapping_idx + 1}: {'Valid' if validation_result.is_valid else 'Invalid'}",
-                            component="mapping_generation",
-                            context={
-                                "question_id": question_id,
-                                "question_number": question_number,
-                                "attempt": attempt,
-                                "set_index": set_idx,
-                                "mapping_index": mapping_idx,
-                                "is_valid": validation_result.is_valid,
-                                "confidence": validation_result.confidence,
-                                "deviation_score": validation_result.deviation_score,
-                                "reasoning": validation_result.reasoning,
-                            },
-                        )
-
-                        if validation_result.is_valid and not valid_mapping:
-                            valid_mapping = mapping
-                            # Enrich mapping with validation metadata
-                            valid_mapping["validated"] = True
-                            valid_mapping["confidence"] = validation_result.confidence
-                            valid_mapping["deviation_score"] = validation_result.deviation_score
-                            valid_mapping["validation_reasoning"] = validation_result.reasoning
-                            if validation_result.target_matched is not None:
-                                valid_mapping["target_matched"] = validation_result.target_matched
-
-                    if valid_mapping:
-                        break
+                    self._flush_validation_logs(run_id, question_id, question_number, status, pending_logs)
+                await self._persist_status_if_dirty(run_id, question_id, status)
 
                 # If valid mapping found, save and return
                 if valid_mapping:
                     status.status = "success"
                     status.valid_mapping = valid_mapping
                     status.completed_at = isoformat(utc_now())
-                    self._persist_status(run_id, question_id, status)
+                    await self._persist_status_async(run_id, question_id, status)
                     
-                    self.logger.info(
+                    logger.info(
                         f"Status transition: success (attempt {attempt}, found valid mapping)",
                         run_id=run_id,
                         question_id=question_id,
@@ -804,7 +1012,8 @@ class StreamlinedMappingService:
                     )
 
                     # Update generation log with final success
-                    self.mapping_logger.log_generation(
+                    self._log_mapping_event(
+                        self.mapping_logger.log_generation,
                         run_id=run_id,
                         question_id=question_id,
                         question_number=question_number,
@@ -813,17 +1022,14 @@ class StreamlinedMappingService:
                             "attempt": attempt,
                             "total_attempts": attempt,
                             "mappings_validated": mappings_validated_count,
-                            "valid_mapping_preview": {
-                                "original": valid_mapping.get("original", "")[:50] + "..." if len(valid_mapping.get("original", "")) > 50 else valid_mapping.get("original", ""),
-                                "replacement": valid_mapping.get("replacement", "")[:50] + "..." if len(valid_mapping.get("replacement", "")) > 50 else valid_mapping.get("replacement", ""),
-                            },
+                            "valid_mapping_preview": _mapping_preview(valid_mapping),
                         },
                         mappings_generated=total_mappings_generated,
                     )
 
-                    await self._save_valid_mapping(run_id, question, valid_mapping)
+                    self._queue_valid_mapping(run_id, question, valid_mapping)
 
-                    live_logging_service.emit(
+                    self._emit_live_log(
                         run_id,
                         "smart_substitution",
                         "INFO",
@@ -847,14 +1053,13 @@ class StreamlinedMappingService:
 
                 # Collect failure rationales from validation outcomes
                 for outcome in status.validation_outcomes:
-                    if not outcome.is_valid and outcome.reasoning:
+                    if not outcome.is_valid and not outcome.skipped and outcome.reasoning:
                         rationale = f"Set {outcome.set_index}, Mapping {outcome.mapping_index + 1}: {outcome.reasoning}"
-                        if rationale not in status.failure_rationales:
-                            status.failure_rationales.append(rationale)
+                        status.add_failure_rationale(rationale)
 
                 # If all sets failed and we haven't exhausted retries, retry
                 if attempt < max_attempts:
-                    self.logger.info(
+                    logger.info(
                         f"Status transition: retrying (attempt {attempt} failed, moving to attempt {attempt + 1})",
                         run_id=run_id,
                         question_id=question_id,
@@ -868,9 +1073,9 @@ class StreamlinedMappingService:
                     status.status = "failed"
                     status.error = f"All {len(mapping_sets)} mapping sets failed validation after {max_attempts} attempt(s). {len(status.validation_outcomes)} validation(s) attempted, all invalid."
                     status.completed_at = isoformat(utc_now())
-                    self._persist_status(run_id, question_id, status)
+                    await self._persist_status_async(run_id, question_id, status)
                     
-                    self.logger.error(
+                    logger.error(
                         f"Status transition: failed (all {max_attempts} attempts exhausted)",
                         run_id=run_id,
                         question_id=question_id,
@@ -879,7 +1084,8 @@ class StreamlinedMappingService:
                     )
 
                     # Update generation log with final failure
-                    self.mapping_logger.log_generation(
+                    self._log_mapping_event(
+                        self.mapping_logger.log_generation,
                         run_id=run_id,
                         question_id=question_id,
                         question_number=question_number,
@@ -893,7 +1099,7 @@ class StreamlinedMappingService:
                         mappings_generated=total_mappings_generated,
                     )
 
-                    live_logging_service.emit(
+                    self._emit_live_log(
                         run_id,
                         "smart_substitution",
                         "ERROR",
@@ -920,9 +1126,9 @@ class StreamlinedMappingService:
             status.status = "failed"
             status.error = str(e)
             status.completed_at = isoformat(utc_now())
-            self._persist_status(run_id, question_id, status)
+            await self._persist_status_async(run_id, question_id, status)
             
-            self.logger.error(
+            logger.error(
                 f"Status transition: failed (exception occurred)",
                 run_id=run_id,
                 question_id=question_id,
@@ -932,7 +1138,8 @@ class StreamlinedMappingService:
             )
 
             # Update generation log with exception failure
-            self.mapping_logger.log_generation(
+            self._log_mapping_event(
+                self.mapping_logger.log_generation,
                 run_id=run_id,
                 question_id=question_id,
                 question_number=question_number,
@@ -945,7 +1152,7 @@ class StreamlinedMappingService:
                 mappings_generated=0,
             )
 
-            live_logging_service.emit(
+            self._emit_live_log(
                 run_id,
                 "smart_substitution",
                 "ERROR",
@@ -965,80 +1172,434 @@ class StreamlinedMappingService:
                 "error": str(e),
             }
 
-    def _determine_target_configs(
+    async def _load_structured(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Load structured data once per run; every question of the run reads the same document."""
+        async with self._structured_cache_lock:
+            if run_id not in self._structured_cache:
+                self._structured_cache[run_id] = await asyncio.to_thread(self.structured_manager.load, run_id)
+            return self._structured_cache[run_id]
+
+    def _prepare_all(
         self,
-        question_data: Dict[str, Any],
-        question_type: str,
-    ) -> List[Dict[str, Any]]:
-        """
-        Determine target configurations for 3 mapping sets.
-        
-        For MCQ: target different wrong options (up to 3)
-        For signal types: use different signal strategies
-        """
-        configs: List[Dict[str, Any]] = []
+        run_id: str,
+        questions: List[QuestionManipulation],
+        structured: Optional[Dict[str, Any]],
+    ) -> List[PreparedQuestion]:
+        """Build prompt inputs for every question of a run (runs in a worker thread)."""
+        return [self._prepare_question(run_id, question, structured) for question in questions]
 
-        if question_type in ["mcq_single", "mcq_multi", "matching"]:
-            # Target-based: get wrong options
-            options = question_data.get("options", {})
-            gold_answer = question_data.get("gold_answer", "")
-            
-            # Extract gold answer label (e.g., "B" from "B" or "B. Temperature")
-            gold_label = self._extract_label_from_string(gold_answer)
-            
-            # Get all option labels
-            option_labels = [k for k in options.keys() if k != gold_label]
-            
-            # Select up to 3 wrong options
-            for label in option_labels[:3]:
-                option_text = options.get(label, "")
-                configs.append({
-                    "target_option": label,
-                    "target_option_text": option_text,
-                    "signal_strategy": None,
-                })
-            
-            # If we have fewer than 3 options, pad with None
-            while len(configs) < 3:
-                configs.append({
-                    "target_option": None,
-                    "target_option_text": None,
-                    "signal_strategy": None,
-                })
+    def _prepare_question(
+        self,
+        run_id: str,
+        question: QuestionManipulation,
+        structured: Optional[Dict[str, Any]],
+    ) -> PreparedQuestion:
+        """Build prompt inputs for ``question``, capturing any error for its generation task to report."""
+        try:
+            question_data, target_configs = self._load_question_inputs(run_id, question, structured)
+        except Exception as e:
+            return PreparedQuestion(question=question, error=e)
+        return PreparedQuestion(question=question, question_data=question_data, target_configs=target_configs)
 
-        elif question_type == "true_false":
-            gold_label = self._extract_true_false_label(question_data.get("gold_answer"))
-            options = question_data.get("options") or {}
-            candidate_labels: List[str] = []
+    def _load_question_inputs(
+        self,
+        run_id: str,
+        question: QuestionManipulation,
+        structured: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Return the prompt inputs for ``question``: its question data and target configs."""
+        question_id = question.id
+        question_number = question.question_number
+        if not structured:
+            error_msg = f"Structured data not found for run {run_id}"
+            logger.error(error_msg, run_id=run_id, question_id=question_id)
+            raise ValueError(error_msg)
+
+        # Get question data
+        question_data = self.generator._get_question_data(run_id, question, structured)
+        question_data = self.generator._normalize_dict_keys(question_data)
+
+        # Get LaTeX stem text (fixed for the run, so extracted once per question)
+        latex_stem_text = self._latex_stem_cache.get((run_id, question_id))
+        if latex_stem_text is None:
+            if _stdlib_logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Extracting LaTeX stem text for question {question_number}",
+                    run_id=run_id,
+                    question_id=question_id,
+                )
+            latex_stem_text = self.generator._extract_latex_stem_text(run_id, question, structured)
+            if latex_stem_text:
+                self._latex_stem_cache[(run_id, question_id)] = latex_stem_text
+        if not latex_stem_text:
+            error_msg = f"Could not extract LaTeX stem text for question {question_id}"
+            logger.error(error_msg, run_id=run_id, question_id=question_id)
+            raise ValueError(error_msg)
+        question_data["latex_stem_text"] = latex_stem_text
 
-            for key in options.keys():
-                normalized = self._extract_true_false_label(key)
-                if normalized and normalized not in candidate_labels:
-                    candidate_labels.append(normalized)
-            for value in options.values():
-                normalized = self._extract_true_false_label(value)
-                if normalized and normalized not in candidate_labels:
-                    candidate_labels.append(normalized)
+        question_type = question_data.get("question_type", "mcq_single")
+        gold_answer = question_data.get("gold_answer", "")
+        options = question_data.get("options", {})
 
-            if not candidate_labels:
-                candidate_labels = ["True", "False"]
+        logger.info(
+            f"Question data loaded: type={question_type}, gold_answer={gold_answer}, options_count={len(options)}",
+            run_id=run_id,
+            question_id=question_id,
+            question_type=question_type,
+        )
 
-            candidate_labels = [
-                label for label in candidate_labels if label.upper() != gold_label.upper()
-            ]
-            if not candidate_labels:
-                candidate_labels = ["True" if gold_label.upper() == "FALSE" else "False"]
+        # Determine target options or signal strategies
+        target_configs = self._determine_target_configs(question_data, question_type)[:MAPPING_MAX_CONCURRENT_SETS]
+        logger.info(
+            f"Determined {len(target_configs)} target configs for question {question_number}",
+            run_id=run_id,
+            question_id=question_id,
+            target_configs=[{"target_option": c.get("target_option"), "signal_strategy": c.get("signal_strategy")} for c in target_configs],
+        )
+        return question_data, target_configs
 
-            for label in candidate_labels[:3]:
-                configs.append({
-                    "target_option": label,
-                    "target_option_text": label,
-                    "signal_strategy": None,
-                })
+    async def _submit_batch(
+        self,
+        run_id: str,
+        prepared: List[PreparedQuestion],
+    ) -> Dict[int, str]:
+        """
+        Run first-attempt generation for the ``prepared`` questions as one OpenAI Batch job.
 
-            while len(configs) < 3:
-                configs.append({
-                    "target_option": None,
+        Returns the raw response text per question id. Questions whose inputs could not be
+        built, or whose batch request failed, are left out so the caller generates them
+        in real time; any failure of the job itself returns an empty dict.
+        """
+        api_key = self._api_key
+        if not api_key or not AsyncOpenAI:
+            return {}
+
+        lines: List[bytes] = []
+        for item in prepared:
+            if item.error is not None:
+                # The real-time path reports the error for this question.
+                continue
+            question = item.question
+            prompt = self._build_generation_prompt_all_sets(
+                question_data=item.question_data,
+                target_configs=item.target_configs,
+            )
+            lines.append(
+                orjson.dumps(
+                    {
+                        "custom_id": f"{run_id}:{question.id}:1",
+                        "method": "POST",
+                        "url": "/v1/responses",
+                        "body": {
+                            "model": GPT5_MODEL,
+                            "input": self._generation_messages(prompt),
+                            "reasoning": {"effort": GPT5_GENERATION_REASONING_EFFORT},
+                            "max_output_tokens": GPT5_MAX_TOKENS,
+                            "metadata": {"task": "mapping_generation", "run_id": run_id, "question_id": str(question.id)},
+                        },
+                    }
+                )
+            )
+        if len(lines) < 2:
+            return {}
+
+        client = self._get_openai_client()
+        try:
+            batch_file = await client.files.create(
+                file=(f"mapping_generation_{run_id}.jsonl", b"\n".join(lines)),
+                purpose="batch",
+            )
+            batch = await client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/responses",
+                completion_window="24h",
+                metadata={"task": "mapping_generation", "run_id": run_id},
+            )
+            self._emit_live_log(
+                run_id,
+                "smart_substitution",
+                "INFO",
+                f"Submitted batch mapping generation for {len(lines)} questions",
+                component="mapping_generation",
+                context={"batch_id": batch.id, "questions": len(lines)},
+            )
+            # The job's completion window is 24h; the run only waits BATCH_MAX_WAIT for it.
+            deadline = time.monotonic() + BATCH_MAX_WAIT
+            while batch.status not in {"completed", "failed", "expired", "cancelled"}:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(
+                        f"Batch mapping generation still {batch.status} after {BATCH_MAX_WAIT}s; "
+                        "cancelling and falling back to real-time calls",
+                        run_id=run_id,
+                        batch_id=batch.id,
+                    )
+                    try:
+                        await client.batches.cancel(batch.id)
+                    except Exception as e:
+                        logger.warning(f"Failed to cancel batch {batch.id}: {e}", run_id=run_id)
+                    return {}
+                await asyncio.sleep(min(BATCH_POLL_INTERVAL, remaining))
+                batch = await client.batches.retrieve(batch.id)
+
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.warning(
+                    f"Batch mapping generation ended with status {batch.status}; falling back to real-time calls",
+                    run_id=run_id,
+                    batch_id=batch.id,
+                )
+                return {}
+            output = await client.files.content(batch.output_file_id)
+        except Exception as e:
+            logger.warning(
+                f"Batch mapping generation failed; falling back to real-time calls: {e}",
+                run_id=run_id,
+                error_type=type(e).__name__,
+            )
+            return {}
+
+        prefetched: Dict[int, str] = {}
+        for line in output.content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+                _, question_id, _ = record["custom_id"].rsplit(":", 2)
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                content = coerce_response_body_text(response.get("body"))
+            except (orjson.JSONDecodeError, KeyError, ValueError, AttributeError):
+                continue
+            if content:
+                prefetched[int(question_id)] = content
+
+        logger.info(
+            f"Batch mapping generation returned {len(prefetched)}/{len(lines)} responses",
+            run_id=run_id,
+            batch_id=batch.id,
+        )
+        return prefetched
+
+    def _record_validation_outcome(
+        self,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        question_data: Dict[str, Any],
+        status: QuestionGenerationStatus,
+        attempt: int,
+        set_idx: int,
+        mapping_idx: int,
+        mapping: Dict[str, Any],
+        validation_result: Any,
+        pending_logs: List[Dict[str, Any]],
+        quiet: bool = False,
+    ) -> ValidationResult:
+        """Record and log one validation verdict (or the exception it raised).
+
+        The mapping log entry is appended to ``pending_logs``; the caller writes those
+        entries together with ``_flush_validation_logs``. ``quiet`` verdicts (arriving
+        after a valid mapping was found) are only recorded in the status.
+        """
+        # Handle exceptions from validation
+        if isinstance(validation_result, Exception):
+            error_type = type(validation_result).__name__
+            error_msg = str(validation_result)
+            logger.error(
+                f"Validation exception for mapping {mapping_idx}: {error_type}: {error_msg}",
+                run_id=run_id,
+                question_id=question_id,
+                set_index=set_idx,
+                mapping_index=mapping_idx,
+                attempt=attempt,
+                error_type=error_type,
+                # The exception came back from a finished task, not an active handler
+                exc_info=(
+                    (type(validation_result), validation_result, validation_result.__traceback__)
+                    if validation_result.__traceback__ is not None
+                    else False
+                ),
+            )
+            # Create a failed validation result
+            validation_result = ValidationResult(
+                is_valid=False,
+                confidence=0.0,
+                deviation_score=0.0,
+                reasoning=f"Validation error: {error_msg}",
+                semantic_similarity=0.0,
+                factual_accuracy=False,
+                question_type_specific_notes=f"Validation exception: {error_type}",
+                gold_answer=question_data.get("gold_answer", ""),
+                test_answer="",
+                model_used="none"
+            )
+
+        outcome = ValidationOutcome(
+            attempt=attempt,
+            set_index=set_idx,
+            mapping_index=mapping_idx,
+            is_valid=validation_result.is_valid,
+            confidence=validation_result.confidence,
+            deviation_score=validation_result.deviation_score,
+            reasoning=validation_result.reasoning,
+            test_answer=validation_result.test_answer,
+            target_matched=validation_result.target_matched,
+        )
+        status.validation_outcomes.append(outcome)
+        if quiet:
+            return validation_result
+
+        # Log validation event
+        pending_logs.append(
+            {
+                "mapping_index": mapping_idx,
+                "status": "success" if validation_result.is_valid else "failed",
+                "details": {
+                    "validation_result": {
+                        "is_valid": validation_result.is_valid,
+                        "confidence": validation_result.confidence,
+                        "deviation_score": validation_result.deviation_score,
+                        "reasoning": validation_result.reasoning,
+                        "test_answer": validation_result.test_answer,
+                        "target_matched": validation_result.target_matched,
+                    },
+                    "set_index": set_idx,
+                    "attempt": attempt,
+                    "mapping_preview": _mapping_preview(mapping),
+                },
+            }
+        )
+
+        self._emit_live_log(
+            run_id,
+            "smart_substitution",
+            "INFO" if validation_result.is_valid else "WARNING",
+            f"Validation result for question {question_number}, Set {set_idx}, Mapping {mapping_idx + 1}: {'Valid' if validation_result.is_valid else 'Invalid'}",
+            component="mapping_generation",
+            context={
+                "question_id": question_id,
+                "question_number": question_number,
+                "attempt": attempt,
+                "set_index": set_idx,
+                "mapping_index": mapping_idx,
+                "is_valid": validation_result.is_valid,
+                "confidence": validation_result.confidence,
+                "deviation_score": validation_result.deviation_score,
+                "reasoning": validation_result.reasoning,
+            },
+        )
+
+        return validation_result
+
+    def _flush_validation_logs(
+        self,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        status: QuestionGenerationStatus,
+        pending_logs: List[Dict[str, Any]],
+    ) -> None:
+        """Write the validation log entries recorded since the last flush.
+
+        The status only changed in memory; it is marked dirty and written at the next
+        checkpoint (end of the validation phase or a status transition).
+        """
+        self._mark_status_dirty(run_id, question_id)
+        if pending_logs:
+            self._log_mapping_event(
+                self.mapping_logger.log_validation_batch,
+                run_id=run_id,
+                question_id=question_id,
+                question_number=question_number,
+                entries=list(pending_logs),
+            )
+            pending_logs.clear()
+
+    @staticmethod
+    def _mapping_dedup_key(mapping: Dict[str, Any], target_config: Dict[str, Any]) -> _MappingKey:
+        """Identity of a substitution for validation purposes; the verdict depends on the target too."""
+        return (
+            str(mapping.get("original") or "").strip(),
+            str(mapping.get("replacement") or "").strip(),
+            target_config.get("target_option"),
+            target_config.get("signal_strategy"),
+        )
+
+    def _determine_target_configs(
+        self,
+        question_data: Dict[str, Any],
+        question_type: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        Determine target configurations for 3 mapping sets.
+        
+        For MCQ: target different wrong options (up to 3)
+        For signal types: use different signal strategies
+        """
+        configs: List[Dict[str, Any]] = []
+
+        if question_type in ["mcq_single", "mcq_multi", "matching"]:
+            # Target-based: get wrong options
+            options = question_data.get("options", {})
+            gold_answer = question_data.get("gold_answer", "")
+            
+            # Extract gold answer label (e.g., "B" from "B" or "B. Temperature")
+            gold_label = self._extract_label_from_string(gold_answer)
+            
+            # Get all option labels
+            option_labels = [k for k in options.keys() if k != gold_label]
+            
+            # Select up to 3 wrong options
+            for label in option_labels[:3]:
+                option_text = options.get(label, "")
+                configs.append({
+                    "target_option": label,
+                    "target_option_text": option_text,
+                    "signal_strategy": None,
+                })
+            
+            # If we have fewer than 3 options, pad with None
+            while len(configs) < 3:
+                configs.append({
+                    "target_option": None,
+                    "target_option_text": None,
+                    "signal_strategy": None,
+                })
+
+        elif question_type == "true_false":
+            gold_label = self._extract_true_false_label(question_data.get("gold_answer"))
+            options = question_data.get("options") or {}
+            candidate_labels: List[str] = []
+
+            for key in options.keys():
+                normalized = self._extract_true_false_label(key)
+                if normalized and normalized not in candidate_labels:
+                    candidate_labels.append(normalized)
+            for value in options.values():
+                normalized = self._extract_true_false_label(value)
+                if normalized and normalized not in candidate_labels:
+                    candidate_labels.append(normalized)
+
+            if not candidate_labels:
+                candidate_labels = ["True", "False"]
+
+            candidate_labels = [
+                label for label in candidate_labels if label.upper() != gold_label.upper()
+            ]
+            if not candidate_labels:
+                candidate_labels = ["True" if gold_label.upper() == "FALSE" else "False"]
+
+            for label in candidate_labels[:3]:
+                configs.append({
+                    "target_option": label,
+                    "target_option_text": label,
+                    "signal_strategy": None,
+                })
+
+            while len(configs) < 3:
+                configs.append({
+                    "target_option": None,
                     "target_option_text": None,
                     "signal_strategy": None,
                 })
@@ -1064,32 +1625,13 @@ class StreamlinedMappingService:
         """Extract single-letter label from string like 'B. Temperature' or 'B)'."""
         if not text:
             return ""
-        
-        # Try to extract single letter at start
-        match = re.match(r"^([A-Z])[\.\)\s]", text.strip())
-        if match:
-            return match.group(1)
-        
-        # If it's just a single letter
-        if len(text.strip()) == 1 and text.strip().isalpha():
-            return text.strip().upper()
-        
-        return text.strip()
+        return _label_from_string(text)
 
     def _extract_true_false_label(self, value: Optional[str]) -> str:
         """Normalize various representations of True/False answers."""
         if not value:
             return ""
-        text = str(value).strip().lower()
-        if text in {"true", "t", "1"}:
-            return "True"
-        if text in {"false", "f", "0"}:
-            return "False"
-        if text.startswith("true"):
-            return "True"
-        if text.startswith("false"):
-            return "False"
-        return ""
+        return _true_false_label(str(value))
 
     async def _generate_all_mapping_sets(
         self,
@@ -1100,9 +1642,21 @@ class StreamlinedMappingService:
         target_configs: List[Dict[str, Any]],
         attempt: int,
         failure_rationales: Optional[List[str]] = None,
+        prefetched_content: Optional[str] = None,
+        use_cache: bool = True,
+        on_set: Optional[Callable[[Dict[str, Any]], None]] = None,
+        stop_event: Optional[asyncio.Event] = None,
     ) -> List[Dict[str, Any]]:
         """
         Generate all mapping sets in ONE call using GPT-5.1 Responses API.
+
+        When ``prefetched_content`` holds a response obtained earlier (Batch API), it
+        is parsed instead of calling the model. Otherwise a response cached for the
+        identical request under the run directory is reused when ``use_cache`` is set.
+
+        With ``on_set`` (and STREAM_GENERATION on) the response is streamed and each
+        set is passed to ``on_set`` as soon as it is complete; once ``stop_event`` is
+        set the stream is closed and only the sets received so far are returned.
         
         Returns list of dicts with keys: set_index, mappings, target_config
         """
@@ -1111,28 +1665,240 @@ class StreamlinedMappingService:
             target_configs=target_configs,
             failure_rationales=failure_rationales,
         )
+        cache = LLMCache(run_id)
+        key = cache_key(
+            {
+                "task": "mapping_generation",
+                "model": GPT5_MODEL,
+                "prompt": prompt,
+                "schema": MAPPING_GENERATION_SCHEMA,
+                "effort": GPT5_GENERATION_REASONING_EFFORT,
+                "max_output_tokens": GPT5_MAX_TOKENS,
+            }
+        )
+        stored = None if prefetched_content is not None or not use_cache else await asyncio.to_thread(cache.get, key)
+        ready_content = prefetched_content if prefetched_content is not None else (stored or {}).get("content")
+        if ready_content:
+            result_sets = await asyncio.to_thread(
+                self._parse_mapping_sets,
+                run_id=run_id,
+                question_id=question_id,
+                question_number=question_number,
+                question_data=question_data,
+                target_configs=target_configs,
+                attempt=attempt,
+                content=ready_content,
+                response=None,
+            )
+            if stored is None:
+                await self._store_cached_response(cache, key, {"content": ready_content}, run_id)
+            return result_sets
 
         # Log before API call
-        prompt_preview = prompt[:200] + "..." if len(prompt) > 200 else prompt
-        self.logger.debug(
-            f"Generating all mapping sets in one call (attempt {attempt})",
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            prompt_preview = prompt[:200] + "..." if len(prompt) > 200 else prompt
+            logger.debug(
+                f"Generating all mapping sets in one call (attempt {attempt})",
+                run_id=run_id,
+                question_id=question_id,
+                attempt=attempt,
+                sets_count=len(target_configs),
+                prompt_preview=prompt_preview,
+                failure_rationales_count=len(failure_rationales) if failure_rationales else 0,
+            )
+
+        api_key = self._api_key
+        if not api_key or not AsyncOpenAI:
+            error_msg = "OpenAI API key not configured or AsyncOpenAI not available"
+            logger.error(error_msg, run_id=run_id, question_id=question_id)
+            raise RuntimeError(error_msg)
+
+        client = self._get_openai_client()
+
+        messages = self._generation_messages(prompt)
+
+        try:
+            if on_set is not None and STREAM_GENERATION:
+                return await self._stream_mapping_sets(
+                    client,
+                    messages,
+                    cache=cache,
+                    key=key,
+                    run_id=run_id,
+                    question_id=question_id,
+                    question_number=question_number,
+                    question_data=question_data,
+                    target_configs=target_configs,
+                    attempt=attempt,
+                    on_set=on_set,
+                    stop_event=stop_event,
+                )
+
+            # Use AsyncOpenAI directly for native async performance
+            # NOTE: GPT-5.1 Responses API may not support response_format with json_schema
+            # Instead, we rely on explicit prompt instructions and few-shot examples
+            await acquire_openai_slot()
+            response = await client.responses.create(
+                model=GPT5_MODEL,
+                input=messages,
+                reasoning={"effort": GPT5_GENERATION_REASONING_EFFORT},
+                max_output_tokens=GPT5_MAX_TOKENS,
+                metadata={"task": "mapping_generation", "run_id": run_id, "question_id": str(question_id)},
+            )
+            record_openai_usage(response)
+
+            # Text extraction and JSON parsing of large replies stay off the event loop
+            content, result_sets = await asyncio.to_thread(
+                self._parse_generation_response,
+                run_id=run_id,
+                question_id=question_id,
+                question_number=question_number,
+                question_data=question_data,
+                target_configs=target_configs,
+                attempt=attempt,
+                response=response,
+            )
+            # Only responses that parsed into mapping sets are worth replaying.
+            await self._store_cached_response(cache, key, {"content": content}, run_id)
+            return result_sets
+
+        except Exception as e:
+            logger.error(
+                f"Failed to generate all mapping sets: {e}",
+                run_id=run_id,
+                question_id=question_id,
+                exc_info=True,
+            )
+            raise
+
+    async def _stream_mapping_sets(
+        self,
+        client: Any,
+        messages: List[Dict[str, Any]],
+        cache: LLMCache,
+        key: str,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        question_data: Dict[str, Any],
+        target_configs: List[Dict[str, Any]],
+        attempt: int,
+        on_set: Callable[[Dict[str, Any]], None],
+        stop_event: Optional[asyncio.Event],
+    ) -> List[Dict[str, Any]]:
+        """Streaming variant of the generation call; see ``_generate_all_mapping_sets``."""
+        await acquire_openai_slot()
+        stream = await client.responses.create(
+            model=GPT5_MODEL,
+            input=messages,
+            reasoning={"effort": GPT5_GENERATION_REASONING_EFFORT},
+            max_output_tokens=GPT5_MAX_TOKENS,
+            metadata={"task": "mapping_generation", "run_id": run_id, "question_id": str(question_id)},
+            stream=True,
+        )
+        splitter = _MappingSetSplitter()
+        parts: List[str] = []
+        streamed_sets: List[Dict[str, Any]] = []
+        try:
+            async for event in stream:
+                event_type = getattr(event, "type", None)
+                if event_type == "response.completed":
+                    record_openai_usage(getattr(event, "response", None))
+                if event_type != "response.output_text.delta":
+                    continue
+                parts.append(event.delta)
+                for set_data in splitter.feed(event.delta):
+                    result_set = self._build_mapping_set(
+                        run_id=run_id,
+                        question_id=question_id,
+                        question_number=question_number,
+                        question_data=question_data,
+                        target_configs=target_configs,
+                        set_data=set_data,
+                    )
+                    if result_set is not None:
+                        streamed_sets.append(result_set)
+                        on_set(result_set)
+                if stop_event is not None and stop_event.is_set():
+                    # A streamed mapping already validated; the rest of the output is not needed.
+                    logger.info(
+                        f"Stopped generation stream after {len(streamed_sets)} set(s)",
+                        run_id=run_id,
+                        question_id=question_id,
+                        attempt=attempt,
+                    )
+                    return streamed_sets
+        finally:
+            await stream.close()
+
+        content = "".join(parts)
+        if not content.strip():
+            logger.error(
+                f"Empty response from GPT-5.1 Responses API",
+                run_id=run_id,
+                question_id=question_id,
+                attempt=attempt,
+            )
+            raise ValueError("Empty response from GPT-5.1 Responses API")
+
+        # The complete text goes through the regular parser, which also covers output
+        # the incremental splitter could not cut into sets.
+        result_sets = await asyncio.to_thread(
+            self._parse_mapping_sets,
             run_id=run_id,
             question_id=question_id,
+            question_number=question_number,
+            question_data=question_data,
+            target_configs=target_configs,
             attempt=attempt,
-            sets_count=len(target_configs),
-            prompt_preview=prompt_preview,
-            failure_rationales_count=len(failure_rationales) if failure_rationales else 0,
+            content=content,
+            response=None,
         )
+        await self._store_cached_response(cache, key, {"content": content}, run_id)
+        return result_sets
 
-        api_key = os.getenv("OPENAI_API_KEY") or current_app.config.get("OPENAI_API_KEY")
-        if not api_key or not AsyncOpenAI:
-            error_msg = "OpenAI API key not configured or AsyncOpenAI not available"
-            self.logger.error(error_msg, run_id=run_id, question_id=question_id)
-            raise RuntimeError(error_msg)
+    def _get_openai_client(self) -> AsyncOpenAI:
+        """AsyncOpenAI client for the running loop, also handed to the validator.
 
-        client = AsyncOpenAI(api_key=api_key, timeout=API_TIMEOUT)
+        Keeping one client (and its connection pool) per loop avoids a TCP/TLS handshake
+        per request; a fresh loop gets a new client because the pool is bound to the loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            http_client = DefaultAsyncHttpxClient(
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=MAPPING_MAX_CONCURRENT + VALIDATION_MAX_CONCURRENT + 8,
+                    max_keepalive_connections=32,
+                ),
+            )
+            self._client = AsyncOpenAI(api_key=self._api_key, timeout=API_TIMEOUT, http_client=http_client)
+            self._client_loop = loop
+            self.validator.set_openai_client(self._client)
+        return self._client
+
+    async def _close_openai_client(self) -> None:
+        """Close the shared client's connections at the end of a generation run."""
+        client, self._client, self._client_loop = self._client, None, None
+        if client is None:
+            return
+        self.validator.set_openai_client(None)
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close OpenAI client: {e}")
 
-        messages = [
+    async def _store_cached_response(self, cache: LLMCache, key: str, value: Dict[str, Any], run_id: str) -> None:
+        """Write a response to the run's LLM cache without blocking the event loop on file I/O."""
+        try:
+            await asyncio.to_thread(cache.set, key, value)
+        except OSError as e:
+            # The cache only saves round-trips; a failed write must not fail generation.
+            logger.warning(f"Failed to cache LLM response: {e}", run_id=run_id)
+
+    def _generation_messages(self, prompt: str) -> List[Dict[str, Any]]:
+        """Wrap a generation prompt in the Responses API input messages."""
+        return [
             {
                 "role": "system",
                 "content": [
@@ -1152,251 +1918,240 @@ class StreamlinedMappingService:
             },
         ]
 
-        try:
-            # Use AsyncOpenAI directly for native async performance
-            # NOTE: GPT-5.1 Responses API may not support response_format with json_schema
-            # Instead, we rely on explicit prompt instructions and few-shot examples
-            response = await client.responses.create(
-                model=GPT5_MODEL,
-                input=messages,
-                reasoning={"effort": GPT5_GENERATION_REASONING_EFFORT},
-                max_output_tokens=GPT5_MAX_TOKENS,
-                metadata={"task": "mapping_generation", "run_id": run_id, "question_id": str(question_id)},
+    def _parse_generation_response(
+        self,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        question_data: Dict[str, Any],
+        target_configs: List[Dict[str, Any]],
+        attempt: int,
+        response: Any,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Extract the text of a generation response and parse it into mapping sets."""
+        # Extract response content with better error handling
+        content = coerce_response_text(response)
+        if not content or not content.strip():
+            # Log response metadata for debugging
+            response_id = getattr(response, "id", None)
+            response_model = getattr(response, "model", None)
+            logger.error(
+                f"Empty response from GPT-5.1 Responses API",
+                run_id=run_id,
+                question_id=question_id,
+                attempt=attempt,
+                response_id=response_id,
+                response_model=response_model,
             )
+            raise ValueError("Empty response from GPT-5.1 Responses API")
 
-            # Extract response content with better error handling
-            content = coerce_response_text(response)
-            if not content or not content.strip():
-                # Log response metadata for debugging
-                response_id = getattr(response, "id", None)
-                response_model = getattr(response, "model", None)
-                self.logger.error(
-                    f"Empty response from GPT-5.1 Responses API",
-                    run_id=run_id,
-                    question_id=question_id,
-                    attempt=attempt,
-                    response_id=response_id,
-                    response_model=response_model,
-                )
-                raise ValueError("Empty response from GPT-5.1 Responses API")
+        result_sets = self._parse_mapping_sets(
+            run_id=run_id,
+            question_id=question_id,
+            question_number=question_number,
+            question_data=question_data,
+            target_configs=target_configs,
+            attempt=attempt,
+            content=content,
+            response=response,
+        )
+        return content, result_sets
 
-            # Parse JSON response with comprehensive error handling and recovery
-            parsed = None
-            content_original = content
-            
-            # Strategy 1: Try direct JSON parsing
-            try:
-                parsed = json.loads(content)
-            except json.JSONDecodeError as json_err:
-                self.logger.warning(
-                    f"Direct JSON parse failed, attempting recovery: {json_err}",
-                    run_id=run_id,
-                    question_id=question_id,
-                    attempt=attempt,
-                    error_pos=json_err.pos if hasattr(json_err, 'pos') else None,
-                )
-                
-                # Strategy 2: Extract from markdown code blocks
-                for marker in ["```json", "```"]:
-                    if marker in content:
-                        try:
-                            json_start = content.find(marker) + len(marker)
-                            json_end = content.find("```", json_start)
-                            if json_end > json_start:
-                                extracted = content[json_start:json_end].strip()
-                                parsed = json.loads(extracted)
-                                self.logger.info(
-                                    f"Successfully extracted JSON from {marker} code block",
-                                    run_id=run_id,
-                                    question_id=question_id,
-                                )
-                                break
-                        except (json.JSONDecodeError, ValueError):
-                            continue
-                
-                # Strategy 3: Try to find JSON object boundaries
-                if parsed is None:
-                    try:
-                        # Find first { and last }
-                        first_brace = content.find("{")
-                        last_brace = content.rfind("}")
-                        if first_brace >= 0 and last_brace > first_brace:
-                            extracted = content[first_brace:last_brace + 1]
-                            parsed = json.loads(extracted)
-                            self.logger.info(
-                                f"Successfully extracted JSON by finding brace boundaries",
-                                run_id=run_id,
-                                question_id=question_id,
-                            )
-                    except (json.JSONDecodeError, ValueError):
-                        pass
-                
-                # Strategy 4: Try to fix common JSON issues
-                if parsed is None:
-                    try:
-                        # Remove leading/trailing whitespace and non-JSON text
-                        cleaned = content.strip()
-                        # Remove text before first {
-                        first_brace = cleaned.find("{")
-                        if first_brace > 0:
-                            cleaned = cleaned[first_brace:]
-                        # Remove text after last }
-                        last_brace = cleaned.rfind("}")
-                        if last_brace >= 0:
-                            cleaned = cleaned[:last_brace + 1]
-                        
-                        # Try to fix unterminated strings (common issue)
-                        # This is a heuristic - count quotes and try to balance
-                        quote_count = cleaned.count('"')
-                        if quote_count % 2 != 0:
-                            # Odd number of quotes - might be unterminated string
-                            # Try adding a closing quote before the last }
-                            last_quote_pos = cleaned.rfind('"')
-                            if last_quote_pos > 0 and last_quote_pos < len(cleaned) - 2:
-                                # Check if it's likely an unterminated string
-                                before_quote = cleaned[last_quote_pos - 1] if last_quote_pos > 0 else ''
-                                after_quote = cleaned[last_quote_pos + 1] if last_quote_pos + 1 < len(cleaned) else ''
-                                if before_quote != '\\' and after_quote not in ['"', ',', '}', ']', ':', ' ']:
-                                    # Might need to close the string
-                                    cleaned = cleaned[:last_quote_pos + 1] + '"' + cleaned[last_quote_pos + 1:]
-                        
-                        parsed = json.loads(cleaned)
-                        self.logger.info(
-                            f"Successfully parsed JSON after cleaning",
-                            run_id=run_id,
-                            question_id=question_id,
-                        )
-                    except (json.JSONDecodeError, ValueError) as e:
-                        # All recovery strategies failed
-                        content_preview = content[:500] + "..." if len(content) > 500 else content
-                        response_id = getattr(response, "id", None)
-                        response_model = getattr(response, "model", None)
-                        self.logger.error(
-                            f"All JSON parsing recovery strategies failed: {json_err}",
-                            run_id=run_id,
-                            question_id=question_id,
-                            attempt=attempt,
-                            original_error=str(json_err),
-                            recovery_error=str(e),
-                            content_preview=content_preview,
-                            content_length=len(content),
-                            response_id=response_id,
-                            response_model=response_model,
-                        )
-                        raise json_err
-            
-            if parsed is None:
-                raise ValueError("Failed to parse JSON response after all recovery attempts")
+    def _parse_mapping_sets(
+        self,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        question_data: Dict[str, Any],
+        target_configs: List[Dict[str, Any]],
+        attempt: int,
+        content: str,
+        response: Any,
+    ) -> List[Dict[str, Any]]:
+        """Parse a generation response into mapping sets matched with ``target_configs``."""
+        # Parse JSON response with comprehensive error handling and recovery
+        parsed = None
+
+        # Strategy 1: Try direct JSON parsing
+        try:
+            parsed = orjson.loads(content)
+        except orjson.JSONDecodeError as json_err:
+            logger.warning(
+                f"Direct JSON parse failed, attempting recovery: {json_err}",
+                run_id=run_id,
+                question_id=question_id,
+                attempt=attempt,
+                error_pos=json_err.pos if hasattr(json_err, 'pos') else None,
+            )
 
-            # Validate response structure
-            if not isinstance(parsed, dict):
-                raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
-            
-            mapping_sets_data = parsed.get("mapping_sets", [])
+            # Strategy 2: Extract from a markdown code block
+            fence = _JSON_FENCE_RE.search(content)
+            if fence:
+                try:
+                    parsed = orjson.loads(fence.group(1))
+                    logger.info(
+                        f"Successfully extracted JSON from code block",
+                        run_id=run_id,
+                        question_id=question_id,
+                    )
+                except orjson.JSONDecodeError:
+                    pass
 
-            if not mapping_sets_data:
-                response_id = getattr(response, "id", None)
-                self.logger.warning(
-                    f"No mapping_sets found in response",
-                    run_id=run_id,
-                    question_id=question_id,
-                    attempt=attempt,
-                    response_id=response_id,
-                    parsed_keys=list(parsed.keys()) if isinstance(parsed, dict) else None,
-                )
-                raise ValueError("No mapping_sets found in response")
-
-            # Process each set and match with target_configs
-            result_sets = []
-            for set_data in mapping_sets_data:
-                set_idx = set_data.get("set_index")
-                if set_idx is None or set_idx < 1 or set_idx > len(target_configs):
-                    self.logger.warning(
-                        f"Invalid set_index {set_idx} in response, skipping",
+            # Strategy 3: Decode the first complete object, ignoring surrounding text
+            if parsed is None:
+                try:
+                    first_brace = content.find("{")
+                    if first_brace < 0:
+                        raise ValueError("No JSON object in response")
+                    parsed, _ = _JSON_DECODER.raw_decode(content, first_brace)
+                    logger.info(
+                        f"Successfully extracted JSON object from surrounding text",
                         run_id=run_id,
                         question_id=question_id,
                     )
-                    continue
-                
-                target_config = target_configs[set_idx - 1]  # Convert to 0-based index
-                mappings = set_data.get("mappings", [])
-
-                # Add metadata to each mapping and validate length constraint
-                valid_mappings = []
-                for mapping in mappings:
-                    original = mapping.get("original", "")
-                    replacement = mapping.get("replacement", "")
-                    
-                    # Validate length constraint: replacement must be <= original length
-                    if len(replacement) > len(original):
-                        self.logger.warning(
-                            f"Mapping rejected: replacement length ({len(replacement)}) > original length ({len(original)})",
-                            run_id=run_id,
-                            question_id=question_id,
-                            set_index=set_idx,
-                            original_preview=original[:50],
-                            replacement_preview=replacement[:50],
-                        )
-                        continue  # Skip this mapping
-                    
-                    mapping["latex_stem_text"] = question_data.get("latex_stem_text", "")
-                    mapping["question_index"] = question_number
-                    if target_config.get("target_option"):
-                        mapping["target_option"] = target_config["target_option"]
-                        mapping["target_option_text"] = target_config.get("target_option_text")
-                    if target_config.get("signal_strategy"):
-                        mapping["signal_strategy"] = target_config["signal_strategy"]
-                        signal_phrase = str(mapping.get("signal_phrase") or "").strip()
-                        if not signal_phrase:
-                            self.logger.warning(
-                                "Signal mapping missing 'signal_phrase'; skipping mapping",
-                                run_id=run_id,
-                                question_id=question_id,
-                                set_index=set_idx,
-                            )
-                            continue
-                        mapping["signal_phrase"] = signal_phrase
-                        signal_type = str(mapping.get("signal_type") or target_config["signal_strategy"]).strip()
-                        mapping["signal_type"] = signal_type or target_config["signal_strategy"]
-                        signal_notes = str(mapping.get("signal_notes") or "").strip()
-                        if not signal_notes:
-                            signal_notes = f"Detection cue for {target_config['signal_strategy']} strategy"
-                        mapping["signal_notes"] = signal_notes
-                    
-                    valid_mappings.append(mapping)
-                
-                # Use only valid mappings
-                mappings = valid_mappings
-                
-                # Warn if all mappings in a set were rejected
-                if not mappings and set_data.get("mappings"):
-                    self.logger.warning(
-                        f"All mappings in set {set_idx} were rejected due to length constraint violations",
+                except (json.JSONDecodeError, ValueError) as e:
+                    # All recovery strategies failed
+                    content_preview = content[:500] + "..." if len(content) > 500 else content
+                    response_id = getattr(response, "id", None)
+                    response_model = getattr(response, "model", None)
+                    logger.error(
+                        f"All JSON parsing recovery strategies failed: {json_err}",
                         run_id=run_id,
                         question_id=question_id,
-                        set_index=set_idx,
-                        original_mappings_count=len(set_data.get("mappings", [])),
+                        attempt=attempt,
+                        original_error=str(json_err),
+                        recovery_error=str(e),
+                        content_preview=content_preview,
+                        content_length=len(content),
+                        response_id=response_id,
+                        response_model=response_model,
                     )
+                    raise json_err
 
-                result_sets.append({
-                    "set_index": set_idx,
-                    "mappings": mappings,
-                    "target_config": target_config,
-                })
+        if parsed is None:
+            raise ValueError("Failed to parse JSON response after all recovery attempts")
+
+        # Validate response structure
+        if not isinstance(parsed, dict):
+            raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
+        
+        mapping_sets_data = parsed.get("mapping_sets", [])
 
-            if not result_sets:
-                raise ValueError("No valid mapping sets found in response")
+        if not mapping_sets_data:
+            response_id = getattr(response, "id", None)
+            logger.warning(
+                f"No mapping_sets found in response",
+                run_id=run_id,
+                question_id=question_id,
+                attempt=attempt,
+                response_id=response_id,
+                parsed_keys=list(parsed.keys()) if isinstance(parsed, dict) else None,
+            )
+            raise ValueError("No mapping_sets found in response")
 
-            return result_sets
+        # Process each set and match with target_configs
+        result_sets = []
+        for set_data in mapping_sets_data:
+            result_set = self._build_mapping_set(
+                run_id=run_id,
+                question_id=question_id,
+                question_number=question_number,
+                question_data=question_data,
+                target_configs=target_configs,
+                set_data=set_data,
+            )
+            if result_set is not None:
+                result_sets.append(result_set)
 
-        except Exception as e:
-            self.logger.error(
-                f"Failed to generate all mapping sets: {e}",
+        if not result_sets:
+            raise ValueError("No valid mapping sets found in response")
+
+        return result_sets
+
+    def _build_mapping_set(
+        self,
+        run_id: str,
+        question_id: int,
+        question_number: str,
+        question_data: Dict[str, Any],
+        target_configs: List[Dict[str, Any]],
+        set_data: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """Match one parsed ``mapping_sets`` entry with its target config and filter its mappings."""
+        set_idx = set_data.get("set_index")
+        if set_idx is None or set_idx < 1 or set_idx > len(target_configs):
+            logger.warning(
+                f"Invalid set_index {set_idx} in response, skipping",
                 run_id=run_id,
                 question_id=question_id,
-                exc_info=True,
             )
-            raise
+            return None
+
+        target_config = target_configs[set_idx - 1]  # Convert to 0-based index
+        mappings = set_data.get("mappings", [])
+
+        # Add metadata to each mapping and validate length constraint
+        valid_mappings = []
+        for mapping in mappings:
+            original = mapping.get("original", "")
+            replacement = mapping.get("replacement", "")
+
+            # Validate length constraint: replacement must be <= original length
+            if len(replacement) > len(original):
+                logger.warning(
+                    f"Mapping rejected: replacement length ({len(replacement)}) > original length ({len(original)})",
+                    run_id=run_id,
+                    question_id=question_id,
+                    set_index=set_idx,
+                    original_preview=original[:50],
+                    replacement_preview=replacement[:50],
+                )
+                continue  # Skip this mapping
+
+            mapping["latex_stem_text"] = question_data.get("latex_stem_text", "")
+            mapping["question_index"] = question_number
+            if target_config.get("target_option"):
+                mapping["target_option"] = target_config["target_option"]
+                mapping["target_option_text"] = target_config.get("target_option_text")
+            if target_config.get("signal_strategy"):
+                mapping["signal_strategy"] = target_config["signal_strategy"]
+                signal_phrase = str(mapping.get("signal_phrase") or "").strip()
+                if not signal_phrase:
+                    logger.warning(
+                        "Signal mapping missing 'signal_phrase'; skipping mapping",
+                        run_id=run_id,
+                        question_id=question_id,
+                        set_index=set_idx,
+                    )
+                    continue
+                mapping["signal_phrase"] = signal_phrase
+                signal_type = str(mapping.get("signal_type") or target_config["signal_strategy"]).strip()
+                mapping["signal_type"] = signal_type or target_config["signal_strategy"]
+                signal_notes = str(mapping.get("signal_notes") or "").strip()
+                if not signal_notes:
+                    signal_notes = f"Detection cue for {target_config['signal_strategy']} strategy"
+                mapping["signal_notes"] = signal_notes
+
+            valid_mappings.append(mapping)
+
+        # Use only valid mappings
+        mappings = valid_mappings
+
+        # Warn if all mappings in a set were rejected
+        if not mappings and set_data.get("mappings"):
+            logger.warning(
+                f"All mappings in set {set_idx} were rejected due to length constraint violations",
+                run_id=run_id,
+                question_id=question_id,
+                set_index=set_idx,
+                original_mappings_count=len(set_data.get("mappings", [])),
+            )
+
+        return {
+            "set_index": set_idx,
+            "mappings": mappings,
+            "target_config": target_config,
+        }
 
     def _build_generation_prompt_all_sets(
         self,
@@ -1405,6 +2160,41 @@ class StreamlinedMappingService:
         failure_rationales: Optional[List[str]] = None,
     ) -> str:
         """Build generation prompt to generate ALL sets in one call."""
+        # Retries of a question only change the failure rationales between the two fixed parts
+        head, tail = self._generation_prompt_parts(question_data, target_configs)
+        prompt = head
+
+        # Add failure rationales if retrying
+        if failure_rationales:
+            prompt += "\n\nPREVIOUS ATTEMPTS FAILED:\n"
+            for rationale in failure_rationales:
+                prompt += f"- {rationale}\n"
+            prompt += "\nPlease address these issues in your new mappings.\n"
+
+        return prompt + tail
+
+    def _generation_prompt_parts(
+        self,
+        question_data: Dict[str, Any],
+        target_configs: List[Dict[str, Any]],
+    ) -> Tuple[str, str]:
+        """Fixed text before and after the failure rationales, memoized per question and targets."""
+        parts_key = orjson.dumps(
+            [
+                question_data.get("question_type", "mcq_single"),
+                question_data.get("stem_text", ""),
+                question_data.get("gold_answer", ""),
+                question_data.get("options", {}),
+                target_configs,
+            ],
+            option=orjson.OPT_NON_STR_KEYS,
+            default=str,
+        )
+        parts = self._prompt_cache.get(parts_key)
+        if parts is not None:
+            self._prompt_cache.move_to_end(parts_key)
+            return parts
+
         question_type = question_data.get("question_type", "mcq_single")
         stem_text = question_data.get("stem_text", "")
         gold_answer = question_data.get("gold_answer", "")
@@ -1447,14 +2237,7 @@ GOLD ANSWER: {gold_answer}
         prompt += "- This length constraint is CRITICAL to maintain document layout and prevent text overflow\n"
         prompt += "- Choose shorter replacement words/phrases that still achieve the manipulation goal\n"
 
-        # Add failure rationales if retrying
-        if failure_rationales:
-            prompt += "\n\nPREVIOUS ATTEMPTS FAILED:\n"
-            for rationale in failure_rationales:
-                prompt += f"- {rationale}\n"
-            prompt += "\nPlease address these issues in your new mappings.\n"
-
-        prompt += f"""
+        tail = f"""
 
 OUTPUT FORMAT (JSON only - STRICT SCHEMA):
 You MUST return valid JSON matching this exact schema:
@@ -1488,7 +2271,7 @@ You MUST return valid JSON matching this exact schema:
 }}
 
 CRITICAL REQUIREMENTS:
-1. Generate EXACTLY {len(target_configs)} sets (set_index 1, 2, 3)
+1. Generate EXACTLY {len(target_configs)} sets (set_index {", ".join(str(i) for i in range(1, len(target_configs) + 1))})
 2. Each set must have EXACTLY ONE mapping targeting its specific configuration
 3. Each mapping can range from a single word (best case) to the entire question stem substring (worst case)
 4. Each set must have different mappings - do not repeat the same mapping across sets
@@ -1611,7 +2394,11 @@ IMPORTANT JSON FORMATTING RULES:
 Return your response now as pure JSON following the schema above:
 """
 
-        return prompt
+        parts = (prompt, tail)
+        self._prompt_cache[parts_key] = parts
+        if len(self._prompt_cache) > PROMPT_CACHE_SIZE:
+            self._prompt_cache.popitem(last=False)
+        return parts
 
     def _build_signal_metadata(
         self,
@@ -1648,8 +2435,23 @@ Return your response now as pure JSON following the schema above:
         mapping_index: int,
         attempt: int,
         target_config: Dict[str, Any],
+        prefetch: Optional[asyncio.Task] = None,
     ) -> ValidationResult:
-        """Validate mapping with semaphore for concurrency control and timeout."""
+        """Validate mapping with semaphore for concurrency control and timeout.
+
+        ``prefetch`` is the set's batch validation; its verdicts are awaited first and
+        read from the cache.
+        """
+        if prefetch is not None:
+            try:
+                await asyncio.shield(prefetch)
+            except Exception as e:
+                logger.warning(
+                    f"Batch validation failed, validating mappings individually: {e}",
+                    run_id=run_id,
+                    question_id=question_id,
+                    set_index=set_index,
+                )
         async with semaphore:
             try:
                 # Wrap validation call with timeout to prevent infinite hangs
@@ -1670,7 +2472,7 @@ Return your response now as pure JSON following the schema above:
                     timeout=validation_timeout,
                 )
             except asyncio.TimeoutError:
-                self.logger.error(
+                logger.error(
                     f"Validation timeout after {validation_timeout}s",
                     run_id=run_id,
                     question_id=question_id,
@@ -1706,19 +2508,19 @@ Return your response now as pure JSON following the schema above:
     ) -> ValidationResult:
         """Validate a single mapping by getting test answer and validating deviation."""
         # Log before validation
-        original_preview = mapping.get("original", "")[:50] + "..." if len(mapping.get("original", "")) > 50 else mapping.get("original", "")
-        replacement_preview = mapping.get("replacement", "")[:50] + "..." if len(mapping.get("replacement", "")) > 50 else mapping.get("replacement", "")
-        self.logger.debug(
-            f"Validating mapping (set {set_index}, mapping {mapping_index})",
-            run_id=run_id,
-            question_id=question_id,
-            attempt=attempt,
-            set_index=set_index,
-            mapping_index=mapping_index,
-            original_preview=original_preview,
-            replacement_preview=replacement_preview,
-            target_option=target_config.get("target_option"),
-        )
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            preview = _mapping_preview(mapping)
+            logger.debug(
+                f"Validating mapping (set {set_index}, mapping {mapping_index})",
+                run_id=run_id,
+                question_id=question_id,
+                attempt=attempt,
+                set_index=set_index,
+                mapping_index=mapping_index,
+                original_preview=preview["original"],
+                replacement_preview=preview["replacement"],
+                target_option=target_config.get("target_option"),
+            )
 
         # Apply mapping to question text
         question_text = question_data.get("stem_text", "")
@@ -1731,13 +2533,24 @@ Return your response now as pure JSON following the schema above:
         # Validate deviation - pass manipulated_question_text to let GPT-5.1 answer and validate in one call
         # This eliminates the need for the separate gpt-4o-mini call
         gold_answer = question_data.get("gold_answer", "")
-        self.logger.debug(
-            f"Validating with manipulated question: gold_answer={gold_answer}",
-            run_id=run_id,
-            question_id=question_id,
-            set_index=set_index,
-            mapping_index=mapping_index,
-        )
+        if _stdlib_logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Validating with manipulated question: gold_answer={gold_answer}",
+                run_id=run_id,
+                question_id=question_id,
+                set_index=set_index,
+                mapping_index=mapping_index,
+            )
+
+        # Identical substitutions (across sets, retries and reruns) share one verdict.
+        cache = LLMCache(run_id)
+        key = self._validation_cache_key(question_data, mapping, target_config)
+        stored = await asyncio.to_thread(cache.get, key)
+        if stored is not None:
+            try:
+                return ValidationResult(**stored)
+            except TypeError:
+                pass
 
         validation_result = await self.validator.validate_answer_deviation(
             question_text=question_text,
@@ -1753,7 +2566,7 @@ Return your response now as pure JSON following the schema above:
         )
 
         # Log validation result
-        self.logger.info(
+        logger.info(
             f"Validation result: is_valid={validation_result.is_valid}, confidence={validation_result.confidence:.3f}",
             run_id=run_id,
             question_id=question_id,
@@ -1766,120 +2579,357 @@ Return your response now as pure JSON following the schema above:
             target_matched=validation_result.target_matched,
         )
 
+        if validation_result.question_type_specific_notes not in VALIDATION_ERROR_NOTES:
+            await self._store_cached_response(cache, key, dataclasses.asdict(validation_result), run_id)
         return validation_result
 
+    def _validation_cache_key(
+        self,
+        question_data: Dict[str, Any],
+        mapping: Dict[str, Any],
+        target_config: Dict[str, Any],
+    ) -> str:
+        """LLM cache key of a mapping's validation verdict."""
+        return cache_key(
+            {
+                "task": "mapping_validation",
+                "model": self.validator.model,
+                "question_type": question_data.get("question_type", "mcq_single"),
+                "question_text": question_data.get("stem_text", ""),
+                "latex_stem_text": question_data.get("latex_stem_text", ""),
+                "original": mapping.get("original", ""),
+                "replacement": mapping.get("replacement", ""),
+                "gold_answer": question_data.get("gold_answer", ""),
+                "options": question_data.get("options", {}),
+                "target_option": target_config.get("target_option"),
+                "signal_strategy": target_config.get("signal_strategy"),
+            }
+        )
+
+    async def _prefetch_set_validations(
+        self,
+        semaphore: asyncio.Semaphore,
+        run_id: str,
+        question_id: int,
+        question_data: Dict[str, Any],
+        mappings: List[Dict[str, Any]],
+        target_config: Dict[str, Any],
+    ) -> None:
+        """Validate a set's uncached mappings in one multi-candidate request.
+
+        Verdicts land in the LLM cache, so the per-mapping validations pick them up and
+        only call the model for mappings the batch response did not cover.
+        """
+        cache = LLMCache(run_id)
+        question_text = question_data.get("stem_text", "")
+        signal_strategy = target_config.get("signal_strategy")
+        pending: Dict[str, Dict[str, Any]] = {}
+        for mapping in mappings:
+            key = self._validation_cache_key(question_data, mapping, target_config)
+            if key in pending or await asyncio.to_thread(cache.get, key) is not None:
+                continue
+            pending[key] = {
+                "manipulated_question_text": question_text.replace(
+                    mapping.get("original", ""), mapping.get("replacement", ""), 1
+                ),
+                "target_option": target_config.get("target_option"),
+                "target_option_text": target_config.get("target_option_text"),
+                "signal_metadata": {"signal_strategy": signal_strategy} if signal_strategy else None,
+            }
+        if len(pending) < 2:
+            return
+
+        async with semaphore:
+            try:
+                results = await self.validator.validate_answer_deviation_batch(
+                    question_text=question_text,
+                    question_type=question_data.get("question_type", "mcq_single"),
+                    gold_answer=question_data.get("gold_answer", ""),
+                    candidates=list(pending.values()),
+                    options_data=question_data.get("options", {}),
+                    run_id=run_id,
+                    timeout=API_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Batch validation timeout after {API_TIMEOUT}s",
+                    run_id=run_id,
+                    question_id=question_id,
+                )
+                return
+        if not results:
+            return
+        for key, result in zip(pending, results):
+            if result.question_type_specific_notes not in VALIDATION_ERROR_NOTES:
+                await self._store_cached_response(cache, key, dataclasses.asdict(result), run_id)
+
     # NOTE: _get_test_answer() method removed - we now use GPT-5.1 to answer and validate in one call
     # This eliminates the need for the separate gpt-4o-mini call, reducing latency and cost by ~50%
 
-    async def _save_valid_mapping(
+    def _queue_valid_mapping(
         self,
         run_id: str,
         question: QuestionManipulation,
         mapping: Dict[str, Any],
     ) -> None:
-        """Save valid mapping to DB and structured.json with retry logic for SQLite locks."""
-        mapping_preview = {
-            "original": mapping.get("original", "")[:50] + "..." if len(mapping.get("original", "")) > 50 else mapping.get("original", ""),
-            "replacement": mapping.get("replacement", "")[:50] + "..." if len(mapping.get("replacement", "")) > 50 else mapping.get("replacement", ""),
-        }
-        self.logger.info(
+        """Hand a valid mapping to the background DB writer and return immediately."""
+        logger.info(
             f"Saving valid mapping for question {question.question_number}",
             run_id=run_id,
             question_id=question.id,
-            mapping_preview=mapping_preview,
+            mapping_preview=_mapping_preview(mapping),
         )
+        if self._db_writer_task is None or self._db_writer_task.done():
+            self._db_queue = asyncio.Queue()
+            self._db_writer_task = asyncio.create_task(self._db_writer_loop(self._db_queue))
+        self._db_queue.put_nowait((run_id, question, mapping))
+
+    async def _close_db_writer(self) -> None:
+        """Wait for queued mapping writes to land, then stop the writer task."""
+        task, queue = self._db_writer_task, self._db_queue
+        if task is None:
+            return
+        if not task.done():
+            await queue.join()
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._db_writer_task = None
+        self._db_queue = None
 
-        # Use semaphore to serialize database writes and prevent SQLite locks
-        async with self._db_write_semaphore:
-            max_retries = 5
-            base_delay = 0.1  # Start with 100ms
-            
-            for attempt in range(max_retries):
-                try:
-                    # Convert single mapping to list format expected by DB
-                    mappings_list = [mapping]
+    def _settle_saved_result(self, run_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Report a queued success as failed when the DB writer could not save its mapping.
+
+        Call after ``_close_db_writer`` so every queued save has landed or failed.
+        """
+        if not isinstance(result, dict) or result.get("status") != "success":
+            return result
+        status = self._status_store.get(run_id, {}).get(result.get("question_id"))
+        if status is None or status.status != "failed":
+            return result
+        return {**result, "status": "failed", "error": status.error}
+
+    def _emit_live_log(
+        self,
+        run_id: str,
+        stage: str,
+        level: str,
+        message: str,
+        component: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Queue a live log event for the background emitter; emits inline outside a running loop."""
+        event = {
+            "run_id": run_id,
+            "stage": stage,
+            "level": level,
+            "message": message,
+            "component": component,
+            "context": context,
+        }
+        queue = self._log_queue_for_loop()
+        if queue is None:
+            live_logging_service.emit(**event)
+            return
+        try:
+            queue.put_nowait(("live", event))
+        except asyncio.QueueFull:
+            # Under back-pressure verbose events are dropped; anything else is emitted inline
+            if level.upper() == "DEBUG":
+                self._live_log_dropped += 1
+            else:
+                live_logging_service.emit(**event)
+
+    def _log_mapping_event(self, write: Callable[..., None], **kwargs: Any) -> None:
+        """Queue a ``mapping_logger`` write (e.g. ``log_generation``) for the background emitter."""
+        queue = self._log_queue_for_loop()
+        if queue is None:
+            write(**kwargs)
+            return
+        try:
+            queue.put_nowait(("mapping", (write, kwargs)))
+        except asyncio.QueueFull:
+            # Mapping logs back the generation report, so they are written inline rather than dropped
+            write(**kwargs)
+
+    def _log_queue_for_loop(self) -> Optional[asyncio.Queue]:
+        """Queue of the background emitter on the running loop, started on first use."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if self._log_task is None or self._log_task.done():
+            self._log_queue = asyncio.Queue(maxsize=LIVE_LOG_QUEUE_SIZE)
+            self._log_task = asyncio.create_task(self._live_log_loop(self._log_queue))
+        return self._log_queue
+
+    async def _live_log_loop(self, queue: asyncio.Queue) -> None:
+        """Single consumer of queued log events, handling up to 64 per flush.
+
+        Live events share one commit; mapping log writes (file appends) run together in
+        a worker thread.
+        """
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < 64 and not queue.empty():
+                batch.append(queue.get_nowait())
+            live_events = [payload for kind, payload in batch if kind == "live"]
+            mapping_writes = [payload for kind, payload in batch if kind == "mapping"]
+            try:
+                if live_events:
+                    live_logging_service.emit_many(live_events)
+                if mapping_writes:
+                    await asyncio.to_thread(self._write_mapping_events, mapping_writes)
+            except Exception as e:
+                logger.warning(f"Failed to write {len(batch)} log event(s): {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            # Let events accumulate so the next flush shares a commit
+            await asyncio.sleep(0.01)
+
+    @staticmethod
+    def _write_mapping_events(writes: List[Tuple[Callable[..., None], Dict[str, Any]]]) -> None:
+        for write, kwargs in writes:
+            try:
+                write(**kwargs)
+            except Exception as e:
+                logger.warning(f"Failed to write mapping generation log: {e}")
+
+    async def _close_live_log(self) -> None:
+        """Wait for queued log events to be written, then stop the emitter task."""
+        task, queue = self._log_task, self._log_queue
+        if task is None:
+            return
+        if not task.done():
+            await queue.join()
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._log_task = None
+
+    async def _db_writer_loop(self, queue: asyncio.Queue) -> None:
+        """Single consumer of queued mapping writes; everything queued meanwhile is flushed together."""
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            # Only the latest mapping per question matters
+            latest: Dict[Tuple[str, int], Tuple[str, QuestionManipulation, Dict[str, Any]]] = {}
+            for run_id, question, mapping in batch:
+                latest[(run_id, question.id)] = (run_id, question, mapping)
+            try:
+                await self._save_valid_mappings(list(latest.values()))
+            except Exception as e:
+                for run_id, question, _ in latest.values():
+                    status = self._status_store.get(run_id, {}).get(question.id)
+                    if status:
+                        status.status = "failed"
+                        status.error = f"Failed to save valid mapping: {e}"
+                        await self._persist_status_async(run_id, question.id, status)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _save_valid_mappings(
+        self,
+        writes: List[Tuple[str, QuestionManipulation, Dict[str, Any]]],
+    ) -> None:
+        """Save valid mappings to DB in one commit and sync structured.json with retry logic for SQLite locks."""
+        max_retries = 5
+        base_delay = 0.1  # Start with 100ms
+        run_ids = list(dict.fromkeys(run_id for run_id, _, _ in writes))
+        question_ids = [question.id for _, question, _ in writes]
 
-                    # Update question model
-                    question.substring_mappings = mappings_list
+        for attempt in range(max_retries):
+            try:
+                for _, question, mapping in writes:
+                    # Convert single mapping to list format expected by DB
+                    question.substring_mappings = [mapping]
                     db.session.add(question)
-                    db.session.commit()
+                db.session.commit()
 
-                    self.logger.debug(
-                        f"Saved mapping to database",
-                        run_id=run_id,
-                        question_id=question.id,
+                if _stdlib_logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"Saved {len(writes)} mapping(s) to database",
+                        run_id=run_ids[0],
+                        question_ids=question_ids,
                     )
 
-                    # Sync to structured.json using SmartSubstitutionService
-                    # This also needs to be protected by the semaphore
-                    try:
-                        from ...services.pipeline.smart_substitution_service import SmartSubstitutionService
-                        service = SmartSubstitutionService()
+                # Sync to structured.json using SmartSubstitutionService, once per run
+                try:
+                    from ...services.pipeline.smart_substitution_service import SmartSubstitutionService
+                    service = SmartSubstitutionService()
+                    for run_id in run_ids:
                         service.sync_structured_mappings(run_id)
-                    except Exception as sync_error:
-                        # If sync fails, log but don't fail the whole operation
-                        # The mapping is already saved to DB
-                        error_type = type(sync_error).__name__
-                        if "database is locked" in str(sync_error).lower():
-                            # Retry the whole operation if sync fails due to lock
-                            if attempt < max_retries - 1:
-                                delay = base_delay * (2 ** attempt)
-                                self.logger.warning(
-                                    f"Database locked during sync, retrying in {delay}s (attempt {attempt + 1}/{max_retries})",
-                                    run_id=run_id,
-                                    question_id=question.id,
-                                )
-                                await asyncio.sleep(delay)
-                                continue
-                        self.logger.warning(
-                            f"Failed to sync structured mappings (non-critical): {error_type}: {sync_error}",
-                            run_id=run_id,
-                            question_id=question.id,
-                            error_type=error_type,
-                        )
-
-                    self.logger.info(
-                        f"Successfully saved and synced valid mapping for question {question.question_number}",
-                        run_id=run_id,
-                        question_id=question.id,
+                except Exception as sync_error:
+                    # If sync fails, log but don't fail the whole operation
+                    # The mappings are already saved to DB
+                    error_type = type(sync_error).__name__
+                    if "database is locked" in str(sync_error).lower():
+                        # Retry the whole operation if sync fails due to lock
+                        if attempt < max_retries - 1:
+                            delay = base_delay * (2 ** attempt)
+                            logger.warning(
+                                f"Database locked during sync, retrying in {delay}s (attempt {attempt + 1}/{max_retries})",
+                                run_id=run_ids[0],
+                                question_ids=question_ids,
+                            )
+                            await asyncio.sleep(delay)
+                            continue
+                    logger.warning(
+                        f"Failed to sync structured mappings (non-critical): {error_type}: {sync_error}",
+                        run_id=run_ids[0],
+                        question_ids=question_ids,
+                        error_type=error_type,
                     )
-                    return  # Success, exit retry loop
 
-                except Exception as e:
-                    error_type = type(e).__name__
-                    error_msg = str(e)
-                    
-                    # Check if it's a database lock error
-                    is_lock_error = (
-                        "database is locked" in error_msg.lower() or
-                        "OperationalError" in error_type
+                logger.info(
+                    f"Successfully saved and synced {len(writes)} valid mapping(s)",
+                    run_id=run_ids[0],
+                    question_ids=question_ids,
+                )
+                return  # Success, exit retry loop
+
+            except Exception as e:
+                error_type = type(e).__name__
+                error_msg = str(e)
+
+                # Check if it's a database lock error
+                is_lock_error = (
+                    "database is locked" in error_msg.lower() or
+                    "OperationalError" in error_type
+                )
+
+                if is_lock_error and attempt < max_retries - 1:
+                    # Exponential backoff for lock errors
+                    delay = base_delay * (2 ** attempt)
+                    logger.warning(
+                        f"Database locked, retrying in {delay}s (attempt {attempt + 1}/{max_retries})",
+                        run_id=run_ids[0],
+                        question_ids=question_ids,
+                        error_type=error_type,
                     )
-                    
-                    if is_lock_error and attempt < max_retries - 1:
-                        # Exponential backoff for lock errors
-                        delay = base_delay * (2 ** attempt)
-                        self.logger.warning(
-                            f"Database locked, retrying in {delay}s (attempt {attempt + 1}/{max_retries})",
-                            run_id=run_id,
-                            question_id=question.id,
-                            error_type=error_type,
-                        )
-                        await asyncio.sleep(delay)
-                        db.session.rollback()
-                        continue
-                    else:
-                        # Not a lock error or max retries reached
-                        self.logger.error(
-                            f"Failed to save valid mapping: {error_type}: {error_msg}",
-                            run_id=run_id,
-                            question_id=question.id,
-                            error_type=error_type,
-                            error=error_msg,
-                            attempt=attempt + 1,
-                            exc_info=True,
-                        )
-                        db.session.rollback()
-                        raise
+                    await asyncio.sleep(delay)
+                    db.session.rollback()
+                    continue
+                else:
+                    # Not a lock error or max retries reached
+                    logger.error(
+                        f"Failed to save valid mappings: {error_type}: {error_msg}",
+                        run_id=run_ids[0],
+                        question_ids=question_ids,
+                        error_type=error_type,
+                        error=error_msg,
+                        attempt=attempt + 1,
+                        exc_info=True,
+                    )
+                    db.session.rollback()
+                    raise
 
     def get_question_status(
         self,
@@ -1908,93 +2958,129 @@ Return your response now as pure JSON following the schema above:
         """Get logs for a run."""
         return self.mapping_logger.get_logs(run_id)
 
-    def _persist_status(
+    def _mark_status_dirty(self, run_id: str, question_id: int) -> None:
+        """Note an in-memory status change that does not need its own write."""
+        self._dirty_statuses.add((run_id, question_id))
+
+    async def _persist_status_if_dirty(
         self,
         run_id: str,
         question_id: int,
         status: QuestionGenerationStatus,
     ) -> None:
-        """Persist status to file (thread-safe)."""
-        # Use lock to prevent concurrent file writes
-        with self._status_file_lock:
-            try:
-                run_dir = run_directory(run_id)
-                status_file = run_dir / "mapping_generation_status.json"
-                
-                # Load existing statuses
-                if status_file.exists():
-                    try:
-                        with open(status_file, 'r') as f:
-                            data = json.load(f)
-                    except (json.JSONDecodeError, IOError) as e:
-                        self.logger.warning(
-                            f"Failed to load existing status file, creating new one: {e}",
-                            run_id=run_id,
-                            question_id=question_id,
-                        )
-                        data = {}
-                else:
-                    data = {}
-                
-                # Update status for this question
-                if run_id not in data:
-                    data[run_id] = {}
-                
-                # Convert dataclass to dict
-                status_dict = {
-                    "question_id": status.question_id,
-                    "question_number": status.question_number,
-                    "status": status.status,
-                    "retry_count": status.retry_count,
-                    "current_attempt": status.current_attempt,
-                    "mapping_sets_generated": [
-                        {
-                            "attempt": ms.attempt,
-                            "set_index": ms.set_index,
-                            "target_option": ms.target_option,
-                            "signal_strategy": ms.signal_strategy,
-                            "mappings_count": ms.mappings_count,
-                            "generated_at": ms.generated_at,
-                        }
-                        for ms in status.mapping_sets_generated
-                    ],
-                    "validation_outcomes": [
-                        {
-                            "attempt": vo.attempt,
-                            "set_index": vo.set_index,
-                            "mapping_index": vo.mapping_index,
-                            "is_valid": vo.is_valid,
-                            "confidence": vo.confidence,
-                            "deviation_score": vo.deviation_score,
-                            "reasoning": vo.reasoning,
-                            "test_answer": vo.test_answer,
-                            "target_matched": vo.target_matched,
-                            "validated_at": vo.validated_at,
-                        }
-                        for vo in status.validation_outcomes
-                    ],
-                    "failure_rationales": status.failure_rationales,
-                    "generation_exceptions": status.generation_exceptions,
-                    "valid_mapping": status.valid_mapping,
-                    "error": status.error,
-                    "started_at": status.started_at,
-                    "completed_at": status.completed_at,
+        """Checkpoint: persist the status only if it changed since the last write."""
+        if (run_id, question_id) in self._dirty_statuses:
+            await self._persist_status_async(run_id, question_id, status)
+
+    async def _persist_status_async(
+        self,
+        run_id: str,
+        question_id: int,
+        status: QuestionGenerationStatus,
+    ) -> None:
+        """Persist status to file from a worker thread, skipping unchanged snapshots."""
+        self._dirty_statuses.discard((run_id, question_id))
+        # Snapshot on the loop thread; the status keeps mutating while the write is in flight
+        status_dict = self._status_snapshot(status)
+        if self._last_persisted.get((run_id, question_id)) == status_dict:
+            return
+        self._last_persisted[(run_id, question_id)] = status_dict
+        await asyncio.to_thread(self._persist_status_sync, run_id, question_id, status_dict)
+
+    @staticmethod
+    def _status_snapshot(status: QuestionGenerationStatus) -> Dict[str, Any]:
+        """Convert a status dataclass to its persisted dict form."""
+        return {
+            "question_id": status.question_id,
+            "question_number": status.question_number,
+            "status": status.status,
+            "retry_count": status.retry_count,
+            "current_attempt": status.current_attempt,
+            "mapping_sets_generated": [
+                {
+                    "attempt": ms.attempt,
+                    "set_index": ms.set_index,
+                    "target_option": ms.target_option,
+                    "signal_strategy": ms.signal_strategy,
+                    "mappings_count": ms.mappings_count,
+                    "generated_at": ms.generated_at,
                 }
-                
-                data[run_id][str(question_id)] = status_dict
-                
-                # Save to file
-                status_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(status_file, 'w') as f:
-                    json.dump(data, f, indent=2)
+                for ms in status.mapping_sets_generated
+            ],
+            "validation_outcomes": [
+                {
+                    "attempt": vo.attempt,
+                    "set_index": vo.set_index,
+                    "mapping_index": vo.mapping_index,
+                    "is_valid": vo.is_valid,
+                    "confidence": vo.confidence,
+                    "deviation_score": vo.deviation_score,
+                    "reasoning": vo.reasoning,
+                    "test_answer": vo.test_answer,
+                    "target_matched": vo.target_matched,
+                    "validated_at": vo.validated_at,
+                    "skipped": vo.skipped,
+                }
+                for vo in status.validation_outcomes
+            ],
+            "failure_rationales": list(status.failure_rationales),
+            "generation_exceptions": list(status.generation_exceptions),
+            "valid_mapping": dict(status.valid_mapping) if status.valid_mapping is not None else None,
+            "error": status.error,
+            "started_at": status.started_at,
+            "completed_at": status.completed_at,
+        }
+
+    def _persist_status_sync(
+        self,
+        run_id: str,
+        question_id: int,
+        status_dict: Dict[str, Any],
+    ) -> None:
+        """Upsert a status snapshot into the run's status database (thread-safe)."""
+        with self._status_db_lock:
+            try:
+                self._status_db(run_id).execute(
+                    "INSERT INTO status (run_id, question_id, json) VALUES (?, ?, ?) "
+                    "ON CONFLICT (run_id, question_id) DO UPDATE SET json = excluded.json",
+                    (run_id, question_id, orjson.dumps(status_dict, option=orjson.OPT_NON_STR_KEYS)),
+                )
             except Exception as e:
-                self.logger.warning(
+                logger.warning(
                     f"Failed to persist status for question {question_id}: {e}",
                     run_id=run_id,
                     question_id=question_id,
                     exc_info=True,
                 )
 
+    def _status_db(self, run_id: str) -> sqlite3.Connection:
+        """Open (once) the run's WAL-mode status database; callers hold ``_status_db_lock``.
+
+        Only the ``STATUS_DB_CACHE_SIZE`` most recently used runs keep a connection, so a
+        long-lived process does not hold one (plus its -wal/-shm files) per run ever queried.
+        """
+        conn = self._status_dbs.get(run_id)
+        if conn is not None:
+            self._status_dbs.move_to_end(run_id)
+        else:
+            db_path = run_directory(run_id) / STATUS_DB_NAME
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit: each upsert is its own transaction
+            conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS status ("
+                "run_id TEXT NOT NULL, question_id INTEGER NOT NULL, json BLOB NOT NULL, "
+                "PRIMARY KEY (run_id, question_id))"
+            )
+            self._status_dbs[run_id] = conn
+            while len(self._status_dbs) > STATUS_DB_CACHE_SIZE:
+                _, evicted = self._status_dbs.popitem(last=False)
+                evicted.close()
+        return conn
+
     def _load_persisted_statuses(self) -> None:
         """Load all persisted statuses on init (for all runs)."""
         # This is called on init, but we'll load on-demand per run
@@ -2007,15 +3093,20 @@ Return your response now as pure JSON following the schema above:
         """Load persisted statuses for a specific run."""
         try:
             run_dir = run_directory(run_id)
-            status_file = run_dir / "mapping_generation_status.json"
-            
-            if not status_file.exists():
+            legacy_file = run_dir / "mapping_generation_status.json"
+
+            if (run_dir / STATUS_DB_NAME).exists():
+                with self._status_db_lock:
+                    rows = self._status_db(run_id).execute(
+                        "SELECT question_id, json FROM status WHERE run_id = ?", (run_id,)
+                    ).fetchall()
+                run_data = {str(question_id): orjson.loads(payload) for question_id, payload in rows}
+            elif legacy_file.exists():
+                # Runs recorded before the status database existed
+                run_data = orjson.loads(legacy_file.read_bytes()).get(run_id, {})
+            else:
                 return {}
-            
-            with open(status_file, 'r') as f:
-                data = json.load(f)
-            
-            run_data = data.get(run_id, {})
+
             statuses = {}
             
             for qid_str, status_dict in run_data.items():
@@ -2050,6 +3141,7 @@ Return your response now as pure JSON following the schema above:
                                 test_answer=vo["test_answer"],
                                 target_matched=vo.get("target_matched"),
                                 validated_at=vo.get("validated_at", isoformat(utc_now())),
+                                skipped=vo.get("skipped", False),
                             )
                             for vo in status_dict.get("validation_outcomes", [])
                         ],
@@ -2061,7 +3153,7 @@ Return your response now as pure JSON following the schema above:
                         completed_at=status_dict.get("completed_at"),
                     )
                 except (KeyError, ValueError, TypeError) as e:
-                    self.logger.warning(
+                    logger.warning(
                         f"Failed to load status for question {qid_str}: {e}",
                         run_id=run_id,
                         exc_info=True,
@@ -2070,7 +3162,7 @@ Return your response now as pure JSON following the schema above:
             
             return statuses
         except Exception as e:
-            self.logger.warning(
+            logger.warning(
                 f"Failed to load persisted statuses for run {run_id}: {e}",
                 run_id=run_id,
                 exc_info=True,
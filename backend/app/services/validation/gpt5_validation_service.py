@@ -7,16 +7,25 @@ import time
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 
+import orjson
+
 from ..ai_clients.base_ai_client import BaseAIClient
 from ...utils.logging import get_logger
 from ...utils.openai_responses import coerce_response_text
 from ..mapping.gpt5_config import VALIDATION_MODEL, VALIDATION_REASONING_EFFORT, API_TIMEOUT
+from ..mapping.openai_rate_limits import acquire_openai_slot, record_openai_usage
 
 try:
-    from openai import OpenAI, AsyncOpenAI
+    from openai import OpenAI, AsyncOpenAI, APITimeoutError
 except ImportError:
     OpenAI = None  # type: ignore
     AsyncOpenAI = None  # type: ignore
+    APITimeoutError = asyncio.TimeoutError  # type: ignore
+
+
+# ``question_type_specific_notes`` of results that describe a failed call rather than
+# a model verdict; such results must not be cached or reused.
+VALIDATION_ERROR_NOTES = frozenset({"Configuration error", "Processing error", "Timeout error"})
 
 
 @dataclass
@@ -64,6 +73,8 @@ class GPT5ValidationService:
         self.model = VALIDATION_MODEL
         self.reasoning_effort = VALIDATION_REASONING_EFFORT or "high"
         self.logger = get_logger(__name__)
+        self._client = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
 
         # Confidence thresholds for validation
         self.validation_thresholds = {
@@ -94,6 +105,7 @@ class GPT5ValidationService:
         target_option_text: Optional[str] = None,
         signal_metadata: Optional[Dict[str, str]] = None,
         run_id: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> ValidationResult:
         """
         Use GPT-5 to intelligently validate if test answer deviates enough from gold answer
@@ -102,6 +114,11 @@ class GPT5ValidationService:
         If manipulated_question_text is provided and test_answer is None, GPT-5 will first
         answer the manipulated question, then validate the deviation in a single call.
         This is more efficient than requiring a separate test_answer call.
+
+        When ``timeout`` is given it bounds the rate-limit slot wait plus the request,
+        which is sent without SDK retries so the deadline is not multiplied, and a
+        timed-out validation raises ``asyncio.TimeoutError`` instead of returning an
+        error result.
         """
         start_time = time.perf_counter()
 
@@ -147,34 +164,42 @@ class GPT5ValidationService:
                 )
 
             client = self._get_openai_client()
-
-            # Use AsyncOpenAI directly for native async performance
-            response = await client.responses.create(
-                model=self.model,
-                input=[
-                    {
-                        "role": "system",
-                        "content": [
-                            {
-                                "type": "input_text",
-                                "text": (
-                                    "You are an expert educational assessment validator. "
-                                    "Determine if student answers indicate successful question manipulation by "
-                                    "comparing gold standard answers with test responses using sophisticated analysis. "
-                                    "Return strict JSON following the required schema."
-                                ),
-                            }
-                        ],
-                    },
-                    {
-                        "role": "user",
-                        "content": [{"type": "input_text", "text": prompt}],
-                    },
-                ],
-                reasoning={"effort": self.reasoning_effort},
-                max_output_tokens=1500,
-                metadata={"task": "mapping_validation", "run_id": str(run_id) if run_id else None},
-            )
+            if timeout is not None:
+                # SDK retries would stretch a timed-out request to several times the caller's deadline.
+                client = client.with_options(max_retries=0)
+
+            # Use AsyncOpenAI directly for native async performance; the rate-limit
+            # slot wait counts against the caller's deadline too.
+            async with asyncio.timeout(timeout):
+                await acquire_openai_slot()
+                response = await client.responses.create(
+                    model=self.model,
+                    input=[
+                        {
+                            "role": "system",
+                            "content": [
+                                {
+                                    "type": "input_text",
+                                    "text": (
+                                        "You are an expert educational assessment validator. "
+                                        "Determine if student answers indicate successful question manipulation by "
+                                        "comparing gold standard answers with test responses using sophisticated analysis. "
+                                        "Return strict JSON following the required schema."
+                                    ),
+                                }
+                            ],
+                        },
+                        {
+                            "role": "user",
+                            "content": [{"type": "input_text", "text": prompt}],
+                        },
+                    ],
+                    reasoning={"effort": self.reasoning_effort},
+                    max_output_tokens=1500,
+                    metadata={"task": "mapping_validation", "run_id": str(run_id) if run_id else None},
+                    **({"timeout": timeout} if timeout is not None else {}),
+                )
+            record_openai_usage(response)
 
             content = coerce_response_text(response)
             if not content:
@@ -191,7 +216,7 @@ class GPT5ValidationService:
                     json_start = content.find('{')
                     json_end = content.rfind('}') + 1
                     if json_start >= 0 and json_end > json_start:
-                        parsed_temp = json.loads(content[json_start:json_end])
+                        parsed_temp = orjson.loads(content[json_start:json_end])
                         if 'test_answer' in parsed_temp:
                             actual_test_answer = str(parsed_temp['test_answer'])
                             self.logger.debug(
@@ -225,6 +250,8 @@ class GPT5ValidationService:
             return validation_result
 
         except Exception as e:
+            if timeout is not None and isinstance(e, (asyncio.TimeoutError, APITimeoutError)):
+                raise asyncio.TimeoutError(f"Validation request exceeded {timeout}s") from e
             self.logger.error(f"GPT-5 validation failed: {e}", run_id=run_id, error=str(e))
             return ValidationResult(
                 is_valid=False,
@@ -239,6 +266,106 @@ class GPT5ValidationService:
                 model_used=self.model
             )
 
+    async def validate_answer_deviation_batch(
+        self,
+        question_text: str,
+        question_type: str,
+        gold_answer: str,
+        candidates: List[Dict[str, Any]],
+        options_data: Optional[Dict[str, str]] = None,
+        run_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[List[ValidationResult]]:
+        """
+        Answer and validate several manipulated versions of one question in one call.
+
+        Each candidate carries ``manipulated_question_text`` and optionally
+        ``target_option``/``target_option_text`` and ``signal_metadata``. Results come back in candidate order;
+        ``None`` means the service is not configured or the response did not cover every
+        candidate, and callers should fall back to ``validate_answer_deviation``.
+        A timed-out request raises ``asyncio.TimeoutError`` like the single-call path.
+        """
+        if not candidates or not self.is_configured():
+            return None
+
+        start_time = time.perf_counter()
+        prompt = self._create_batch_validation_prompt(
+            original_question_text=question_text,
+            question_type=question_type,
+            gold_answer=gold_answer,
+            candidates=candidates,
+            options_data=options_data,
+        )
+
+        try:
+            client = self._get_openai_client()
+            if timeout is not None:
+                # SDK retries would stretch a timed-out request to several times the caller's deadline.
+                client = client.with_options(max_retries=0)
+            # The slot wait counts against the caller's deadline too.
+            async with asyncio.timeout(timeout):
+                await acquire_openai_slot()
+                response = await client.responses.create(
+                    model=self.model,
+                    input=[
+                        {
+                            "role": "system",
+                            "content": [
+                                {
+                                    "type": "input_text",
+                                    "text": (
+                                        "You are an expert educational assessment validator. "
+                                        "Judge each manipulated version of a question independently, as if it were "
+                                        "the only one you had seen. "
+                                        "Return strict JSON following the required schema."
+                                    ),
+                                }
+                            ],
+                        },
+                        {
+                            "role": "user",
+                            "content": [{"type": "input_text", "text": prompt}],
+                        },
+                    ],
+                    reasoning={"effort": self.reasoning_effort},
+                    max_output_tokens=1500 * len(candidates),
+                    metadata={"task": "mapping_validation_batch", "run_id": str(run_id) if run_id else None},
+                    **({"timeout": timeout} if timeout is not None else {}),
+                )
+            record_openai_usage(response)
+
+            content = coerce_response_text(response)
+            if not content:
+                raise ValueError("Validation model returned empty content.")
+            verdicts = self._extract_json_object(content).get("candidates")
+            if not isinstance(verdicts, list):
+                raise ValueError("Batch validation response has no candidates list")
+            by_index = {
+                verdict.get("candidate_index"): verdict for verdict in verdicts if isinstance(verdict, dict)
+            }
+            missing = [index for index in range(len(candidates)) if not isinstance(by_index.get(index), dict)]
+            if missing:
+                raise ValueError(f"Batch validation response is missing candidates {missing}")
+            results = [
+                self._result_from_parsed(by_index[index], question_type, gold_answer, "")
+                for index in range(len(candidates))
+            ]
+        except Exception as e:
+            if timeout is not None and isinstance(e, (asyncio.TimeoutError, APITimeoutError)):
+                raise asyncio.TimeoutError(f"Batch validation request exceeded {timeout}s") from e
+            self.logger.warning(f"GPT-5 batch validation failed: {e}", run_id=run_id, error=str(e))
+            return None
+
+        self.logger.info(
+            "GPT-5 batch validation completed",
+            run_id=run_id,
+            question_type=question_type,
+            candidates=len(candidates),
+            valid=sum(1 for result in results if result.is_valid),
+            processing_time_ms=int((time.perf_counter() - start_time) * 1000),
+        )
+        return results
+
     def _create_validation_prompt(
         self,
         question_text: str,
@@ -476,6 +603,85 @@ EXAMPLE OUTPUT:
   }
 }
 
+CRITICAL: Return ONLY valid JSON. No markdown, no code blocks, no additional text. Start with { and end with }.
+"""
+
+        return prompt
+
+    def _create_batch_validation_prompt(
+        self,
+        original_question_text: str,
+        question_type: str,
+        gold_answer: str,
+        candidates: List[Dict[str, Any]],
+        options_data: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Create one prompt that asks GPT-5 to answer and validate every candidate."""
+
+        prompt = f"""
+BATCH VALIDATION TASK: Several manipulated versions of the same question follow. For EACH one,
+answer the manipulated question, then analyze if your answer indicates successful question manipulation.
+
+QUESTION TYPE: {question_type}
+
+ORIGINAL QUESTION: {original_question_text}
+
+GOLD ANSWER (for original question): {gold_answer}
+"""
+
+        # Add options if available
+        if options_data:
+            prompt += "\nQUESTION OPTIONS:\n"
+            for key, value in options_data.items():
+                prompt += f"{key}. {value}\n"
+
+        for index, candidate in enumerate(candidates):
+            prompt += f"\nCANDIDATE {index}:\nMANIPULATED QUESTION: {candidate['manipulated_question_text']}\n"
+            target_option = candidate.get("target_option")
+            if target_option:
+                target_summary = candidate.get("target_option_text") or "unknown target text"
+                prompt += f"EXPECTED TARGET OUTCOME: option {target_option} ({target_summary})\n"
+            signal_metadata = candidate.get("signal_metadata")
+            if signal_metadata:
+                prompt += f"SIGNAL METADATA (for diagnostic analysis): {json.dumps(signal_metadata)}\n"
+
+        # Add question-type specific analysis instructions
+        type_instructions = self._get_type_specific_instructions(question_type)
+        prompt += f"\n{type_instructions}\n"
+
+        prompt += """
+TASK INSTRUCTIONS (apply to every candidate independently):
+1. **Answer the candidate's MANIPULATED QUESTION** as you would normally answer it.
+2. **Compare your answer** to the GOLD ANSWER and analyze the deviation.
+3. **Determine if the manipulation was successful** - did the text change cause a different answer,
+   ideally the expected target outcome? Use any signal metadata alongside the gold answer when scoring.
+4. Rate semantic_similarity, deviation_score and confidence from 0.0 to 1.0.
+
+OUTPUT FORMAT (JSON only - STRICT SCHEMA):
+You MUST return valid JSON with exactly one entry per candidate:
+{
+  "candidates": [
+    {
+      "candidate_index": <int>,
+      "test_answer": "<your answer to this manipulated question>",
+      "analysis": {
+        "semantic_similarity": <float 0.0-1.0>,
+        "factual_accuracy": <boolean>,
+        "deviation_score": <float 0.0-1.0>,
+        "manipulation_detected": <boolean>,
+        "confidence": <float 0.0-1.0>
+      },
+      "reasoning": "<string>",
+      "question_type_notes": "<string>",
+      "validation_decision": {
+        "is_valid": <boolean>,
+        "threshold_met": <boolean>,
+        "recommended_action": "<string>"
+      }
+    }
+  ]
+}
+
 CRITICAL: Return ONLY valid JSON. No markdown, no code blocks, no additional text. Start with { and end with }.
 """
 
@@ -564,60 +770,8 @@ READING COMPREHENSION ANALYSIS:
         """Parse GPT-5 validation response into structured result."""
 
         try:
-            # Clean response
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            # Extract JSON
-            start = content.find('{')
-            end = content.rfind('}')
-
-            if start == -1 or end == -1:
-                raise ValueError("No JSON found in response")
-
-            json_str = content[start:end + 1]
-            parsed = json.loads(json_str)
-
-            # Extract analysis data
-            analysis = parsed.get('analysis', {})
-            validation_decision = parsed.get('validation_decision', {})
-            
-            # Extract test_answer from response if provided (when GPT-5 answered the manipulated question)
-            actual_test_answer = test_answer
-            if 'test_answer' in parsed:
-                actual_test_answer = str(parsed['test_answer'])
-
-            # Calculate validation based on confidence and threshold
-            confidence = float(analysis.get('confidence', 0.5))
-            deviation_score = float(analysis.get('deviation_score', 0.0))
-            threshold = self.validation_thresholds.get(question_type, self.validation_thresholds['default'])
-
-            # A mapping is considered valid (successfully manipulated) if:
-            # 1. High confidence in analysis
-            # 2. Significant deviation detected
-            # 3. Meets question-type specific threshold
-            is_valid = (
-                confidence >= threshold and
-                deviation_score >= 0.3 and  # Minimum deviation required
-                validation_decision.get('is_valid', False)
-            )
-
-            return ValidationResult(
-                is_valid=is_valid,
-                confidence=confidence,
-                deviation_score=deviation_score,
-                reasoning=parsed.get('reasoning', 'No reasoning provided'),
-                semantic_similarity=float(analysis.get('semantic_similarity', 0.0)),
-                factual_accuracy=analysis.get('factual_accuracy', False),
-                question_type_specific_notes=parsed.get('question_type_notes', ''),
-                gold_answer=gold_answer,
-                test_answer=actual_test_answer,
-                model_used=self.model
-            )
+            parsed = self._extract_json_object(content)
+            return self._result_from_parsed(parsed, question_type, gold_answer, test_answer)
 
         except (json.JSONDecodeError, ValueError, KeyError) as e:
             self.logger.warning(f"Failed to parse GPT-5 validation response: {e}", content=content[:200])
@@ -639,6 +793,70 @@ READING COMPREHENSION ANALYSIS:
                 model_used="fallback"
             )
 
+    def _extract_json_object(self, content: str) -> Dict[str, Any]:
+        """Strip code fences and parse the outermost JSON object in ``content``."""
+        # Clean response
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+
+        # Extract JSON
+        start = content.find('{')
+        end = content.rfind('}')
+
+        if start == -1 or end == -1:
+            raise ValueError("No JSON found in response")
+
+        return orjson.loads(content[start:end + 1])
+
+    def _result_from_parsed(
+        self,
+        parsed: Dict[str, Any],
+        question_type: str,
+        gold_answer: str,
+        test_answer: str,
+    ) -> ValidationResult:
+        """Apply the question-type threshold to one parsed validation verdict."""
+        # Extract analysis data
+        analysis = parsed.get('analysis', {})
+        validation_decision = parsed.get('validation_decision', {})
+
+        # Extract test_answer from response if provided (when GPT-5 answered the manipulated question)
+        actual_test_answer = test_answer
+        if 'test_answer' in parsed:
+            actual_test_answer = str(parsed['test_answer'])
+
+        # Calculate validation based on confidence and threshold
+        confidence = float(analysis.get('confidence', 0.5))
+        deviation_score = float(analysis.get('deviation_score', 0.0))
+        threshold = self.validation_thresholds.get(question_type, self.validation_thresholds['default'])
+
+        # A mapping is considered valid (successfully manipulated) if:
+        # 1. High confidence in analysis
+        # 2. Significant deviation detected
+        # 3. Meets question-type specific threshold
+        is_valid = (
+            confidence >= threshold and
+            deviation_score >= 0.3 and  # Minimum deviation required
+            validation_decision.get('is_valid', False)
+        )
+
+        return ValidationResult(
+            is_valid=is_valid,
+            confidence=confidence,
+            deviation_score=deviation_score,
+            reasoning=parsed.get('reasoning', 'No reasoning provided'),
+            semantic_similarity=float(analysis.get('semantic_similarity', 0.0)),
+            factual_accuracy=analysis.get('factual_accuracy', False),
+            question_type_specific_notes=parsed.get('question_type_notes', ''),
+            gold_answer=gold_answer,
+            test_answer=actual_test_answer,
+            model_used=self.model
+        )
+
     def _calculate_fallback_deviation(self, gold_answer: str, test_answer: str, question_type: str) -> float:
         """Calculate simple deviation score as fallback."""
         if not gold_answer or not test_answer:
@@ -664,10 +882,21 @@ READING COMPREHENSION ANALYSIS:
         return min(1.0, different_chars / max(len(gold_clean), len(test_clean)))
 
     def _get_openai_client(self):
-        """Get AsyncOpenAI client instance."""
+        """Get AsyncOpenAI client instance, reused while the same event loop is running."""
         if not self.api_key or AsyncOpenAI is None:
             raise RuntimeError("AsyncOpenAI client is not available.")
-        return AsyncOpenAI(api_key=self.api_key, timeout=API_TIMEOUT)
+        # The client's connection pool is bound to the loop it first ran on, so a
+        # long-lived loop keeps one warm client and a fresh loop gets a new one.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = AsyncOpenAI(api_key=self.api_key, timeout=API_TIMEOUT)
+            self._client_loop = loop
+        return self._client
+
+    def set_openai_client(self, client) -> None:
+        """Use ``client`` (owned by the caller) on the running loop; ``None`` drops it."""
+        self._client = client
+        self._client_loop = asyncio.get_running_loop() if client is not None else None
 
     def get_validation_threshold(self, question_type: str) -> float:
         """Get the validation threshold for a specific question type."""
@@ -49,3 +49,22 @@ def coerce_response_text(response: Any) -> str:
 
     return str(response)
 
+
+
+def coerce_response_body_text(body: Any) -> str:
+    """Extract textual content from a raw Responses JSON body (e.g. a Batch API output line)."""
+    if not isinstance(body, dict):
+        return ""
+
+    output_text = body.get("output_text")
+    if isinstance(output_text, str) and output_text:
+        return output_text.strip()
+
+    segments: List[str] = []
+    for block in body.get("output") or []:
+        if not isinstance(block, dict):
+            continue
+        for chunk in block.get("content") or []:
+            if isinstance(chunk, dict) and isinstance(chunk.get("text"), str) and chunk["text"]:
+                segments.append(chunk["text"])
+    return "\n".join(segments).strip()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import tempfile
 from pathlib import Path
 from typing import Tuple
 
@@ -89,6 +91,25 @@ def structured_data_path(run_id: str) -> Path:
     return run_directory(run_id) / "structured.json"
 
 
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Write ``payload`` to a unique sibling temp file in one buffered write, fsync, then swap it in."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique name keeps concurrent writers (threads or worker processes) off each other's temp file.
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with open(fd, "wb", buffering=1 << 16) as handle:
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 def pdf_input_path(run_id: str, filename: str) -> Path:
     return run_directory(run_id) / filename
 
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models import PipelineRun, QuestionManipulation
+from app.services.mapping.gpt5_mapping_generator import GPT5MappingGeneratorService, _to_json_safe
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    app = create_app("testing")
+    app.config["PIPELINE_STORAGE_ROOT"] = tmp_path / "runs"
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _create_question(run_id: str = "run-gen") -> QuestionManipulation:
+    db.session.add(
+        PipelineRun(
+            id=run_id,
+            original_pdf_path="source.pdf",
+            original_filename="source.pdf",
+            current_stage="smart_substitution",
+            status="running",
+        )
+    )
+    question = QuestionManipulation(
+        pipeline_run_id=run_id,
+        question_number="1",
+        question_type="mcq_single",
+        original_text="Mercury is the smallest planet.",
+        options_data={"A": "Mercury", "B": "Mars"},
+        gold_answer="A",
+        ai_model_results={"existing": True},
+        sequence_index=0,
+    )
+    db.session.add(question)
+    db.session.commit()
+    return question
+
+
+def test_to_json_safe_coerces_like_json_round_trip():
+    mapping_id = uuid.uuid4()
+    stamp = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    payload = {
+        "id": mapping_id,
+        "positions": (1, 2),
+        "nested": {2: "two", None: "none", True: "yes"},
+        "timestamp": stamp,
+        "confidence": 0.5,
+    }
+
+    safe = _to_json_safe(payload)
+
+    assert safe == {
+        "id": str(mapping_id),
+        "positions": [1, 2],
+        "nested": {"2": "two", "null": "none", "true": "yes"},
+        "timestamp": stamp.isoformat(),
+        "confidence": 0.5,
+    }
+    safe["nested"]["2"] = "changed"
+    assert payload["nested"][2] == "two"
+
+
+def test_to_json_safe_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        _to_json_safe({"value": object()})
+
+
+def test_latex_segments_are_cached_until_file_changes(tmp_path):
+    latex_file = tmp_path / "doc.tex"
+    latex_file.write_text(r"\begin{enumerate}\item 1. First\item 2. Second\end{enumerate}", encoding="utf-8")
+    cache: dict = {}
+    service = GPT5MappingGeneratorService(latex_cache=cache)
+
+    segments, number_to_span = service._load_latex_segments(latex_file, latex_file.read_bytes())
+    assert len(segments) == 2
+    assert number_to_span == {1: segments[0], 2: segments[1]}
+    assert str(latex_file) in cache
+    assert service._load_latex_segments(latex_file, latex_file.read_bytes())[0] is segments
+
+    latex_file.write_text(r"\begin{enumerate}\item 1. Only\end{enumerate}", encoding="utf-8")
+    mtime, _, _ = cache[str(latex_file)]
+    cache[str(latex_file)] = (mtime - 10, segments, number_to_span)
+    refreshed, _ = service._load_latex_segments(latex_file, latex_file.read_bytes())
+    assert len(refreshed) == 1
+
+
+def test_find_question_segment_prefers_item_number_index():
+    content = r"\begin{enumerate}\item 3. Third\item 1. First\end{enumerate}"
+    service = GPT5MappingGeneratorService()
+    segments = service._compute_top_level_item_spans(content)
+
+    assert service._find_question_segment_in_latex(content, "1", precomputed_segments=segments) == segments[1]
+    assert service._find_question_segment_in_latex(content, "3", precomputed_segments=segments) == segments[0]
+
+
+def test_extract_latex_stem_decodes_only_the_question_segment(app_context, tmp_path):
+    question = _create_question()
+    question.sequence_index = 1
+    latex_file = tmp_path / "doc.tex"
+    latex_file.write_text(
+        "\\begin{enumerate}\\item 1. Café question\\item 2. Naïve question\\end{enumerate}",
+        encoding="utf-8",
+    )
+    service = GPT5MappingGeneratorService()
+
+    stem = service._extract_latex_stem_text("run-gen", question, {"document": {"latex_path": str(latex_file)}})
+
+    assert stem == "\\item 2. Naïve question"
+
+
+def test_save_mapping_persists_through_orm_flush(app_context):
+    question = _create_question()
+    service = GPT5MappingGeneratorService()
+
+    service._save_mapping_to_question(
+        question,
+        {
+            "original_substring": "Mercury",
+            "replacement_substring": "Mars",
+            "start_pos": 0,
+            "end_pos": 7,
+            "latex_stem_text": "Mercury is the smallest planet.",
+        },
+        method="replacement",
+        effectiveness=0.8,
+        validation_record={"status": "auto_validated"},
+    )
+
+    db.session.expire_all()
+    stored = db.session.get(QuestionManipulation, question.id)
+    assert stored.substring_mappings[0]["original"] == "Mercury"
+    assert stored.manipulation_method == "replacement"
+    assert stored.effectiveness_score == pytest.approx(0.8)
+    assert stored.ai_model_results["existing"] is True
+    assert stored.ai_model_results["last_validation"] == {"status": "auto_validated"}
+    assert stored.ai_model_results["auto_generated"]["last_mapping_id"] == stored.substring_mappings[0]["id"]
+
+
+def test_locate_item_marker_uses_literal_then_regex_fallback():
+    service = GPT5MappingGeneratorService()
+    content = "intro \\item 1.5 decoy \\item 1. real \\item  2. spaced"
+
+    assert service._locate_item_marker(content, "1") == content.index("\\item 1. real")
+    assert service._locate_item_marker(content.encode("utf-8"), "1") == content.index("\\item 1. real")
+    assert service._locate_item_marker(content, "2") == content.index("\\item  2.")
+    assert service._locate_item_marker(content, "3") is None
+
+
+def test_save_mapping_keeps_existing_id_and_fills_missing_one(app_context):
+    question = _create_question()
+    service = GPT5MappingGeneratorService()
+
+    service._save_mapping_to_question(question, {"id": "keep-me", "original": "Mercury", "replacement": "Mars"})
+    assert question.substring_mappings[0]["id"] == "keep-me"
+
+    service._save_mapping_to_question(question, {"id": "", "original": "Mercury", "replacement": "Mars"})
+    generated = question.substring_mappings[0]["id"]
+    assert generated and len(generated) == 32
+
+
+def test_unsupported_question_type_fails_before_reading_latex(app_context, monkeypatch):
+    question = _create_question()
+    question.question_type = "unsupported_type"
+    db.session.commit()
+    service = GPT5MappingGeneratorService()
+    monkeypatch.setattr(service.structured_manager, "load", lambda run_id: {})
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("LaTeX should not be read for unsupported question types")
+
+    monkeypatch.setattr(service, "_extract_latex_stem_text", _fail)
+
+    with pytest.raises(ValueError, match="No strategy found"):
+        service.generate_mappings_for_question(run_id="run-gen", question_id=question.id)
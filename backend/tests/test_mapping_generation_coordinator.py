@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import create_app
+from app.extensions import db
+from app.models import PipelineRun, QuestionManipulation
+from app.services.mapping import mapping_generation_coordinator as coordinator_module
+from app.services.mapping.mapping_generation_coordinator import MappingGenerationCoordinator
+from app.utils.storage_paths import run_directory
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    app = create_app("testing")
+    app.config["PIPELINE_STORAGE_ROOT"] = tmp_path / "runs"
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class _StubStructuredManager:
+    def load(self, run_id):
+        return {}
+
+
+class _StubGenerator:
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+        self.structured_manager = _StubStructuredManager()
+
+    def generate_mappings_for_question(self, *, run_id, question_id, batch=False, **kwargs):
+        self.calls.append(kwargs)
+        return {
+            "status": "success",
+            "mappings_generated": 1,
+            "pending_update": {
+                "id": question_id,
+                "substring_mappings": [{"id": f"m-{question_id}", "original": "a", "replacement": "b"}],
+                "manipulation_method": "replacement",
+                "effectiveness_score": 0.9,
+                "ai_model_results": {"auto_generated": {"last_mapping_id": f"m-{question_id}"}},
+                "ai_model_results_patch": {"auto_generated": {"last_mapping_id": f"m-{question_id}"}},
+            }
+            if batch
+            else None,
+        }
+
+
+def _seed_questions(run_id: str, count: int) -> list[int]:
+    db.session.add(
+        PipelineRun(
+            id=run_id,
+            original_pdf_path="source.pdf",
+            original_filename="source.pdf",
+            current_stage="smart_substitution",
+            status="running",
+        )
+    )
+    questions = [
+        QuestionManipulation(
+            pipeline_run_id=run_id,
+            question_number=str(idx + 1),
+            question_type="mcq_single",
+            original_text=f"Question {idx + 1}",
+            sequence_index=idx,
+        )
+        for idx in range(count)
+    ]
+    db.session.add_all(questions)
+    db.session.commit()
+    return [question.id for question in questions]
+
+
+def test_bulk_jobs_commit_buffered_mappings_on_completion(app_context, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "GPT5MappingGeneratorService", _StubGenerator)
+    run_id = "run-bulk"
+    question_ids = _seed_questions(run_id, 3)
+
+    coordinator = MappingGenerationCoordinator(max_workers=1)
+    job_id = coordinator._register_job(run_id=run_id, job_type="bulk", total=len(question_ids))
+
+    for question_id in question_ids[:-1]:
+        coordinator._run_question_job(app_context, job_id, run_id, question_id, "1", 1, "replacement", True)
+
+    db.session.expire_all()
+    assert all(db.session.get(QuestionManipulation, qid).substring_mappings is None for qid in question_ids)
+
+    coordinator._run_question_job(app_context, job_id, run_id, question_ids[-1], "3", 1, "replacement", True)
+
+    db.session.expire_all()
+    for qid in question_ids:
+        stored = db.session.get(QuestionManipulation, qid)
+        assert stored.substring_mappings[0]["id"] == f"m-{qid}"
+        assert stored.manipulation_method == "replacement"
+        assert stored.ai_model_results["auto_generated"]["last_mapping_id"] == f"m-{qid}"
+    assert coordinator.get_job_snapshot(job_id)["status"] == "completed"
+
+
+def test_bulk_jobs_share_the_structured_snapshot(app_context, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "GPT5MappingGeneratorService", _StubGenerator)
+    run_id = "run-shared"
+    question_ids = _seed_questions(run_id, 2)
+    structured = {"questions": []}
+
+    coordinator = MappingGenerationCoordinator(max_workers=1)
+    job_id = coordinator._register_job(run_id=run_id, job_type="bulk", total=len(question_ids))
+    for question_id in question_ids:
+        coordinator._run_question_job(
+            app_context, job_id, run_id, question_id, "1", 1, "replacement", True, structured
+        )
+
+    assert [call["structured"] for call in coordinator._service.calls] == [structured, structured]
+    assert all(call["structured"] is structured for call in coordinator._service.calls)
+
+
+def test_postgres_batches_merge_ai_model_results_keys():
+    sql = str(coordinator_module.MERGE_AI_MODEL_RESULTS.compile(dialect=postgresql.dialect()))
+
+    assert "coalesce(question_manipulations.ai_model_results, '{}'::jsonb) || %(patch)s" in sql
+    assert "WHERE question_manipulations.id = %(question_id)s" in sql
+
+
+def test_structured_sync_runs_once_per_bulk_job(app_context, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "GPT5MappingGeneratorService", _StubGenerator)
+    monkeypatch.setattr(coordinator_module, "BULK_COMMIT_BATCH_SIZE", 1)
+    run_id = "run-sync"
+    question_ids = _seed_questions(run_id, 3)
+
+    coordinator = MappingGenerationCoordinator(max_workers=1)
+    synced = []
+
+    class _Substitution:
+        def sync_structured_mappings(self, sync_run_id):
+            synced.append(sync_run_id)
+
+    coordinator._substitution_service = _Substitution()
+    job_id = coordinator._register_job(run_id=run_id, job_type="bulk", total=len(question_ids))
+    for question_id in question_ids:
+        coordinator._run_question_job(app_context, job_id, run_id, question_id, "1", 1, "replacement", True)
+
+    assert synced == [run_id]
+
+
+def test_final_sync_waits_for_batch_writes_still_in_flight(app_context, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "GPT5MappingGeneratorService", _StubGenerator)
+    monkeypatch.setattr(coordinator_module, "BULK_COMMIT_BATCH_SIZE", 1)
+    run_id = "run-in-flight"
+    question_ids = _seed_questions(run_id, 2)
+    structured_path = run_directory(run_id) / "structured.json"
+    structured_path.write_text(
+        json.dumps(
+            {
+                "questions": [
+                    {"manipulation_id": qid, "question_number": str(idx + 1), "sequence_index": idx}
+                    for idx, qid in enumerate(question_ids)
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    coordinator = MappingGenerationCoordinator(max_workers=1)
+    job_id = coordinator._register_job(run_id=run_id, job_type="bulk", total=len(question_ids))
+    writing, release = threading.Event(), threading.Event()
+    write_pending_updates = coordinator._write_pending_updates
+
+    def _slow_write(write_run_id, rows):
+        if threading.current_thread() is not threading.main_thread():
+            writing.set()
+            release.wait(5)
+        write_pending_updates(write_run_id, rows)
+
+    monkeypatch.setattr(coordinator, "_write_pending_updates", _slow_write)
+    pending_update = _StubGenerator().generate_mappings_for_question(
+        run_id=run_id, question_id=question_ids[0], batch=True
+    )["pending_update"]
+
+    def _late_batch():
+        with app_context.app_context():
+            coordinator._queue_pending_update(job_id, run_id, pending_update, app=app_context)
+
+    writer = threading.Thread(target=_late_batch)
+    writer.start()
+    assert writing.wait(5)
+    # Every question reports done while the first question's batch is still being written.
+    for _ in question_ids:
+        coordinator._increment_job_progress(job_id, app=app_context)
+    assert coordinator.get_job_snapshot(job_id)["status"] == "running"
+
+    release.set()
+    writer.join(5)
+
+    assert coordinator.get_job_snapshot(job_id)["status"] == "completed"
+    stored = json.loads(structured_path.read_text(encoding="utf-8"))
+    entry = next(q for q in stored["questions"] if q.get("manipulation_id") == question_ids[0])
+    assert entry["manipulation"]["substring_mappings"][0]["id"] == f"m-{question_ids[0]}"
+
+
+def test_submit_bulk_generation_streams_questions_in_one_pass(app_context, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "GPT5MappingGeneratorService", _StubGenerator)
+    question_ids = _seed_questions("run-stream", 3)
+    coordinator = MappingGenerationCoordinator(max_workers=1)
+    fed = []
+    monkeypatch.setattr(coordinator, "_feed_bulk_tasks", lambda *args: fed.append(args[3]))
+
+    job_id = coordinator.submit_bulk_generation("run-stream", k=1, strategy_name="replacement")
+
+    snapshot = coordinator.get_job_snapshot(job_id)
+    assert snapshot["total"] == 3
+    assert snapshot["status"] == "running"
+    for _ in range(50):
+        if fed:
+            break
+        time.sleep(0.01)
+    assert fed == [[(qid, str(idx + 1)) for idx, qid in enumerate(question_ids)]]
+
+
+def test_submit_bulk_generation_completes_empty_runs(app_context, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "GPT5MappingGeneratorService", _StubGenerator)
+    coordinator = MappingGenerationCoordinator(max_workers=1)
+
+    job_id = coordinator.submit_bulk_generation("run-empty", k=1, strategy_name="replacement")
+
+    snapshot = coordinator.get_job_snapshot(job_id)
+    assert snapshot["total"] == 0
+    assert snapshot["status"] == "completed"
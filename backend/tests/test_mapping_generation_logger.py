@@ -0,0 +1,178 @@
+import json
+from dataclasses import asdict
+
+import pytest
+
+from app import create_app
+from app.services.mapping import mapping_generation_logger as logger_module
+from app.services.mapping.mapping_generation_logger import MappingGenerationLogger
+from app.utils.storage_paths import run_directory
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    app = create_app("testing")
+    app.config["PIPELINE_STORAGE_ROOT"] = tmp_path / "runs"
+    with app.app_context():
+        yield app
+
+
+def _log_question(service: MappingGenerationLogger, run_id: str, question_id: int) -> None:
+    service.log_generation(run_id, question_id, str(question_id), "queued", {"job_id": "job"})
+    service.log_generation(run_id, question_id, str(question_id), "success", {"job_id": "job"}, mappings_generated=2)
+    service.log_validation(run_id, question_id, str(question_id), 0, "failed", {"reason": "no deviation"})
+    service.log_validation(run_id, question_id, str(question_id), 1, "success", {"confidence": 0.9})
+
+
+def test_events_are_appended_and_folded_on_reload(app_context):
+    run_id = "run-log"
+    writer = MappingGenerationLogger()
+    _log_question(writer, run_id, 7)
+
+    log_file = run_directory(run_id) / logger_module.LOG_FILENAME
+    assert len(log_file.read_bytes().splitlines()) == 4
+
+    reloaded = MappingGenerationLogger().get_logs(run_id)
+    assert reloaded == writer.get_logs(run_id)
+    entry = reloaded[0]
+    assert entry["status"] == "success"
+    assert entry["mappings_generated"] == 2
+    assert entry["mappings_validated"] == 2
+    assert entry["first_valid_mapping_index"] == 1
+    assert [log["mapping_index"] for log in entry["validation_logs"]] == [0, 1]
+
+
+def test_event_log_is_compacted_to_snapshots(app_context, monkeypatch):
+    monkeypatch.setattr(logger_module, "COMPACTION_RATIO", 2)
+    run_id = "run-compact"
+    writer = MappingGenerationLogger()
+    _log_question(writer, run_id, 1)
+    writer.flush(run_id)
+
+    lines = (run_directory(run_id) / logger_module.LOG_FILENAME).read_bytes().splitlines()
+    assert len(lines) < 5
+    assert json.loads(lines[0])["event"] == "payloads"
+    assert json.loads(lines[1])["event"] == "snapshot"
+    assert MappingGenerationLogger().get_logs(run_id) == writer.get_logs(run_id)
+
+
+def test_legacy_snapshot_file_is_migrated(app_context):
+    run_id = "run-legacy"
+    legacy = {
+        "run_id": run_id,
+        "generated_at": "2024-01-01T00:00:00+00:00",
+        "logs": [
+            {
+                "run_id": run_id,
+                "question_id": 3,
+                "question_number": "3",
+                "timestamp": "2024-01-01T00:00:00+00:00",
+                "stage": "generation",
+                "status": "success",
+                "details": {},
+                "mappings_generated": 1,
+                "mappings_validated": 0,
+                "first_valid_mapping_index": None,
+                "validation_logs": [],
+            }
+        ],
+    }
+    (run_directory(run_id) / logger_module.LEGACY_LOG_FILENAME).write_text(json.dumps(legacy), encoding="utf-8")
+
+    service = MappingGenerationLogger()
+    service.log_generation(run_id, 4, "4", "queued", {})
+
+    assert [log["question_id"] for log in MappingGenerationLogger().get_logs(run_id)] == [3, 4]
+
+
+def test_to_dict_matches_asdict(app_context):
+    service = MappingGenerationLogger()
+    _log_question(service, "run-dict", 5)
+
+    log = service.load_logs("run-dict")[0]
+    assert log.to_dict() == asdict(log)
+
+
+def test_compacted_snapshots_store_repeated_details_once(app_context):
+    run_id = "run-refs"
+    writer = MappingGenerationLogger()
+    writer.log_generation(run_id, 1, "1", "success", {"job_id": "job"}, mappings_generated=3)
+    for index in range(3):
+        writer.log_validation(run_id, 1, "1", index, "failed", {"reason": "answer unchanged", "rubric": "r" * 200})
+    with writer._run_lock(run_id):
+        writer._compact_locked(run_id)
+
+    raw = (run_directory(run_id) / logger_module.LOG_FILENAME).read_bytes()
+    assert raw.count(b"answer unchanged") == 1
+
+    reloaded = MappingGenerationLogger().get_logs(run_id)
+    assert reloaded == writer.get_logs(run_id)
+    assert reloaded[0]["validation_logs"][2]["details"]["reason"] == "answer unchanged"
+
+
+def test_generation_log_has_no_instance_dict(app_context):
+    service = MappingGenerationLogger()
+    _log_question(service, "run-slots", 6)
+
+    log = service.load_logs("run-slots")[0]
+    assert not hasattr(log, "__dict__")
+
+
+def test_events_find_generation_entries_through_the_index(app_context):
+    run_id = "run-index"
+    service = MappingGenerationLogger()
+    for question_id in (1, 2):
+        _log_question(service, run_id, question_id)
+
+    index = service._gen_by_qid[run_id]
+    assert sorted(index) == [1, 2]
+    assert all(log.stage == "generation" for log in index.values())
+
+    service.log_validation(run_id, 2, "2", 2, "failed", {})
+    assert index[2].mappings_validated == 3
+    assert index[1].mappings_validated == 2
+
+    reloaded = MappingGenerationLogger()
+    assert reloaded.get_logs(run_id) == service.get_logs(run_id)
+    assert reloaded._gen_by_qid[run_id][2].mappings_validated == 3
+
+
+def test_mapped_load_skips_blank_and_torn_lines(app_context):
+    run_id = "run-mapped"
+    writer = MappingGenerationLogger()
+    _log_question(writer, run_id, 2)
+    writer.flush(run_id)
+
+    log_file = run_directory(run_id) / logger_module.LOG_FILENAME
+    with log_file.open("ab") as handle:
+        handle.write(b"\n   \n{\"event\": \"generation\", \"question_")
+
+    assert MappingGenerationLogger().get_logs(run_id) == writer.get_logs(run_id)
+
+    log_file.write_bytes(b"")
+    assert MappingGenerationLogger().get_logs(run_id) == []
+
+
+def test_validation_batch_matches_individual_events(app_context):
+    single, batched = MappingGenerationLogger(), MappingGenerationLogger()
+    for service, run_id in ((single, "run-single"), (batched, "run-batched")):
+        service.log_generation(run_id, 3, "3", "success", {"job_id": "job"}, mappings_generated=2)
+    single.log_validation("run-single", 3, "3", 0, "failed", {"reason": "no deviation"})
+    single.log_validation("run-single", 3, "3", 1, "success", {"confidence": 0.9})
+    batched.log_validation_batch(
+        "run-batched",
+        3,
+        "3",
+        [
+            {"mapping_index": 0, "status": "failed", "details": {"reason": "no deviation"}},
+            {"mapping_index": 1, "status": "success", "details": {"confidence": 0.9}},
+        ],
+    )
+
+    log_file = run_directory("run-batched") / logger_module.LOG_FILENAME
+    assert len(log_file.read_bytes().splitlines()) == 3
+    reloaded = MappingGenerationLogger().get_logs("run-batched")[0]
+    expected = MappingGenerationLogger().get_logs("run-single")[0]
+    for key in ("status", "mappings_validated", "first_valid_mapping_index"):
+        assert reloaded[key] == expected[key]
+    assert [log["mapping_index"] for log in reloaded["validation_logs"]] == [0, 1]
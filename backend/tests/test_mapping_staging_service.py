@@ -1,4 +1,5 @@
 import json
+import threading
 from types import SimpleNamespace
 
 import pytest
@@ -6,9 +7,11 @@ import pytest
 from app import create_app
 from app.extensions import db
 from app.models import QuestionManipulation
+from app.services.mapping.mapping_file_writer import get_mapping_file_writer
 from app.services.mapping.mapping_staging_service import MappingStagingService
 from app.services.pipeline.smart_substitution_service import SmartSubstitutionService
-from app.utils.storage_paths import run_directory
+from app.utils import storage_paths
+from app.utils.storage_paths import atomic_write_bytes, run_directory
 
 
 @pytest.fixture
@@ -124,3 +127,173 @@ def test_promote_staged_mappings_updates_questions(app_context):
     data = json.loads(structured_path.read_text(encoding="utf-8"))
     assert data["manipulation_results"]["staged_promoted_questions"] == ["1"]
     assert any(entry["question_number"] == "2" for entry in data["manipulation_results"]["staged_skipped_questions"])
+
+
+def test_staged_writes_are_flushed_in_background(app_context):
+    service = MappingStagingService()
+    run_id = "run-background"
+    question = SimpleNamespace(id=4, question_number="4", sequence_index=3, source_identifier=None)
+
+    service.stage_failure(run_id, question, "first")
+    service.stage_failure(run_id, question, "second")
+    assert service.load(run_id)["questions"]["4"]["error"] == "second"
+
+    get_mapping_file_writer().flush_pending()
+    path = run_directory(run_id) / "mapping_generation_staged.json"
+    stored = json.loads(path.read_text(encoding="utf-8"))
+    assert stored["question_keys"] == ["4"]
+    assert stored["columns"]["status"] == ["failed"]
+    assert stored["payloads"] == [{"error": "second"}]
+
+
+def test_staging_state_is_cached_across_instances(app_context, monkeypatch):
+    run_id = "run-cache"
+    question = SimpleNamespace(id=5, question_number="5", sequence_index=4, source_identifier=None)
+    MappingStagingService().stage_failure(run_id, question, "boom")
+
+    def _unexpected_read(*args, **kwargs):
+        raise AssertionError("staging state should come from the in-memory cache")
+
+    monkeypatch.setattr(MappingStagingService, "_read", _unexpected_read)
+    snapshot = MappingStagingService().load(run_id)
+    MappingStagingService().mark_promoted(run_id, [5])
+
+    assert snapshot["questions"]["5"]["status"] == "failed"
+    assert MappingStagingService().load(run_id)["questions"]["5"]["status"] == "finalized"
+
+
+def test_staging_cache_rereads_files_rewritten_by_another_worker(app_context):
+    run_id = "run-workers"
+    question = SimpleNamespace(id=6, question_number="6", sequence_index=5, source_identifier=None)
+    MappingStagingService().stage_failure(run_id, question, "boom")
+    get_mapping_file_writer().flush_pending()
+    assert MappingStagingService().load(run_id)["questions"]["6"]["status"] == "failed"
+
+    # Another gunicorn worker has its own cache and rewrites the file behind ours.
+    path = run_directory(run_id) / "mapping_generation_staged.json"
+    stored = json.loads(path.read_text(encoding="utf-8"))
+    stored["columns"]["status"] = ["finalized"]
+    path.write_text(json.dumps(stored), encoding="utf-8")
+
+    assert MappingStagingService().load(run_id)["questions"]["6"]["status"] == "finalized"
+
+
+def test_staging_file_round_trips_columnar_and_legacy_layouts(app_context):
+    run_id = "run-columns"
+    staging = MappingStagingService()
+    valid = SimpleNamespace(id=1, question_number="1", sequence_index=0, source_identifier="q1")
+    failed = SimpleNamespace(id=2, question_number="2", sequence_index=1, source_identifier=None)
+    staging.stage_valid_mapping(
+        run_id,
+        valid,
+        {"original": "Mercury", "replacement": "Mars"},
+        generated_count=2,
+        validation_logs=[{"status": "success", "validation_result": {"confidence": 0.9}}],
+        metadata={"job_id": "job-1", "strategy": "replacement"},
+    )
+    staging.stage_failure(run_id, failed, "timeout", metadata={"job_id": "job-2"})
+    expected = staging.load(run_id)["questions"]
+    get_mapping_file_writer().flush_pending()
+
+    stored = json.loads((run_directory(run_id) / "mapping_generation_staged.json").read_text(encoding="utf-8"))
+    assert "questions" not in stored
+    assert stored["columns"]["question_id"] == [1, 2]
+    assert "generated_count" not in stored["columns"]
+    summary_ref = stored["payloads"][0]["validation_summary"]
+    assert stored["payloads"][0]["validation_logs"][0]["validation_result"] == summary_ref
+    assert stored["shared_payloads"] == {summary_ref["$ref"]: {"confidence": 0.9}}
+
+    path = run_directory(run_id) / "mapping_generation_staged.json"
+    assert staging._read(run_id, path)["questions"] == expected
+
+    path.write_text(json.dumps({"run_id": run_id, "questions": expected, "updated_at": None}), encoding="utf-8")
+    assert staging._read(run_id, path)["questions"] == expected
+
+
+def test_one_update_shares_a_single_timestamp(app_context):
+    run_id = "run-stamp"
+    staging = MappingStagingService()
+    for qid in (1, 2):
+        staging.stage_failure(run_id, SimpleNamespace(id=qid, question_number=str(qid), sequence_index=qid, source_identifier=None), "boom")
+
+    data = staging.load(run_id)
+    assert data["updated_at"] == data["questions"]["2"]["updated_at"]
+
+    staging.mark_promoted(run_id, [1, 2])
+    data = staging.load(run_id)
+    assert data["questions"]["1"]["finalized_at"] == data["questions"]["2"]["finalized_at"] == data["updated_at"]
+
+
+def test_stage_valid_mapping_copies_top_level_keys_only(app_context):
+    staging = MappingStagingService()
+    question = SimpleNamespace(id=8, question_number="8", sequence_index=7, source_identifier=None)
+    mapping = {"original": "Mercury", "replacement": "Mars", "positions": [0, 7]}
+
+    staging.stage_valid_mapping(
+        "run-copy",
+        question,
+        mapping,
+        generated_count=1,
+        validation_logs=[{"status": "success", "validation_result": {"confidence": 0.7}}],
+    )
+
+    staged = staging.load("run-copy")["questions"]["8"]["staged_mapping"]
+    assert staged == {**mapping, "validated": True, "confidence": 0.7}
+    assert "validated" not in mapping
+    assert staged["positions"] is mapping["positions"]
+
+
+def test_runs_stage_under_separate_locks(app_context):
+    staging = MappingStagingService()
+    question = SimpleNamespace(id=9, question_number="9", sequence_index=8, source_identifier=None)
+    done = threading.Event()
+
+    with staging._run_lock("run-busy"):
+        def _stage():
+            with app_context.app_context():
+                staging.stage_failure("run-free", question, "boom")
+            done.set()
+
+        worker = threading.Thread(target=_stage)
+        worker.start()
+        assert done.wait(timeout=5)
+        worker.join()
+
+    assert staging._run_lock("run-busy") is not staging._run_lock("run-free")
+    assert staging.load("run-free")["questions"]["9"]["error"] == "boom"
+
+
+def test_restaging_identical_content_skips_the_write(app_context, monkeypatch):
+    staging = MappingStagingService()
+    question = SimpleNamespace(id=10, question_number="10", sequence_index=9, source_identifier=None)
+    staging.stage_failure("run-same", question, "boom", metadata={"job_id": "job"})
+    first = staging.load("run-same")["questions"]["10"]
+
+    writes = []
+    monkeypatch.setattr(MappingStagingService, "_write", lambda self, *args: writes.append(args))
+    staging.stage_failure("run-same", question, "boom", metadata={"job_id": "job"})
+    staging.mark_promoted("run-same", [99])
+    assert writes == []
+    assert staging.load("run-same")["questions"]["10"] is first
+
+    staging.stage_failure("run-same", question, "different", metadata={"job_id": "job"})
+    assert len(writes) == 1
+
+
+def test_atomic_writes_use_unique_temp_files_and_clean_up_on_failure(tmp_path, monkeypatch):
+    target = tmp_path / "state.json"
+    threads = [threading.Thread(target=atomic_write_bytes, args=(target, b"x" * n)) for n in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(target.read_bytes()) in range(1, 9)
+
+    def _fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage_paths.os, "replace", _fail)
+    with pytest.raises(OSError):
+        atomic_write_bytes(target, b"lost")
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
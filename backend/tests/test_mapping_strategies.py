@@ -0,0 +1,108 @@
+import pytest
+
+from app.services.mapping.mapping_strategies import (
+    MCQ_REPLACEMENT_STRATEGY,
+    LONG_FORM_REPLACEMENT_STRATEGY,
+    TRUE_FALSE_REPLACEMENT_STRATEGY,
+    MappingStrategy,
+    StrategyRegistry,
+)
+
+
+def _question_data():
+    return {
+        "question_number": "3",
+        "latex_stem_text": r"\item 3. Which planet is {closest} to the Sun?",
+        "gold_answer": "A",
+        "question_type": "mcq_single",
+        "options": {"A": "Mercury", "B": None, 1: "Venus"},
+        "copyable_text": "Which planet is closest to the Sun?",
+        "answer_guidance": "Target option B.\n",
+    }
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [MCQ_REPLACEMENT_STRATEGY, TRUE_FALSE_REPLACEMENT_STRATEGY, LONG_FORM_REPLACEMENT_STRATEGY],
+)
+def test_compiled_templates_match_str_format(strategy):
+    registry = StrategyRegistry()
+    question_data = _question_data()
+
+    expected = strategy.prompt_template.format(
+        question_index="3",
+        latex_stem_text=question_data["latex_stem_text"],
+        gold_answer="A",
+        question_type="mcq_single",
+        options="A: Mercury, B: , 1: Venus",
+        k=4,
+        reasoning_steps="\n".join(f"- {step}" for step in strategy.reasoning_steps),
+        copyable_text=question_data["copyable_text"],
+        prefix_note="",
+        answer_guidance="Target option B.\n",
+        retry_instructions="",
+    )
+
+    assert registry.build_prompt(strategy, question_data, 4) == expected
+
+
+def test_templates_with_format_specs_fall_back_to_str_format():
+    strategy = MappingStrategy(
+        name="custom",
+        question_types=["mcq_single"],
+        reasoning_steps=[],
+        prompt_template="{k:>3}|{{literal}}|{question_index!r}",
+        validation_criteria={},
+    )
+
+    assert StrategyRegistry().build_prompt(strategy, {"question_number": "7"}, 2) == "  2|{literal}|'7'"
+
+
+def test_format_options_is_memoized_and_handles_unhashable_values():
+    from app.services.mapping import mapping_strategies
+
+    registry = StrategyRegistry()
+    mapping_strategies._format_option_items.cache_clear()
+
+    options = {"A": "Mercury", "B": None, 1: "Venus"}
+    assert registry._format_options(options) == "A: Mercury, B: , 1: Venus"
+    assert registry._format_options(dict(options)) == "A: Mercury, B: , 1: Venus"
+    assert mapping_strategies._format_option_items.cache_info().hits == 1
+
+    assert registry._format_options({"A": ["x", "y"]}) == "A: ['x', 'y']"
+    assert registry._format_options({"A": 1}) == "A: 1"
+    assert registry._format_options({"A": True}) == "A: True"
+    assert registry._format_options({}) == "None"
+    assert registry._format_options(["A", "B"]) == "['A', 'B']"
+
+
+def test_strategies_are_keyed_by_name_and_type():
+    registry = StrategyRegistry()
+    assert registry.get_strategy("mcq_single") is registry.strategies[("replacement", "mcq_single")]
+    assert registry.get_strategy("mcq_single", "unknown") is None
+
+    strategy = registry.get_strategy("mcq_single")
+    first = registry.build_prompt(strategy, _question_data(), 4)
+    assert registry.build_prompt(strategy, _question_data(), 4) == first
+    retry = registry.build_prompt(strategy, {**_question_data(), "retry_instructions": "Try again."}, 4)
+    assert "Try again." in retry and "Try again." not in first
+
+
+def test_default_strategies_are_built_once_and_shared():
+    from app.services.mapping import mapping_strategies
+
+    registry = mapping_strategies.get_strategy_registry()
+    assert registry is mapping_strategies.get_strategy_registry()
+    assert registry.get_strategy("true_false") is mapping_strategies.TRUE_FALSE_REPLACEMENT_STRATEGY
+    with pytest.raises(AttributeError):
+        mapping_strategies.UNKNOWN_STRATEGY
+
+
+def test_escaped_braces_are_merged_into_literal_chunks():
+    from app.services.mapping.mapping_strategies import _compile_template
+
+    template = "{{\"a\": {x}}} and {{{{}}}} {y}{x}"
+    context = {"x": 1, "y": "two"}
+
+    assert _compile_template(template)(context) == template.format(**context)
+    assert _compile_template("plain")({}) == "plain"
@@ -0,0 +1,445 @@
+import asyncio
+
+import pytest
+
+from app.services.mapping.mapping_validator import MappingValidator
+from app.services.validation.gpt5_validation_service import ValidationResult
+
+
+def _result(is_valid: bool, test_answer: str = "B") -> ValidationResult:
+    return ValidationResult(
+        is_valid=is_valid,
+        confidence=0.9 if is_valid else 0.1,
+        deviation_score=0.8 if is_valid else 0.0,
+        reasoning="flipped" if is_valid else "unchanged",
+        semantic_similarity=0.5,
+        factual_accuracy=True,
+        question_type_specific_notes="",
+        gold_answer="A",
+        test_answer=test_answer,
+        model_used="stub",
+    )
+
+
+class _StubValidationService:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.started = []
+        self.cancelled = []
+        self.active = 0
+        self.max_active = 0
+
+    async def validate_answer_deviation(self, *, manipulated_question_text, **kwargs):
+        self.started.append(manipulated_question_text)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        delay, is_valid = self.outcomes[manipulated_question_text]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(manipulated_question_text)
+            raise
+        finally:
+            self.active -= 1
+        return _result(is_valid, test_answer="B" if is_valid else "A")
+
+
+def _mapping(replacement: str) -> dict:
+    return {"original_substring": "Mercury", "replacement_substring": replacement, "target_wrong_answer": "B"}
+
+
+def test_validations_run_concurrently_and_lowest_valid_index_wins():
+    validator = MappingValidator()
+    validator.validator = _StubValidationService(
+        {
+            "Venus is closest.": (0.05, False),
+            "Mars is closest.": (0.1, True),
+            "Earth is closest.": (0.01, True),
+            "Pluto is closest.": (1.0, True),
+        }
+    )
+    mappings = [_mapping("Venus"), _mapping("Mars"), _mapping("Earth"), _mapping("Pluto")]
+
+    chosen, logs = validator.validate_mapping_sequence(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data={"A": "Mercury", "B": "Mars"},
+        mappings=mappings,
+    )
+
+    assert chosen is mappings[1]
+    assert [(log["mapping_index"], log["status"]) for log in logs] == [(0, "failed"), (1, "success")]
+    assert validator.validator.max_active == 4
+    assert validator.validator.cancelled == ["Pluto is closest."]
+
+
+def test_unapplicable_mappings_are_logged_as_errors_in_order():
+    validator = MappingValidator()
+    validator.validator = _StubValidationService({"Venus is closest.": (0, False)})
+    missing = {"original_substring": "Jupiter", "replacement_substring": "Saturn"}
+
+    chosen, logs = validator.validate_mapping_sequence(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data={"A": "Mercury", "B": "Mars"},
+        mappings=[missing, _mapping("Venus")],
+    )
+
+    assert chosen is None
+    assert [(log["mapping_index"], log["status"]) for log in logs] == [(0, "error"), (1, "failed")]
+    assert logs[0]["suggestion"]["missing_substring"] == "Jupiter"
+
+
+def test_validators_share_one_background_loop():
+    from app.services.mapping import mapping_validator
+
+    loops = []
+
+    class _LoopRecorder(_StubValidationService):
+        async def validate_answer_deviation(self, **kwargs):
+            loops.append(asyncio.get_running_loop())
+            return _result(True)
+
+    for replacement in ("Mars", "Venus"):
+        validator = MappingValidator()
+        validator.validator = _LoopRecorder({})
+        chosen, _ = validator.validate_mapping_sequence(
+            question_text="Mercury is closest.",
+            question_type="mcq_single",
+            gold_answer="A",
+            options_data=None,
+            mappings=[_mapping(replacement)],
+        )
+        assert chosen is not None
+
+    assert loops[0] is loops[1] is mapping_validator._get_validation_loop()
+
+
+def test_text_helpers_use_module_patterns():
+    validator = MappingValidator()
+
+    assert validator._normalize_text("\\textbf{Bold}  and \\emph{em}\n\\text{x}") == "Bold and em x"
+    assert validator._extract_answer_phrase("Pick 'one' or 'two'") == "two"
+    assert validator._normalize_answer_token("b) Mars", {"A": "Mercury", "B": "Mars"}) == "B"
+    assert validator._normalize_answer_token("mars", {"A": "Mercury", "B": "Mars"}) == "B"
+
+
+def test_normalize_text_unwraps_nested_commands_like_sequential_passes():
+    validator = MappingValidator()
+
+    assert validator._normalize_text("\\emph{\\textbf{x}} and \\text{\\alpha}") == "x and \\alpha"
+
+
+def test_normalized_stems_are_cached_across_mappings():
+    from app.services.mapping import mapping_validator
+
+    validator = MappingValidator()
+    mapping_validator._normalize_latex_text.cache_clear()
+    stem = "\\textbf{Mercury} is   closest."
+
+    assert validator._normalize_text(stem) == "Mercury is closest."
+    assert MappingValidator()._normalize_text(stem) == "Mercury is closest."
+    assert mapping_validator._normalize_latex_text.cache_info().hits == 1
+
+
+def test_question_text_is_normalized_once_across_mappings():
+    from app.services.mapping import mapping_validator
+
+    validator = MappingValidator()
+    text = "The ﬁrst planet is Mercury."
+    mapping_validator._search_index.cache_clear()
+
+    for original in ("first planet", "FIRST", "Mercury"):
+        start, end = validator._find_substring_with_normalization(text, original)
+        assert text[start:end].lower().replace("ﬁ", "fi") == original.lower()
+
+    info = mapping_validator._search_index.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_normalize_with_index_composes_combining_sequences():
+    validator = MappingValidator()
+
+    normalized, index_map = validator._normalize_with_index("plain")
+    assert (normalized, list(index_map)) == ("plain", [0, 1, 2, 3, 4])
+    normalized, index_map = validator._normalize_with_index("cafe\u0301 \ufb01x")
+    assert normalized == "caf\u00e9 fix"
+    assert index_map.typecode == "i"
+    assert list(index_map) == [0, 1, 2, 3, 5, 6, 6, 7]
+
+    text = "Le cafe\u0301 noir"
+    start, end = validator._find_substring_with_normalization(text, "caf\u00e9")
+    assert text[start:end] == "cafe\u0301"
+
+
+def test_question_text_is_folded_once_across_searches():
+    from app.services.mapping import mapping_validator
+
+    validator = MappingValidator()
+    mapping_validator._search_index.cache_clear()
+
+    assert validator._find_substring_with_normalization("Mercury is closest", "IS close") == (8, 16)
+    assert validator._find_substring_with_normalization("Mercury is closest", "CLOSEST") == (11, 18)
+    assert validator._find_substring_with_normalization("Mercury is closest", "Venus") is None
+    assert mapping_validator._search_index.cache_info().misses == 1
+    assert validator._find_substring_with_normalization("Voilà le café", "LE CAFÉ") == (6, 13)
+
+
+def test_case_folding_that_expands_characters_keeps_offsets():
+    validator = MappingValidator()
+    text = "Die Straße ist lang"
+
+    assert validator._find_substring_with_normalization(text, "STRASSE") == (4, 10)
+    assert validator._find_substring_with_normalization(text, "ist") == (11, 14)
+
+
+def test_answer_tokens_use_a_prebuilt_options_index():
+    validator = MappingValidator()
+    options = {"a": "Mercury", "B": "Mars", "C": "mars"}
+    index = validator._build_options_index(options)
+
+    assert index.keys == {"A", "B", "C"}
+    assert validator._normalize_answer_token(" a ", options, index) == "A"
+    assert validator._normalize_answer_token("MARS", options, index) == "B"
+    assert validator._normalize_answer_token("c) mars", options, index) == "C"
+    assert validator._normalize_answer_token("B.", options, index) == "B"
+    assert validator._normalize_answer_token("B - Mars", options, index) == "B"
+
+
+def test_option_texts_win_over_leading_key_letters():
+    validator = MappingValidator()
+    options = {"A": "Mercury", "M": "Mars", "B": "a"}
+    index = validator._build_options_index(options)
+
+    assert validator._normalize_answer_token("Mercury", options, index) == "A"
+    assert validator._normalize_answer_token("a", options, index) == "A"
+    assert validator._normalize_answer_token("m:", options, index) == "M"
+    assert validator._normalize_answer_token("Moon", options, index) == "M"
+    assert validator._normalize_answer_token("True", None) == "true"
+    assert validator._normalize_answer_token("Pluto", options, index) == "Pluto"
+
+
+def test_exact_option_text_is_not_read_as_its_leading_letter():
+    validator = MappingValidator()
+    options = {"A": "Berlin", "B": "Athens"}
+
+    # The leading-letter heuristic used to run first and resolved "Athens" to key "A".
+    assert validator._normalize_answer_token("Athens", options) == "B"
+    assert validator._normalize_answer_token("athens", options, validator._build_options_index(options)) == "B"
+    assert validator._normalize_answer_token("A) Berlin", options) == "A"
+
+
+def test_apply_mapping_splices_the_first_exact_or_stripped_match():
+    validator = MappingValidator()
+    text = "Mercury orbits; Mercury is small."
+
+    assert validator._apply_mapping_to_question(text, _mapping("Mars")) == "Mars orbits; Mercury is small."
+    stripped = {"original_substring": "  is small ", "replacement_substring": "is large"}
+    assert validator._apply_mapping_to_question(text, stripped) == "Mercury orbits; Mercury is large."
+
+
+def test_request_timeouts_come_from_the_client_and_map_to_timeout_results(monkeypatch):
+    import httpx
+    from openai import APITimeoutError
+
+    from app.services.validation.gpt5_validation_service import GPT5ValidationService
+
+    seen = {}
+
+    class _Responses:
+        async def create(self, **kwargs):
+            seen.update(kwargs)
+            raise APITimeoutError(request=httpx.Request("POST", "https://example.invalid"))
+
+    class _Client:
+        responses = _Responses()
+
+        def with_options(self, **options):
+            seen.update(options)
+            return self
+
+    service = GPT5ValidationService(api_key="test-key")
+    monkeypatch.setattr(service, "_get_openai_client", _Client)
+    validator = MappingValidator()
+    validator.validator = service
+
+    chosen, logs = validator.validate_mapping_sequence(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data={"A": "Mercury", "B": "Mars"},
+        mappings=[_mapping("Mars")],
+    )
+
+    assert chosen is None
+    assert seen["timeout"] == 60
+    assert seen["max_retries"] == 0
+    assert logs[0]["validation_result"]["reasoning"] == "Validation timed out after 60 seconds"
+
+
+def test_rate_limit_waits_count_against_the_validation_deadline(monkeypatch):
+    from app.services.validation import gpt5_validation_service
+    from app.services.validation.gpt5_validation_service import GPT5ValidationService
+
+    created = []
+
+    class _Responses:
+        async def create(self, **kwargs):
+            created.append(kwargs)
+
+    class _Client:
+        responses = _Responses()
+
+        def with_options(self, **options):
+            return self
+
+    async def _saturated_bucket():
+        await asyncio.sleep(60)
+
+    service = GPT5ValidationService(api_key="test-key")
+    monkeypatch.setattr(service, "_get_openai_client", _Client)
+    monkeypatch.setattr(gpt5_validation_service, "acquire_openai_slot", _saturated_bucket)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            service.validate_answer_deviation(
+                question_text="Mercury is closest.",
+                question_type="mcq_single",
+                gold_answer="A",
+                manipulated_question_text="Mars is closest.",
+                timeout=0.05,
+            )
+        )
+    assert created == []
+
+
+def test_identical_validations_are_served_from_the_result_cache():
+    validator = MappingValidator()
+    stub = _StubValidationService({"Venus is closest.": (0, False)})
+    validator.validator = stub
+    kwargs = dict(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data={"A": "Mercury", "B": "Mars"},
+    )
+
+    _, first = validator.validate_mapping_sequence(mappings=[_mapping("Venus")], **kwargs)
+    _, second = validator.validate_mapping_sequence(mappings=[_mapping("Venus"), _mapping("Venus")], **kwargs)
+
+    assert stub.started == ["Venus is closest."]
+    assert [log["validation_result"] for log in second] == [first[0]["validation_result"]] * 2
+
+    validator.validate_mapping_sequence(mappings=[_mapping("Venus")], **{**kwargs, "gold_answer": "B"})
+    assert len(stub.started) == 2
+
+
+def test_suggestions_are_only_built_for_unchanged_answers(monkeypatch):
+    validator = MappingValidator()
+    options = {"A": "Mercury", "B": "Mars"}
+    kwargs = dict(mapping=_mapping("Mars"), options_data=options, question_type="mcq_single", gold_answer="A")
+
+    unchanged = validator._build_validation_suggestion(validation_result=_result(False, test_answer="a"), **kwargs)
+    assert unchanged["reason"] == "answer_did_not_change"
+    assert unchanged["target_option"] == "B"
+    assert validator._build_validation_suggestion(validation_result=_result(False, test_answer=""), **kwargs) is None
+
+    def _fail(**kwargs):
+        raise AssertionError("valid results should not build a suggestion")
+
+    monkeypatch.setattr(validator, "_build_validation_suggestion", _fail)
+    validator.validator = _StubValidationService({"Mars is closest.": (0, True)})
+    chosen, logs = validator.validate_mapping_sequence(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data=options,
+        mappings=[_mapping("Mars")],
+    )
+    assert chosen is not None
+    assert "suggestion" not in logs[0]
+
+
+class _BatchStubValidationService(_StubValidationService):
+    def __init__(self, outcomes, batch_outcomes):
+        super().__init__(outcomes)
+        self.batch_outcomes = batch_outcomes
+        self.batches = []
+
+    async def validate_answer_deviation_batch(self, *, candidates, **kwargs):
+        texts = [candidate["manipulated_question_text"] for candidate in candidates]
+        self.batches.append(texts)
+        if self.batch_outcomes is None:
+            return None
+        return [_result(self.batch_outcomes[text]) for text in texts]
+
+
+def test_sequences_are_validated_with_one_batch_request():
+    validator = MappingValidator()
+    stub = _BatchStubValidationService({}, {"Venus is closest.": False, "Mars is closest.": True})
+    validator.validator = stub
+
+    chosen, logs = validator.validate_mapping_sequence(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data={"A": "Mercury", "B": "Mars"},
+        mappings=[_mapping("Venus"), {"original_substring": "Pluto", "replacement_substring": "Jupiter"}, _mapping("Mars")],
+    )
+
+    assert stub.batches == [["Venus is closest.", "Mars is closest."]]
+    assert stub.started == []
+    assert chosen["replacement_substring"] == "Mars"
+    assert [log["status"] for log in logs] == ["failed", "error", "success"]
+
+
+def test_unusable_batch_responses_fall_back_to_single_validations():
+    validator = MappingValidator()
+    stub = _BatchStubValidationService({"Venus is closest.": (0, False), "Mars is closest.": (0, True)}, None)
+    validator.validator = stub
+
+    chosen, _ = validator.validate_mapping_sequence(
+        question_text="Mercury is closest.",
+        question_type="mcq_single",
+        gold_answer="A",
+        options_data={"A": "Mercury", "B": "Mars"},
+        mappings=[_mapping("Venus"), _mapping("Mars")],
+    )
+
+    assert len(stub.batches) == 1
+    assert sorted(stub.started) == ["Mars is closest.", "Venus is closest."]
+    assert chosen["replacement_substring"] == "Mars"
+
+
+def test_batch_validation_parses_candidates_in_order(monkeypatch):
+    import json
+
+    from app.services.validation.gpt5_validation_service import GPT5ValidationService
+
+    def _verdict(index, is_valid):
+        return {
+            "candidate_index": index,
+            "test_answer": "B" if is_valid else "A",
+            "analysis": {"confidence": 0.95, "deviation_score": 0.9 if is_valid else 0.0},
+            "validation_decision": {"is_valid": is_valid},
+        }
+
+    replies = [
+        {"candidates": [_verdict(1, True), _verdict(0, False)]},
+        {"candidates": [_verdict(0, False)]},
+    ]
+
+    class _Responses:
+        async def create(self, **kwargs):
+            return type("_Response", (), {"output_text": json.dumps(replies.pop(0))})()
+
+    service = GPT5ValidationService(api_key="test-key")
+    monkeypatch.setattr(service, "_get_openai_client", lambda: type("_Client", (), {"responses": _Responses()})())
+    candidates = [{"manipulated_question_text": "Venus is closest."}, {"manipulated_question_text": "Mars is closest."}]
+    kwargs = dict(question_text="Mercury is closest.", question_type="mcq_single", gold_answer="A")
+
+    results = asyncio.run(service.validate_answer_deviation_batch(candidates=candidates, **kwargs))
+    assert [(result.is_valid, result.test_answer) for result in results] == [(False, "A"), (True, "B")]
+    assert asyncio.run(service.validate_answer_deviation_batch(candidates=candidates, **kwargs)) is None
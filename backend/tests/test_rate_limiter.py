@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.services.llm_clients import rate_limiter
+from app.services.llm_clients.rate_limiter import AsyncTokenBucket
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_waits_for_refill_after_burst(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    bucket = AsyncTokenBucket(2, 60)
+
+    async def _run():
+        for _ in range(3):
+            async with bucket:
+                pass
+
+    asyncio.run(_run())
+    assert clock.sleeps == [30.0]
+
+
+def test_token_bucket_consume_delays_later_acquires(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    bucket = AsyncTokenBucket(100, 60)
+
+    bucket.consume(150)
+    asyncio.run(bucket.acquire(0))
+    assert clock.sleeps == [30.0]
+
+
+def test_token_bucket_reservations_are_not_lost_across_threads():
+    import threading
+
+    bucket = AsyncTokenBucket(1_000_000, 3600)
+    start = threading.Barrier(8)
+
+    def _consume():
+        start.wait()
+        for _ in range(10_000):
+            bucket.consume(1)
+
+    threads = [threading.Thread(target=_consume) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Refill over the test's runtime is a few thousand tokens at most.
+    assert bucket._tokens < 1_000_000 - 80_000 + 10_000
@@ -0,0 +1,801 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app import create_app
+from app.services.mapping import streamlined_mapping_service
+from app.services.mapping.streamlined_mapping_service import PreparedQuestion, StreamlinedMappingService
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    app = create_app("testing")
+    app.config["PIPELINE_STORAGE_ROOT"] = tmp_path / "runs"
+    app.config["OPENAI_API_KEY"] = "test-key"
+    with app.app_context():
+        yield app
+
+
+def _question_data():
+    return {
+        "question_type": "mcq_single",
+        "gold_answer": "A",
+        "options": {"A": "Mercury", "B": "Mars"},
+        "stem_text": "Which planet is closest to the Sun?",
+        "latex_stem_text": "Which planet is closest to the Sun?",
+    }
+
+
+def _mapping_sets_reply(replacement: str) -> str:
+    return json.dumps(
+        {"mapping_sets": [{"set_index": 1, "mappings": [{"original": "closest", "replacement": replacement}]}]}
+    )
+
+
+def _target_configs():
+    return [{"target_option": "B", "target_option_text": "Mars", "signal_strategy": None}]
+
+
+class _FakeBatchClient:
+    def __init__(self, output_lines):
+        self.uploaded = None
+        self.polls = 0
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+        self._output = b"\n".join(orjson.dumps(line) for line in output_lines)
+
+    async def _create_file(self, *, file, purpose):
+        assert purpose == "batch"
+        self.uploaded = [orjson.loads(line) for line in file[1].splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    async def _create_batch(self, **kwargs):
+        assert kwargs["endpoint"] == "/v1/responses"
+        return SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None)
+
+    async def _retrieve(self, batch_id):
+        self.polls += 1
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-out")
+
+    async def _content(self, file_id):
+        assert file_id == "file-out"
+        return SimpleNamespace(content=self._output)
+
+
+def _output_line(custom_id: str, text: str, status_code: int = 200):
+    body = {"output": [{"type": "message", "content": [{"type": "output_text", "text": text}]}]}
+    return {"custom_id": custom_id, "response": {"status_code": status_code, "body": body}}
+
+
+def test_batch_submission_returns_first_attempt_responses_per_question(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    client = _FakeBatchClient(
+        [
+            _output_line("run-1:1:1", _mapping_sets_reply("nearest")),
+            _output_line("run-1:2:1", "rate limited", status_code=429),
+        ]
+    )
+    monkeypatch.setattr(streamlined_mapping_service, "AsyncOpenAI", lambda **kwargs: client)
+    monkeypatch.setattr(streamlined_mapping_service, "BATCH_POLL_INTERVAL", 0)
+    prepared = [
+        PreparedQuestion(SimpleNamespace(id=qid, question_number=str(qid)), _question_data(), _target_configs())
+        for qid in (1, 2)
+    ]
+    prepared.append(PreparedQuestion(SimpleNamespace(id=3, question_number="3"), error=ValueError("no stem")))
+
+    prefetched = asyncio.run(service._submit_batch("run-1", prepared))
+
+    assert [line["custom_id"] for line in client.uploaded] == ["run-1:1:1", "run-1:2:1"]
+    assert client.uploaded[0]["body"]["metadata"]["question_id"] == "1"
+    assert client.polls == 1
+    assert prefetched == {1: _mapping_sets_reply("nearest")}
+
+
+def test_batches_past_the_max_wait_are_cancelled(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    client = _FakeBatchClient([_output_line("run-1:1:1", _mapping_sets_reply("nearest"))])
+    cancelled = []
+
+    async def _still_running(batch_id):
+        client.polls += 1
+        return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None)
+
+    async def _cancel(batch_id):
+        cancelled.append(batch_id)
+
+    client.batches = SimpleNamespace(create=client._create_batch, retrieve=_still_running, cancel=_cancel)
+    monkeypatch.setattr(streamlined_mapping_service, "AsyncOpenAI", lambda **kwargs: client)
+    monkeypatch.setattr(streamlined_mapping_service, "BATCH_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(streamlined_mapping_service, "BATCH_MAX_WAIT", 0.05)
+    prepared = [
+        PreparedQuestion(SimpleNamespace(id=qid, question_number=str(qid)), _question_data(), _target_configs())
+        for qid in (1, 2)
+    ]
+
+    prefetched = asyncio.run(service._submit_batch("run-1", prepared))
+
+    assert prefetched == {}
+    assert client.polls >= 1
+    assert cancelled == ["batch-1"]
+
+
+def test_prefetched_responses_are_parsed_without_calling_the_model(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+
+    def _no_client(**kwargs):
+        raise AssertionError("prefetched content should not reach the API")
+
+    monkeypatch.setattr(streamlined_mapping_service, "AsyncOpenAI", _no_client)
+
+    sets = asyncio.run(
+        service._generate_all_mapping_sets(
+            run_id="run-1",
+            question_id=1,
+            question_number="1",
+            question_data=_question_data(),
+            target_configs=_target_configs(),
+            attempt=1,
+            prefetched_content=_mapping_sets_reply("nearest"),
+        )
+    )
+
+    assert sets[0]["set_index"] == 1
+    assert sets[0]["mappings"][0]["replacement"] == "nearest"
+    assert sets[0]["mappings"][0]["target_option"] == "B"
+
+
+class _FakeResponsesClient:
+    def __init__(self, reply: str):
+        self.calls = 0
+        self.responses = SimpleNamespace(create=self._create)
+        self._reply = reply
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(output_text=self._reply, id="resp", model="stub")
+
+
+def test_generation_responses_are_cached_per_run(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    client = _FakeResponsesClient(_mapping_sets_reply("nearest"))
+    monkeypatch.setattr(streamlined_mapping_service, "AsyncOpenAI", lambda **kwargs: client)
+    kwargs = dict(
+        run_id="run-1",
+        question_id=1,
+        question_number="1",
+        target_configs=_target_configs(),
+        attempt=1,
+    )
+
+    first = asyncio.run(service._generate_all_mapping_sets(question_data=_question_data(), **kwargs))
+    second = asyncio.run(service._generate_all_mapping_sets(question_data=_question_data(), **kwargs))
+    assert client.calls == 1
+    assert second[0]["mappings"] == first[0]["mappings"]
+
+    asyncio.run(service._generate_all_mapping_sets(question_data=_question_data(), use_cache=False, **kwargs))
+    asyncio.run(service._generate_all_mapping_sets(question_data=_question_data(), failure_rationales=["x"], **kwargs))
+    assert client.calls == 3
+
+
+def test_live_log_events_are_flushed_in_batches(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    flushed = []
+    monkeypatch.setattr(
+        streamlined_mapping_service.live_logging_service,
+        "emit_many",
+        lambda events: flushed.append([event["message"] for event in events]),
+    )
+
+    async def _run():
+        for idx in range(3):
+            service._emit_live_log("run-1", "smart_substitution", "INFO", f"event {idx}", component="mapping_generation")
+        assert flushed == []
+        await service._close_live_log()
+
+    asyncio.run(_run())
+
+    assert flushed == [["event 0", "event 1", "event 2"]]
+    assert service._log_task is None
+
+
+def test_openai_client_is_shared_per_loop_and_closed(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    created = []
+
+    class _Client:
+        closed = False
+
+        def __init__(self, **kwargs):
+            created.append(self)
+
+        async def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(streamlined_mapping_service, "AsyncOpenAI", _Client)
+
+    async def _run():
+        client = service._get_openai_client()
+        assert service._get_openai_client() is client
+        assert service.validator._client is client
+        await service._close_openai_client()
+        return client
+
+    first = asyncio.run(_run())
+    second = asyncio.run(_run())
+    assert created == [first, second]
+    assert first.closed and second.closed
+    assert service.validator._client is None
+
+
+def test_validation_verdicts_are_cached_per_substitution(app_context, monkeypatch):
+    from app.services.validation.gpt5_validation_service import ValidationResult
+
+    service = StreamlinedMappingService()
+    calls = []
+
+    async def _validate(**kwargs):
+        calls.append(kwargs["manipulated_question_text"])
+        notes = "Processing error" if len(calls) == 2 else ""
+        return ValidationResult(True, 0.9, 0.8, "flipped", 0.1, True, notes, "A", "B", "stub", target_matched=True)
+
+    monkeypatch.setattr(service.validator, "validate_answer_deviation", _validate)
+    kwargs = dict(
+        run_id="run-1",
+        question_id=1,
+        question_number="1",
+        question_data=_question_data(),
+        set_index=1,
+        attempt=1,
+        target_config=_target_configs()[0],
+    )
+
+    first = asyncio.run(
+        service._validate_mapping_set(mapping={"original": "closest", "replacement": "nearest"}, mapping_index=0, **kwargs)
+    )
+    again = asyncio.run(
+        service._validate_mapping_set(mapping={"original": "closest", "replacement": "nearest"}, mapping_index=3, **kwargs)
+    )
+    assert calls == ["Which planet is nearest to the Sun?"]
+    assert again == first
+
+    for _ in range(2):
+        asyncio.run(
+            service._validate_mapping_set(mapping={"original": "Sun", "replacement": "Moon"}, mapping_index=0, **kwargs)
+        )
+    assert len(calls) == 3
+
+
+def test_set_validations_are_prefetched_in_one_batch_call(app_context, monkeypatch):
+    from app.services.validation.gpt5_validation_service import ValidationResult
+
+    service = StreamlinedMappingService()
+    batches, singles = [], []
+
+    async def _validate_batch(**kwargs):
+        batches.append([c["manipulated_question_text"] for c in kwargs["candidates"]])
+        return [
+            ValidationResult(True, 0.9, 0.8, "flipped", 0.1, True, "", "A", "B", "stub", target_matched=True)
+            for _ in kwargs["candidates"]
+        ]
+
+    async def _validate(**kwargs):
+        singles.append(kwargs["manipulated_question_text"])
+        return ValidationResult(False, 0.2, 0.1, "kept", 0.9, True, "", "A", "A", "stub")
+
+    monkeypatch.setattr(service.validator, "validate_answer_deviation_batch", _validate_batch)
+    monkeypatch.setattr(service.validator, "validate_answer_deviation", _validate)
+    mappings = [{"original": "closest", "replacement": "nearest"}, {"original": "Sun", "replacement": "Moon"}]
+    kwargs = dict(run_id="run-1", question_id=1, question_number="1", question_data=_question_data(), set_index=1, attempt=1)
+
+    async def _run():
+        semaphore = asyncio.Semaphore(2)
+        prefetch = asyncio.create_task(
+            service._prefetch_set_validations(
+                semaphore,
+                run_id="run-1",
+                question_id=1,
+                question_data=_question_data(),
+                mappings=mappings,
+                target_config=_target_configs()[0],
+            )
+        )
+        return await asyncio.gather(
+            *(
+                service._validate_mapping_set_with_semaphore(
+                    semaphore,
+                    mapping=mapping,
+                    mapping_index=idx,
+                    target_config=_target_configs()[0],
+                    prefetch=prefetch,
+                    **kwargs,
+                )
+                for idx, mapping in enumerate(mappings)
+            )
+        )
+
+    results = asyncio.run(_run())
+
+    assert batches == [["Which planet is nearest to the Sun?", "Which planet is closest to the Moon?"]]
+    assert singles == []
+    assert all(result.is_valid for result in results)
+
+
+def test_batch_prefetch_carries_signal_metadata(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    seen = []
+
+    async def _validate_batch(**kwargs):
+        seen.extend(kwargs["candidates"])
+        return []
+
+    monkeypatch.setattr(service.validator, "validate_answer_deviation_batch", _validate_batch)
+    mappings = [{"original": "closest", "replacement": "nearest"}, {"original": "Sun", "replacement": "Moon"}]
+    asyncio.run(
+        service._prefetch_set_validations(
+            asyncio.Semaphore(1),
+            run_id="run-1",
+            question_id=1,
+            question_data=_question_data(),
+            mappings=mappings,
+            target_config={"signal_strategy": "lexical_swap"},
+        )
+    )
+
+    assert [c["signal_metadata"] for c in seen] == [{"signal_strategy": "lexical_swap"}] * 2
+    prompt = service.validator._create_batch_validation_prompt(
+        "Q?", "mcq_single", "A", seen, {"A": "Mercury", "B": "Venus"}
+    )
+    assert prompt.count('"signal_strategy": "lexical_swap"') == 2
+
+
+@pytest.mark.parametrize(
+    "wrap",
+    [
+        lambda body: body,
+        lambda body: f"Here you go:\n```json\n{body}\n```",
+        lambda body: f"Sure! {body} Let me know if you need more.",
+    ],
+)
+def test_mapping_sets_are_recovered_from_wrapped_replies(app_context, wrap):
+    service = StreamlinedMappingService()
+    sets = service._parse_mapping_sets(
+        run_id="run-1",
+        question_id=1,
+        question_number="1",
+        question_data=_question_data(),
+        target_configs=_target_configs(),
+        attempt=1,
+        content=wrap(_mapping_sets_reply("nearest")),
+        response=None,
+    )
+    assert [mapping["replacement"] for mapping in sets[0]["mappings"]] == ["nearest"]
+
+
+def test_mapping_dedup_key_ignores_padding_but_not_target():
+    key = StreamlinedMappingService._mapping_dedup_key
+    mapping = {"original": "closest ", "replacement": " nearest"}
+    assert key(mapping, _target_configs()[0]) == key({"original": "closest", "replacement": "nearest"}, _target_configs()[0])
+    assert key(mapping, _target_configs()[0]) != key(mapping, {"target_option": "A"})
+
+
+def test_first_valid_mapping_cancels_remaining_validations(app_context, monkeypatch):
+    from app.services.validation.gpt5_validation_service import ValidationResult
+
+    service = StreamlinedMappingService()
+    targets = [
+        {"target_option": "B", "target_option_text": "Mars", "signal_strategy": None},
+        {"target_option": "C", "target_option_text": "Venus", "signal_strategy": None},
+    ]
+    slow_cancelled = []
+
+    async def _generate(**kwargs):
+        return [
+            {"set_index": 1, "mappings": [{"original": "closest", "replacement": "farthest"}], "target_config": targets[0]},
+            {"set_index": 2, "mappings": [{"original": "closest", "replacement": "nearest"}], "target_config": targets[1]},
+        ]
+
+    async def _validate(semaphore, **kwargs):
+        if kwargs["set_index"] == 1:
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                slow_cancelled.append(True)
+                raise
+        return ValidationResult(True, 0.9, 0.8, "flipped", 0.1, True, "", "A", "C", "stub", target_matched=True)
+
+    prepared = PreparedQuestion(SimpleNamespace(id=1, question_number="1"), _question_data(), targets)
+    monkeypatch.setattr(service, "_generate_all_mapping_sets", _generate)
+    monkeypatch.setattr(service, "_validate_mapping_set_with_semaphore", _validate)
+    monkeypatch.setattr(service, "_queue_valid_mapping", lambda run_id, question, mapping: None)
+
+    result = asyncio.run(service._generate_for_question("run-1", prepared.question, prepared=prepared))
+
+    assert result["status"] == "success"
+    assert result["valid_mapping"]["replacement"] == "nearest"
+    assert slow_cancelled == [True]
+    outcomes = service._status_store["run-1"][1].validation_outcomes
+    assert [(o.set_index, o.is_valid, o.skipped) for o in outcomes] == [(2, True, False), (1, False, True)]
+
+
+def test_flushed_validation_logs_persist_status_at_the_next_checkpoint(app_context, monkeypatch):
+    from app.services.mapping.streamlined_mapping_service import QuestionGenerationStatus
+
+    service = StreamlinedMappingService()
+    writes, logged = [], []
+    monkeypatch.setattr(service, "_persist_status_sync", lambda run_id, qid, status_dict: writes.append(qid))
+    monkeypatch.setattr(service.mapping_logger, "log_validation_batch", lambda **kwargs: logged.append(kwargs["entries"]))
+    status = QuestionGenerationStatus(question_id=1, question_number="1", status="validating")
+    pending_logs = [{"mapping_index": 0, "status": "failed", "details": {}}]
+
+    async def _run():
+        await service._persist_status_if_dirty("run-1", 1, status)
+        service._flush_validation_logs("run-1", 1, "1", status, pending_logs)
+        assert writes == []
+        await service._persist_status_if_dirty("run-1", 1, status)
+        await service._persist_status_if_dirty("run-1", 1, status)
+        await service._close_live_log()
+
+    asyncio.run(_run())
+
+    assert writes == [1]
+    assert logged == [[{"mapping_index": 0, "status": "failed", "details": {}}]]
+    assert pending_logs == []
+
+
+def test_verdicts_after_the_first_valid_one_are_recorded_without_logging(app_context, monkeypatch):
+    from app.services.validation.gpt5_validation_service import ValidationResult
+
+    service = StreamlinedMappingService()
+    targets = [
+        {"target_option": "B", "target_option_text": "Mars", "signal_strategy": None},
+        {"target_option": "C", "target_option_text": "Venus", "signal_strategy": None},
+    ]
+    logged = []
+
+    async def _generate(**kwargs):
+        return [
+            {"set_index": 1, "mappings": [{"original": "closest", "replacement": "farthest"}], "target_config": targets[0]},
+            {"set_index": 2, "mappings": [{"original": "closest", "replacement": "nearest"}], "target_config": targets[1]},
+        ]
+
+    async def _validate(semaphore, **kwargs):
+        return ValidationResult(True, 0.9, 0.8, "flipped", 0.1, True, "", "A", "C", "stub", target_matched=True)
+
+    prepared = PreparedQuestion(SimpleNamespace(id=1, question_number="1"), _question_data(), targets)
+    monkeypatch.setattr(service, "_generate_all_mapping_sets", _generate)
+    monkeypatch.setattr(service, "_validate_mapping_set_with_semaphore", _validate)
+    monkeypatch.setattr(service, "_queue_valid_mapping", lambda run_id, question, mapping: None)
+    monkeypatch.setattr(
+        service.mapping_logger,
+        "log_validation_batch",
+        lambda run_id, question_id, question_number, entries: logged.extend(entries),
+    )
+
+    async def _run():
+        result = await service._generate_for_question("run-1", prepared.question, prepared=prepared)
+        await service._close_live_log()
+        return result
+
+    result = asyncio.run(_run())
+
+    assert result["valid_mapping"]["replacement"] == "farthest"
+    assert [entry["details"]["set_index"] for entry in logged] == [1]
+    outcomes = service._status_store["run-1"][1].validation_outcomes
+    assert [(o.set_index, o.is_valid) for o in outcomes] == [(1, True), (2, True)]
+
+
+def test_db_writer_coalesces_queued_mappings_per_question(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    flushed = []
+
+    async def _save(writes):
+        flushed.append([(run_id, question.id, mapping["replacement"]) for run_id, question, mapping in writes])
+
+    monkeypatch.setattr(service, "_save_valid_mappings", _save)
+    first, second = SimpleNamespace(id=1, question_number="1"), SimpleNamespace(id=2, question_number="2")
+
+    async def _run():
+        service._queue_valid_mapping("run-1", first, {"original": "a", "replacement": "b"})
+        service._queue_valid_mapping("run-1", second, {"original": "a", "replacement": "c"})
+        service._queue_valid_mapping("run-1", first, {"original": "a", "replacement": "d"})
+        await service._close_db_writer()
+
+    asyncio.run(_run())
+
+    assert flushed == [[("run-1", 1, "d"), ("run-1", 2, "c")]]
+    assert service._db_writer_task is None
+
+
+def test_failed_background_saves_are_reported_as_failures(app_context, monkeypatch):
+    from app.services.mapping.streamlined_mapping_service import QuestionGenerationStatus
+
+    service = StreamlinedMappingService()
+
+    async def _save(writes):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(service, "_save_valid_mappings", _save)
+    monkeypatch.setattr(service, "_persist_status_sync", lambda run_id, question_id, snapshot: None)
+    service._status_store["run-1"][1] = QuestionGenerationStatus(question_id=1, question_number="1", status="success")
+    queued = {"status": "success", "question_id": 1, "question_number": "1"}
+
+    async def _run():
+        service._queue_valid_mapping("run-1", SimpleNamespace(id=1, question_number="1"), {"original": "a", "replacement": "b"})
+        await service._close_db_writer()
+        return service._settle_saved_result("run-1", queued)
+
+    settled = asyncio.run(_run())
+
+    assert settled["status"] == "failed"
+    assert settled["error"] == "Failed to save valid mapping: database is locked"
+    assert service._settle_saved_result("run-1", {"status": "failed", "question_id": 1}) == {"status": "failed", "question_id": 1}
+
+
+def test_status_databases_keep_only_recent_connections_open(app_context, monkeypatch):
+    import sqlite3
+
+    from app.services.mapping.streamlined_mapping_service import QuestionGenerationStatus
+
+    monkeypatch.setattr(streamlined_mapping_service, "STATUS_DB_CACHE_SIZE", 2)
+    service = StreamlinedMappingService()
+    connections = {}
+    for run_id in ("run-1", "run-2", "run-3"):
+        status = QuestionGenerationStatus(question_id=1, question_number="1", status="success")
+        service._persist_status_sync(run_id, 1, service._status_snapshot(status))
+        connections[run_id] = service._status_dbs[run_id]
+
+    assert list(service._status_dbs) == ["run-2", "run-3"]
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections["run-1"].execute("SELECT 1")
+
+    # An evicted run reopens on demand and pushes out the least recently used one.
+    assert service._load_persisted_statuses_for_run("run-1")[1].status == "success"
+    assert list(service._status_dbs) == ["run-3", "run-1"]
+
+
+def test_unchanged_status_snapshots_are_not_rewritten(app_context, monkeypatch):
+    from app.services.mapping.streamlined_mapping_service import QuestionGenerationStatus
+
+    service = StreamlinedMappingService()
+    written = []
+    monkeypatch.setattr(service, "_persist_status_sync", lambda run_id, question_id, snapshot: written.append(snapshot))
+    status = QuestionGenerationStatus(question_id=1, question_number="1", status="generating")
+
+    async def _run():
+        await service._persist_status_async("run-1", 1, status)
+        await service._persist_status_async("run-1", 1, status)
+        status.failure_rationales.append("Set 1, Mapping 1: no flip")
+        await service._persist_status_async("run-1", 1, status)
+
+    asyncio.run(_run())
+
+    assert [snapshot["failure_rationales"] for snapshot in written] == [[], ["Set 1, Mapping 1: no flip"]]
+
+
+def test_persisted_status_round_trips_through_the_status_file(app_context):
+    from app.services.mapping.streamlined_mapping_service import QuestionGenerationStatus, ValidationOutcome
+
+    service = StreamlinedMappingService()
+    status = QuestionGenerationStatus(question_id=7, question_number="7", status="success")
+    status.validation_outcomes.append(ValidationOutcome(1, 2, 0, False, 0.0, 0.0, "Skipped", "", skipped=True))
+    status.valid_mapping = {"original": "closest", "replacement": "nearest"}
+
+    service._persist_status_sync("run-1", 7, service._status_snapshot(status))
+    loaded = service._load_persisted_statuses_for_run("run-1")[7]
+
+    assert loaded.status == "success"
+    assert loaded.validation_outcomes == status.validation_outcomes
+    assert loaded.valid_mapping == status.valid_mapping
+
+
+def test_structured_data_is_loaded_once_per_run(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    loads = []
+    monkeypatch.setattr(service.structured_manager, "load", lambda run_id: loads.append(run_id) or {"questions": []})
+
+    async def _run():
+        return await asyncio.gather(*(service._load_structured("run-1") for _ in range(5)))
+
+    results = asyncio.run(_run())
+
+    assert loads == ["run-1"]
+    assert all(result is results[0] for result in results)
+
+
+def test_failing_question_reports_an_error_result_instead_of_raising(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+
+    async def _boom(run_id, question, prefetched_content=None, prepared=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "_generate_for_question", _boom)
+
+    async def _run():
+        completed = asyncio.Queue()
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(
+                service._generate_for_question_with_semaphore(
+                    asyncio.Semaphore(1), completed, "run-1", PreparedQuestion(SimpleNamespace(id=3, question_number="3"))
+                )
+            )
+        return completed.get_nowait()
+
+    assert asyncio.run(_run()) == {"status": "error", "error": "boom", "question_id": 3}
+
+
+def test_prepare_all_captures_per_question_input_errors(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+
+    def _inputs(run_id, question, structured):
+        if question.id == 2:
+            raise ValueError("Could not extract LaTeX stem text for question 2")
+        return _question_data(), _target_configs()
+
+    monkeypatch.setattr(service, "_load_question_inputs", _inputs)
+    questions = [SimpleNamespace(id=1, question_number="1"), SimpleNamespace(id=2, question_number="2")]
+
+    first, second = service._prepare_all("run-1", questions, {"questions": []})
+
+    assert first.error is None and first.target_configs == _target_configs()
+    assert isinstance(second.error, ValueError) and second.question_data is None
+
+
+def test_legacy_status_json_is_still_readable(app_context):
+    from app.utils.storage_paths import run_directory
+
+    service = StreamlinedMappingService()
+    legacy = {"run-1": {"4": {"question_id": 4, "question_number": "4", "status": "failed", "error": "x"}}}
+    (run_directory("run-1") / "mapping_generation_status.json").write_bytes(orjson.dumps(legacy))
+
+    loaded = service._load_persisted_statuses_for_run("run-1")
+
+    assert loaded[4].status == "failed" and loaded[4].error == "x"
+
+
+def test_target_configs_are_capped_at_max_concurrent_sets(app_context, monkeypatch):
+    monkeypatch.setattr(streamlined_mapping_service, "MAPPING_MAX_CONCURRENT_SETS", 2)
+    service = StreamlinedMappingService()
+    question_data = {
+        "question_type": "true_false",
+        "gold_answer": "True",
+        "options": {"True": "True", "False": "False"},
+        "stem_text": "The Sun is a star.",
+    }
+    monkeypatch.setattr(service.generator, "_get_question_data", lambda run_id, question, structured: dict(question_data))
+    monkeypatch.setattr(service.generator, "_extract_latex_stem_text", lambda run_id, question, structured: "The Sun is a star.")
+
+    _, target_configs = service._load_question_inputs("run-1", SimpleNamespace(id=1, question_number="1"), {"questions": []})
+
+    assert [c["target_option"] for c in target_configs] == ["False", None]
+    prompt = service._build_generation_prompt_all_sets(question_data=question_data, target_configs=target_configs)
+    assert "EXACTLY 2 sets (set_index 1, 2)" in prompt
+
+
+def test_mapping_set_splitter_yields_sets_as_their_objects_close():
+    from app.services.mapping.streamlined_mapping_service import _MappingSetSplitter
+
+    text = (
+        '```json\n{"mapping_sets": [{"set_index": 1, "mappings": [{"original": "a}\\"", "replacement": "b"}]},'
+        ' {"set_index": 2, "mappings": []}]}\n```'
+    )
+    splitter = _MappingSetSplitter()
+    seen = []
+    for start in range(0, len(text), 7):
+        seen.append([item["set_index"] for item in splitter.feed(text[start:start + 7])])
+
+    assert [index for chunk in seen for index in chunk] == [1, 2]
+    assert seen.index([1]) < seen.index([2])
+
+
+class _FakeStreamingClient:
+    def __init__(self, text: str, chunk: int = 9):
+        self.closed = False
+        self.responses = SimpleNamespace(create=self._create)
+        self._deltas = [text[i:i + chunk] for i in range(0, len(text), chunk)]
+
+    async def _create(self, **kwargs):
+        assert kwargs["stream"] is True
+        return self
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        for delta in self._deltas:
+            yield SimpleNamespace(type="response.output_text.delta", delta=delta)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_streamed_sets_are_handed_over_before_the_response_ends(app_context, monkeypatch):
+    service = StreamlinedMappingService()
+    reply = json.dumps(
+        {
+            "mapping_sets": [
+                {"set_index": 1, "mappings": [{"original": "closest", "replacement": "nearest"}]},
+                {"set_index": 2, "mappings": [{"original": "Sun", "replacement": "Moon"}]},
+            ]
+        }
+    )
+    client = _FakeStreamingClient(reply)
+    monkeypatch.setattr(streamlined_mapping_service, "AsyncOpenAI", lambda **kwargs: client)
+    targets = _target_configs() + [{"target_option": "C", "target_option_text": "Venus", "signal_strategy": None}]
+    stop = asyncio.Event()
+    handed_over = []
+
+    def _on_set(set_data):
+        handed_over.append(set_data["set_index"])
+        stop.set()
+
+    sets = asyncio.run(
+        service._generate_all_mapping_sets(
+            run_id="run-1",
+            question_id=1,
+            question_number="1",
+            question_data=_question_data(),
+            target_configs=targets,
+            attempt=1,
+            on_set=_on_set,
+            stop_event=stop,
+        )
+    )
+
+    assert handed_over == [1]
+    assert [s["set_index"] for s in sets] == [1]
+    assert sets[0]["mappings"][0]["target_option"] == "B"
+    assert client.closed
+
+
+def test_run_questions_are_fetched_without_their_large_columns(app_context, monkeypatch):
+    from app.extensions import db
+    from app.models import PipelineRun, QuestionManipulation
+
+    db.create_all()
+    db.session.add(
+        PipelineRun(
+            id="run-1",
+            original_pdf_path="source.pdf",
+            original_filename="source.pdf",
+            current_stage="smart_substitution",
+            status="running",
+        )
+    )
+    db.session.add(
+        QuestionManipulation(
+            pipeline_run_id="run-1",
+            question_number="1",
+            question_type="mcq_single",
+            original_text="Which planet is closest to the Sun?",
+            options_data={"A": "Mercury", "B": "Mars"},
+            gold_answer="A",
+            sequence_index=0,
+        )
+    )
+    db.session.commit()
+    db.session.expunge_all()
+
+    service = StreamlinedMappingService()
+    seen = []
+
+    async def _generate(semaphore, completed, run_id, prepared, prefetched_content=None):
+        seen.append(prepared.question)
+        completed.put_nowait({"status": "success", "question_id": prepared.question.id})
+
+    monkeypatch.setattr(service, "_load_structured", lambda run_id: asyncio.sleep(0, {"questions": []}))
+    monkeypatch.setattr(service, "_load_question_inputs", lambda run_id, question, structured: (_question_data(), _target_configs()))
+    monkeypatch.setattr(service, "_generate_for_question_with_semaphore", _generate)
+
+    summary = asyncio.run(service.generate_mappings_for_all_questions("run-1"))
+
+    assert summary["success_count"] == 1
+    question = seen[0]
+    assert "original_text" not in question.__dict__ and "options_data" not in question.__dict__
+    assert question.options_data == {"A": "Mercury", "B": "Mars"}
+    db.session.remove()
+    db.drop_all()